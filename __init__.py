@@ -43,26 +43,41 @@ from lib.shtime import Shtime
 from .webif import WebInterface
 from .datapoints import DataPoints, MasterKeys, SensorKeys
 from .meteocalcs import *
+from .recorder import RawDataRecorder, RawRecord, RECORDER_FILENAME, read_log
+from .ingest import DuplicateFilter, RateLimiter
+from .workers import UploadWorkerPool, reuse_port_supported
+from .windows import RollingWind, TimeWindow, TrendWindow
+from .meteocache import MeteoCache
+from .periods import CalendarPeriods
+from .sun import SolarTable, sunshine_threshold
+from .aggregates import Aggregates
+from .archive import ArchiveGenerator
+from .checkpoint import write_checkpoint, read_newest_checkpoint, CheckpointError
+from .store import RingStore, RingStoreError
+from .history import HistoryStore, HistoryError, AUTO
 
 import os
 import re
+import json
+import functools
+import hashlib
 import socket
 import struct
 import threading
 import time
 import queue
 import math
+import sqlite3
 import requests
 import configparser
 import socketserver
-import pickle
 
 from collections import deque
 from typing import Union
 from datetime import datetime, timezone
 from http.server import BaseHTTPRequestHandler
 from json import JSONDecodeError
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 import urllib.parse as urlparse
 
 
@@ -88,6 +103,12 @@ class Foshk(SmartPlugin):
         self.alive = False                                                 # plugin alive
         self.pickle_filepath = f"{os.getcwd()}/var/plugin_data/{self.get_shortname()}"
         self.shtime = Shtime.get_instance()
+        self.raw_recorder = None                                           # recorder for raw data of api, http and post
+        self.archive = None                                                # generator of archive records of fixed interval
+        self.history = None                                                # tiered history of attribute values
+        self.checkpoint_interval = self.get_parameter_value('Checkpoint_Interval') * 60   # seconds between saves of the gateway state while running
+        self._replay_thread = None                                         # thread replaying recorded raw data
+        self._replay_stop = threading.Event()
 
         # get the parameters for the plugin (as defined in metadata plugin.yaml):
         gateway_address = self.get_parameter_value('Gateway_IP')
@@ -118,6 +139,8 @@ class Foshk(SmartPlugin):
                             'fw_check_crontab': fw_check_crontab,
                             'use_wh32': self.get_parameter_value('Use_of_WH32'),
                             'ignore_wh40_batt': self.get_parameter_value('Ignore_WH40_Battery'),
+                            'meteo_cache_size': self.get_parameter_value('Meteo_Cache_Size'),
+                            'aggregate_attributes': tuple(self.get_parameter_value('Aggregate_Attributes')),
                             'lat': self.get_sh()._lat,
                             'lon': self.get_sh()._lon,
                             'alt': self.get_sh()._elev,
@@ -135,7 +158,13 @@ class Foshk(SmartPlugin):
 
             interface_config.update({'post_server_ip': post_server_ip,
                                      'post_server_port': post_server_port,
-                                     'post_server_cycle': post_server_cycle})
+                                     'post_server_cycle': post_server_cycle,
+                                     'post_server_dedupe_ttl': self.get_parameter_value('Upload_Dedupe_Time'),
+                                     'post_server_rate_limit': self.get_parameter_value('Upload_Rate_Limit'),
+                                     'post_server_rate_burst': self.get_parameter_value('Upload_Rate_Burst'),
+                                     'post_server_workers': self.get_parameter_value('Upload_Workers'),
+                                     'post_server_max_stations': self.get_parameter_value('Max_Stations'),
+                                     'post_server_stations': tuple(station_id.lower() for station_id in self.get_parameter_value('Stations'))})
 
             if not post_server_ip or not post_server_port:
                 self.logger.error(f"Receiving ECOWITT data has been enabled, but not able to define server ip or port with setting {post_server_ip}:{post_server_port}")
@@ -144,6 +173,33 @@ class Foshk(SmartPlugin):
         # init Config Classes
         self.interface_config = InterfaceConfig(**interface_config)
 
+        # init recorder for raw data
+        if self.get_parameter_value('Record_Raw_Data'):
+            self.raw_recorder = RawDataRecorder(self.pickle_filepath,
+                                                max_bytes=self.get_parameter_value('Record_Raw_Data_Max_Size') * 1024 * 1024,
+                                                backup_count=self.get_parameter_value('Record_Raw_Data_Backup_Count'),
+                                                logger=self.logger)
+            self.logger.info(f"Recording of raw data to {self.raw_recorder.filename} has been enabled.")
+
+        # init generator of archive records
+        archive_interval = self.get_parameter_value('Archive_Interval')
+        if archive_interval:
+            self.archive_source = self.get_parameter_value('Archive_Source')
+            self.archive = ArchiveGenerator(archive_interval)
+            self.logger.info(f"Archive records of {archive_interval}s will be generated from datasource {self.archive_source}.")
+
+        # init history of attribute values
+        history_attributes = self.get_parameter_value('History_Attributes')
+        if history_attributes:
+            self.history_source = self.get_parameter_value('History_Source')
+            try:
+                self.history = HistoryStore(f"{self.pickle_filepath}/foshk_history.db", tuple(history_attributes),
+                                            raw_days=self.get_parameter_value('History_Raw_Days'),
+                                            minute_days=self.get_parameter_value('History_Minute_Days'))
+                self.logger.info(f"History of {', '.join(history_attributes)} from datasource {self.history_source} will be kept in {self.history.filename}.")
+            except HistoryError as e:
+                self.logger.error(f"Unable to open history database: {e}. History will not be kept.")
+
         # get a GatewayDriver object
         try:
             self.logger.debug(f"Start interrogating.....")
@@ -167,8 +223,20 @@ class Foshk(SmartPlugin):
         self.interface_config.ip_address = self.gateway.ip_address
         self.interface_config.port = self.gateway.port
 
+        # ring files are closed by stop; open them again if the plugin is restarted
+        self.gateway.open_stores()
+
         # add scheduler
         self.scheduler_add('poll_api', self.gateway.get_current_api_data, cycle=self.interface_config.api_data_cycle, cron=self.interface_config.api_data_crontab)
+        if self.checkpoint_interval:
+            self.scheduler_add('checkpoint', self._checkpoint, cycle=60)
+        if self.history:
+            try:
+                self.history.open()
+            except HistoryError as e:
+                self.logger.error(f"Unable to open history database: {e}. History will not be kept.")
+            else:
+                self.scheduler_add('history', self._compact_history, cycle=60)
         if self.interface_config.fw_check_crontab is not None:
             self.scheduler_add('check_fw_update', self.is_firmware_update_available, cron=self.interface_config.fw_check_crontab)
 
@@ -191,13 +259,24 @@ class Foshk(SmartPlugin):
         self.gateway_connected = False
         self.scheduler_remove('poll_api')
         self.scheduler_remove('check_fw_update')
+        self.scheduler_remove('checkpoint')
+        self.scheduler_remove('history')
 
         # if customer server is used, set parameters accordingly
         if self.use_customer_server:
             self.gateway.tcp.stop_server()
             self.gateway.tcp.shutdown()
 
+        # stop replay and recording
+        self._replay_stop.set()
+        if self.raw_recorder:
+            self.raw_recorder.close()
+
         self.gateway.save_all_relevant_data()
+        self.gateway.close_stores()
+
+        if self.history:
+            self.history.close()
 
     def parse_item(self, item):
         """
@@ -231,12 +310,27 @@ class Foshk(SmartPlugin):
                 elif foshk_datasource == 'http' and not self.gateway.http:
                     self.logger.warning(f" Item {item.path()} should use datasource {foshk_datasource} as per item.yaml, but gateway does not support http requests. Item ignored")
                     return
+                elif foshk_datasource == 'archive' and not self.archive:
+                    self.logger.warning(f" Item {item.path()} should use datasource {foshk_datasource} as per item.yaml, but archive records are not enabled. Item ignored")
+                    return
 
                 source = foshk_datasource
 
             else:
                 source = 'api'
 
+            # data of a further station uploading via ECOWITT protocol
+            if self.has_iattr(item.conf, 'foshk_station'):
+                foshk_station = str(self.get_iattr_value(item.conf, 'foshk_station')).lower()
+                if not self.use_customer_server:
+                    self.logger.warning(f" Item {item.path()} should use data of station {foshk_station} as per item.yaml, but 'ECOWITT'-protocol not enabled. Item ignored")
+                    return
+                if not self.gateway.is_primary_station(foshk_station):
+                    source = f'post.{foshk_station}'
+                elif source != 'post':
+                    self.logger.warning(f" Item {item.path()} uses station {foshk_station}, which is the gateway itself. Datasource post will be used.")
+                    source = 'post'
+
             item_config_data_dict = {'foshk_attribute': foshk_attribute, 'source': source, 'match': f'{source}.{foshk_attribute}'}
             self.add_item(item, config_data_dict=item_config_data_dict, mapping=None)
 
@@ -300,6 +394,16 @@ class Foshk(SmartPlugin):
                 self._update_data_dict(data=data, source=source)
                 self._update_item_values(data=data, source=source)
 
+                # reduce the packets of the archive source to records of fixed interval
+                if self.archive and source == self.archive_source:
+                    record = self.archive.add(data)
+                    if record:
+                        self._update_data_dict(data=record, source='archive')
+                        self._update_item_values(data=record, source='archive')
+
+                if self.history and source == self.history_source:
+                    self.history.add(data)
+
     def _update_item_values(self, data: dict, source: str) -> None:
         """
         Updates the value of connected items
@@ -418,40 +522,49 @@ class Foshk(SmartPlugin):
                 return port
 
     def save_pickle(self, filename: str, data) -> None:
-        """Saves received data as pickle to given file"""
+        """Saves received data as pickle with checkpoint header to given file; the file is replaced atomically and the previous one kept as backup"""
 
         # save pickle
         if data and len(data) > 0:
             self.logger.debug(f"Start writing data to {filename}")
             filename = f"{self.pickle_filepath}/{filename}.pkl"
-            os.makedirs(os.path.dirname(filename), exist_ok=True)
             try:
-                with open(filename, "wb") as output:
-                    try:
-                        pickle.dump(data, output, pickle.HIGHEST_PROTOCOL)
-                        self.logger.debug(f"Successfully wrote data to {filename}")
-                    except Exception as e:
-                        self.logger.debug(f"Unable to write data to {filename}: {e}")
-                        pass
-            except OSError as e:
+                write_checkpoint(filename, data)
+                self.logger.debug(f"Successfully wrote data to {filename}")
+            except Exception as e:
                 self.logger.debug(f"Unable to write data to {filename}: {e}")
-                pass
 
     def read_pickle(self, filename: str):
+        """Reads the newest valid data of given file and its backup"""
 
         filename = f"{self.pickle_filepath}/{filename}.pkl"
-        if os.path.exists(filename):
-            with open(filename, 'rb') as data:
-                try:
-                    data = pickle.load(data)
-                    self.logger.debug(f"Successfully read data from {filename}")
-                    return data
-                except Exception as e:
-                    self.logger.debug(f"Unable to read data from {filename}: {e}")
-                    return None
+        try:
+            data = read_newest_checkpoint(filename)
+        except CheckpointError as e:
+            self.logger.warning(f"Unable to read data from {filename}: {e}")
+            return None
 
-        self.logger.debug(f"Unable to read data from {filename}: 'File/Path not existing'")
-        return None
+        if data is None:
+            self.logger.debug(f"Unable to read data from {filename}: 'File/Path not existing'")
+        else:
+            self.logger.debug(f"Successfully read data from {filename}")
+        return data
+
+    def _checkpoint(self) -> None:
+        """Save the gateway state if the checkpoint interval has passed or the gateway requests it after a significant change"""
+
+        if self.gateway and self.gateway.checkpoint_due(self.checkpoint_interval):
+            self.gateway.save_all_relevant_data()
+
+    def _compact_history(self) -> None:
+        """Write the collected values to the history and aggregate them to the minute and hour tiers"""
+
+        history = self.history
+        if history:
+            try:
+                history.compact()
+            except Exception as e:
+                self.logger.warning(f"Unable to compact history: {e}")
 
     #############################################################
     #  Public Methods
@@ -477,6 +590,77 @@ class Foshk(SmartPlugin):
 
         return self.gateway.update_firmware()
 
+    def replay_raw_data(self, filename: str = '', speed: float = 1.0) -> str:
+        """Replay recorded raw data through parsers and post-processing and update the items
+
+        :param filename:    record file; the recording of the plugin if empty
+        :param speed:       replay speed as multiple of real time; 0 replays as fast as possible
+        """
+
+        if self._replay_thread and self._replay_thread.is_alive():
+            return "Replay is already running."
+
+        if not filename:
+            filename = os.path.join(self.pickle_filepath, RECORDER_FILENAME)
+        if not os.path.exists(filename):
+            return f"Record file {filename} not found."
+
+        def replay():
+            replay_driver = GatewayReplay(plugin_instance=self, callback=lambda source, packet: self.data_queue.put((source, packet)))
+            start = time.monotonic()
+            packets = replay_driver.replay(read_log(filename), speed=speed, stop_event=self._replay_stop)
+            self.logger.info(f"Replay of {filename} finished: {replay_driver.records} records resulted in {packets} packets within {time.monotonic() - start:.1f}s.")
+
+        self._replay_stop.clear()
+        self._replay_thread = threading.Thread(target=replay, name=f"plugins.{self.get_fullname()}.Replay", daemon=True)
+        self._replay_thread.start()
+        return f"Replay of {filename} with speed {speed} started."
+
+    def get_upload_statistics(self) -> dict:
+        """Return the counters of the upload server: received, dropped (queue full), duplicates, throttled and queue_size"""
+
+        if not (self.gateway and self.gateway.tcp):
+            return {}
+        return self.gateway.tcp.statistics
+
+    def get_meteo_cache_statistics(self) -> dict:
+        """Return hits, misses and size of the caches of calculated meteo values"""
+
+        if not self.gateway:
+            return {}
+        return self.gateway.meteo.statistics
+
+    def get_archive_records(self, count: int = 0) -> list:
+        """Return the last count archive records (all kept records if 0), oldest first"""
+
+        if not self.archive:
+            return []
+        records = list(self.archive.records)
+        return records[-count:] if count else records
+
+    def get_history(self, attribute: str, start=None, end=None, resolution: str = AUTO) -> dict:
+        """Return the history of attribute as dict of arrays; see HistoryStore.query
+
+        :param attribute:   attribute listed in History_Attributes
+        :param start:       timestamp or datetime of the first value; one day before end if None
+        :param end:         timestamp or datetime after the last value; now if None
+        :param resolution:  raw, minute, hour or auto (finest resolution still kept for start)
+        """
+
+        if not self.history:
+            return {}
+        try:
+            return self.history.query(attribute, start, end, resolution)
+        except (HistoryError, sqlite3.Error) as e:
+            self.logger.warning(f"Unable to get history of {attribute}: {e}")
+            return {}
+
+    def get_stations(self) -> dict:
+        """Return the further stations uploading via ECOWITT protocol with client ip, model, time of last upload and number of uploads"""
+
+        return {station_id: {'client_ip': station.client_ip, 'model': station.model, 'last_seen': station.last_seen, 'packets': station.packets}
+                for station_id, station in list(self.gateway.stations.items())}
+
     @property
     def gateway_model(self) -> str:
         return self.gateway.gateway_model
@@ -599,6 +783,42 @@ class InterfaceConfig:
     # data cycle for uploading ecowitt protocol
     post_server_cycle: int = None
 
+    # max size of a request body for uploading ecowitt protocol in bytes
+    post_server_max_size: int = 16384
+
+    # timeout in sec for reading a request of the http server for uploading ecowitt protocol; idle connections are closed after this time
+    post_server_timeout: int = 30
+
+    # max number of received uploads waiting for parsing; further uploads are dropped
+    post_server_queue_size: int = 100
+
+    # time in sec within an identical upload is dropped as duplicate; 0 disables
+    post_server_dedupe_ttl: int = 10
+
+    # max number of uploads per minute and client ip; 0 disables
+    post_server_rate_limit: float = 0
+
+    # number of uploads a client may send in a row before the rate limit applies
+    post_server_rate_burst: int = 5
+
+    # number of worker processes receiving and parsing uploads; 0 receives and parses within the plugin process
+    post_server_workers: int = 0
+
+    # max number of further stations uploading via ECOWITT or Wunderground protocol; the least recently seen station is removed for a new one
+    post_server_max_stations: int = 50
+
+    # station ids of further stations accepted; empty accepts every station
+    post_server_stations: tuple = ()
+
+    # bind the upload port with SO_REUSEPORT, so several worker processes can share it
+    post_server_reuse_port: bool = False
+
+    # max number of cached results per function of calculated meteo values; 0 disables caching
+    meteo_cache_size: int = 256
+
+    # attributes with min, max and avg per day, week, month and year; see Gateway.AGGREGATE_STATISTICS
+    aggregate_attributes: tuple = ('outtemp', 'outhumid', 'air_pressure_rel', 'gustspeed')
+
     # usr path for data server upload
     usr_path: str = None
 
@@ -680,10 +900,24 @@ class Gateway(object):
 
     PICKLE_FILENAME_AIRPRESSURE_3H = 'foshk_air_pressure_3h'
     PICKLE_FILENAME_AIRPRESSURE_LAST = 'foshk_air_pressure_last'
+    PRESSURE_TREND_TOLERANCE = 600                                                                          # max seconds the reading used as value 1h/3h ago may be older than 1h/3h
     PICKLE_FILENAME_SUNTIME = 'foshk_sun_time'
+    PICKLE_FILENAME_AGGREGATES = 'foshk_aggregates'
+    PICKLE_FILENAME_COUNTERS = 'foshk_counters'
+    STORE_FILENAME_AIRPRESSURE = 'foshk_air_pressure.ring'
+    STORE_FILENAME_WIND = 'foshk_wind.ring'
+    AGGREGATE_STATISTICS = {DataPoints.OUTTEMP[0]: ('min', 'max', 'avg'),                                  # statistics per attribute available for aggregation
+                            DataPoints.OUTHUMI[0]: ('min', 'max', 'avg'),
+                            DataPoints.RELBARO[0]: ('min', 'max'),
+                            DataPoints.GUSTSPEED[0]: ('max',),
+                            }
 
-    def __init__(self, plugin_instance):
-        """Initialise a Gateway object."""
+    def __init__(self, plugin_instance, restore: bool = True, interface_config=None):
+        """Initialise a Gateway object.
+
+        :param restore:             restore the data saved to pickle at last stop; if False, start from scratch
+        :param interface_config:    interface config to be used instead of the one of the plugin
+        """
 
         # get instance and init logger
         self._plugin_instance = plugin_instance
@@ -691,14 +925,26 @@ class Gateway(object):
         self.logger.debug("Init Gateway Object")
 
         # get interface config
-        self.interface_config = self._plugin_instance.interface_config
+        self.interface_config = interface_config if interface_config else self._plugin_instance.interface_config
 
         # define data structures
-        self.pickle_data_validity_time = 600                                                                # seconds after which the data saved in pickle are not valid anymore
-        self.wind_avg10m = deque(maxlen=(int(10 * 60 / self.interface_config.api_data_cycle)))              # deque to hold 10 minutes of wind speed, wind direction and windgust
-        self.pressure_3h = self._init_pressure_3h()                                                         # deque to hold air pressure date
+        self.restore = restore
+        self.pickle_data_validity_time = self._plugin_instance.checkpoint_interval + 600                    # seconds after which the data saved in pickle are not valid anymore; checkpoint interval plus time to restart
+        self.lock = threading.RLock()                                                                       # post-processing and checkpoints of the state
+        self.last_checkpoint = time.time()
+        self.checkpoint_requested = False                                                                   # state has significantly changed since last checkpoint
+        self.pressure_store = self._init_store(self.STORE_FILENAME_AIRPRESSURE, 1, 4096)                    # ring file of the air pressure readings
+        self.wind_store = self._init_store(self.STORE_FILENAME_WIND, 3, 1024)                               # ring file of the wind readings
+        self.wind_avg10m = self._init_wind_avg10m()                                                         # window of 10 minutes of wind speed, wind direction and windgust
+        self.pressure_3h = self._init_pressure_3h()                                                         # window of 3 hours of air pressure data
+        self.pressure_trends = self._init_pressure_trends()                                                 # dict of trend windows for 1h and 3h
         self.pressure_last = self._init_pressure_last()                                                     # dict to hold last air_pressure_values
+        self.meteo = MeteoCache(self.interface_config.meteo_cache_size)                                     # caches of calculated meteo values
+        self.calendar = CalendarPeriods(self._plugin_instance.shtime.tzinfo())                              # cached keys of hour, day, week, month and year
+        self.solar_table = self._init_solar_table()                                                         # solar elevation and sunshine threshold of the day
         self.sun_time = self._init_sun_time_dict()                                                          # dict to hold sun time data
+        self.aggregates = self._init_aggregates()                                                           # min, max and avg per calendar period
+        self.counter_state, self.counter_sums = self._init_counters()                                       # last cumulative counters and sums of their deltas per calendar period
 
         # all found sensors since beginning of plugin
         self.sensors_all = []
@@ -721,10 +967,37 @@ class Gateway(object):
         self.storm_warning_start_time = None
         self.leakage_warning = None
 
+    def _init_store(self, filename: str, columns: int, capacity: int):
+        """Open ring file in plugin data directory; None if data is not restored or the file cannot be used"""
+
+        if not self.restore:
+            return None
+        try:
+            return RingStore(f"{self._plugin_instance.pickle_filepath}/{filename}", columns, capacity)
+        except RingStoreError as e:
+            self.logger.warning(f"Unable to open ring file: {e}. Readings will not be stored.")
+            return None
+
+    def _init_wind_avg10m(self):
+        """Create window of 10 minutes of wind data with the stored readings of the last 10 minutes"""
+
+        window = RollingWind(span=10 * 60)
+        if self.wind_store:
+            for ts, speed, direction, gust in self.wind_store.readings(time.time() - window.span):
+                window.append(ts, round(speed, 2), round(direction, 2), round(gust, 2))
+        return window
+
     def _init_pressure_3h(self):
-        """Try to load data from pickle. if not successful create new empty deque"""
+        """Create window of air pressure data with the stored readings still within the window; else try to load data from pickle of older versions"""
 
-        raw_data = self._plugin_instance.read_pickle(self.PICKLE_FILENAME_AIRPRESSURE_3H)
+        span = 3 * 3600 + self.PRESSURE_TREND_TOLERANCE
+
+        if self.pressure_store and len(self.pressure_store):
+            readings = [(ts, round(value, 2)) for ts, value in self.pressure_store.readings(time.time() - span)]
+            self.logger.info(f"{len(readings)} air pressure readings restored from ring file.")
+            return TimeWindow(span, readings)
+
+        raw_data = self._plugin_instance.read_pickle(self.PICKLE_FILENAME_AIRPRESSURE_3H) if self.restore else None
         if isinstance(raw_data, dict):
             data = raw_data.get('data')
             stop_time = raw_data.get('stop_time')
@@ -736,16 +1009,34 @@ class Gateway(object):
             self.logger.info("Saved pressure data from pickle are expired. Start from scratch.")
             data = None
 
-        if data and isinstance(data, deque):
-            return data
+        # data was saved as list of (timestamp, value) or as the deque itself; move it to the ring file
+        if data and isinstance(data, (list, deque)):
+            try:
+                window = TimeWindow(span, data)
+            except (TypeError, ValueError):
+                pass
+            else:
+                if self.pressure_store:
+                    for ts, value in window:
+                        self.pressure_store.append(ts, value)
+                return window
+
+        self.logger.info("Unable to load pressure data from pickle. Start with empty window.")
+        return TimeWindow(span)
 
-        self.logger.info("Unable to load pressure data from pickle. Start with empty deque.")
-        return deque(maxlen=(int(3 * 3600 / self.interface_config.api_data_cycle + 5)))
+    def _init_pressure_trends(self) -> dict:
+        """Create trend windows for 1h and 3h and feed them with the restored pressure data"""
+
+        trends = {x: TrendWindow(x * 3600, self.PRESSURE_TREND_TOLERANCE) for x in (1, 3)}
+        for ts, value in self.pressure_3h:
+            for trend in trends.values():
+                trend.update(ts, value)
+        return trends
 
     def _init_pressure_last(self):
         """Try to load data from pickle. if not successful create new dict"""
 
-        raw_data = self._plugin_instance.read_pickle(self.PICKLE_FILENAME_AIRPRESSURE_LAST)
+        raw_data = self._plugin_instance.read_pickle(self.PICKLE_FILENAME_AIRPRESSURE_LAST) if self.restore else None
         if isinstance(raw_data, dict):
             data = raw_data.get('data')
             stop_time = raw_data.get('stop_time')
@@ -763,10 +1054,18 @@ class Gateway(object):
         self.logger.info("Unable to load last pressure data from pickle. Start with empty dict.")
         return {'diff': {}, 'trend': {}}
 
+    def _init_solar_table(self):
+        """Create table of solar elevation for the location; without location sh.sun.pos() is used"""
+
+        if self.interface_config.lat is None or self.interface_config.lon is None:
+            self.logger.info("Location not defined. Sun duration will be calculated with sh.sun.pos().")
+            return None
+        return SolarTable(float(self.interface_config.lat), float(self.interface_config.lon), Constants.SUN_COEF, self._plugin_instance.shtime.tzinfo())
+
     def _init_sun_time_dict(self):
         """Try to load data from pickle. if not successful create new dict"""
 
-        raw_data = self._plugin_instance.read_pickle(self.PICKLE_FILENAME_SUNTIME)
+        raw_data = self._plugin_instance.read_pickle(self.PICKLE_FILENAME_SUNTIME) if self.restore else None
         if isinstance(raw_data, dict):
             data = raw_data.get('data')
             stop_time = raw_data.get('stop_time')
@@ -774,64 +1073,143 @@ class Gateway(object):
             data = None
             stop_time = None
 
-        if stop_time and (int(time.time()) - stop_time) > self.pickle_data_validity_time:
-            self.logger.info("Saved pressure data from pickle are expired. Start from scratch.")
-            data = None
-
-        if data and isinstance(data, dict):
-            return data
+        # sun seconds are kept per calendar period identified by its start and reset by calculate_sun_duration with a reading of a new period,
+        # so they stay valid after any downtime; only the time of the last reading is set to now, so the downtime is not counted as sunshine
+        ts = int(time.time())
+        if data and isinstance(data, dict) and 'last' in data:
+            if isinstance(data.get('year'), tuple) and data['year'][0] < 10000:
+                # older versions keyed the periods by hour of day, day of month, week, month and year; valid only for the periods at saving
+                if not stop_time or (ts - stop_time) > self.pickle_data_validity_time:
+                    self.logger.info("Saved sun_time data from pickle are expired. Start from scratch.")
+                    data = None
+                else:
+                    starts = self.calendar.starts(stop_time)
+                    for period, key, start in zip(CalendarPeriods.PERIODS, self.calendar.keys(stop_time), starts):
+                        data[period] = (start, data[period][1]) if data.get(period, (None,))[0] == key else (0, 0)
+            if data:
+                data['last'] = (ts, data['last'][1])
+                return data
 
         self.logger.info("Unable to load sun_time data from pickle. Start with empty dict.")
-        ts = int(time.time())
-        year = self._plugin_instance.shtime.current_year(offset=0)
-        month = self._plugin_instance.shtime.current_month(offset=0)
-        week = self._plugin_instance.shtime.calendar_week(offset=0)
-        day = self._plugin_instance.shtime.current_day(offset=0)
-        hour = self._plugin_instance.shtime.now().hour
+        hour, day, week, month, year = self.calendar.starts(ts)
         start_value = 0
         sun_times = {'hour': (hour, start_value), 'day': (day, start_value), 'week': (week, start_value), 'month': (month, start_value), 'year': (year, start_value), 'last': (ts, start_value)}
         return sun_times
 
+    def _init_aggregates(self):
+        """Create aggregates of the configured attributes and try to load their state from pickle"""
+
+        statistics = {}
+        for attribute in self.interface_config.aggregate_attributes:
+            if attribute in self.AGGREGATE_STATISTICS:
+                statistics[attribute] = self.AGGREGATE_STATISTICS[attribute]
+            else:
+                self.logger.warning(f"Aggregation of '{attribute}' not supported. Supported are {list(self.AGGREGATE_STATISTICS)}.")
+
+        # the state holds the start of each period, so no check of stop_time is needed: aggregates of past periods are reset with the next reading
+        raw_data = self._plugin_instance.read_pickle(self.PICKLE_FILENAME_AGGREGATES) if self.restore else None
+        data = raw_data.get('data') if isinstance(raw_data, dict) else None
+
+        if not isinstance(data, dict):
+            self.logger.info("Unable to load aggregates from pickle. Start with empty aggregates.")
+            data = None
+
+        return Aggregates(self.calendar, statistics, state=data)
+
+    def _init_counters(self) -> tuple:
+        """Try to load the last cumulative rain and lightning counters and the sums of their deltas from pickle. if not successful start empty"""
+
+        sums = {DataPoints.RAIN[0]: ('sum',), DataPoints.PIEZO_RAIN[0]: ('sum',), DataPoints.LIGHTNING_COUNT[0]: ('sum',)}
+
+        # counters are saved with field and timestamp and reconciled with the counter resets at the first packet, so they do not expire
+        raw_data = self._plugin_instance.read_pickle(self.PICKLE_FILENAME_COUNTERS) if self.restore else None
+        data = raw_data.get('data') if isinstance(raw_data, dict) else None
+
+        if isinstance(data, dict) and isinstance(data.get('counters'), dict):
+            return data['counters'], Aggregates(self.calendar, sums, periods=CalendarPeriods.PERIODS, state=data.get('sums'))
+
+        self.logger.info("Unable to load rain and lightning counters from pickle. Start with empty counters.")
+        return {}, Aggregates(self.calendar, sums, periods=CalendarPeriods.PERIODS)
+
     def save_all_relevant_data(self):
+        """Save the state to pickle; called at stop and as checkpoint while running"""
 
-        stop_time = int(time.time())
-        self._plugin_instance.save_pickle(self.PICKLE_FILENAME_AIRPRESSURE_3H, {'data': self.pressure_3h, 'stop_time': stop_time})
-        self._plugin_instance.save_pickle(self.PICKLE_FILENAME_AIRPRESSURE_LAST, {'data': self.pressure_last, 'stop_time': stop_time})
-        self._plugin_instance.save_pickle(self.PICKLE_FILENAME_SUNTIME, {'data': self.sun_time, 'stop_time': stop_time})
+        # take a consistent copy of the state and write it without blocking the post-processing
+        with self.lock:
+            stop_time = int(time.time())
+            snapshot = {self.PICKLE_FILENAME_AIRPRESSURE_LAST: {key: dict(value) for key, value in self.pressure_last.items()},
+                        self.PICKLE_FILENAME_SUNTIME: dict(self.sun_time),
+                        self.PICKLE_FILENAME_AGGREGATES: self.aggregates.get_state(),
+                        self.PICKLE_FILENAME_COUNTERS: {'counters': dict(self.counter_state), 'sums': self.counter_sums.get_state()},
+                        }
+            self.last_checkpoint = time.time()
+            self.checkpoint_requested = False
 
-    @staticmethod
-    def add_temp_data(data: dict) -> None:
+        for filename, data in snapshot.items():
+            self._plugin_instance.save_pickle(filename, {'data': data, 'stop_time': stop_time})
+
+        # readings are written to the ring files when they arrive; make sure they are on disk
+        for store in (self.pressure_store, self.wind_store):
+            if store:
+                store.flush()
+
+    def open_stores(self) -> None:
+        """Open the ring files closed by close_stores(); the readings in the windows are kept in memory meanwhile"""
+
+        with self.lock:
+            if self.pressure_store is None:
+                self.pressure_store = self._init_store(self.STORE_FILENAME_AIRPRESSURE, 1, 4096)
+            if self.wind_store is None:
+                self.wind_store = self._init_store(self.STORE_FILENAME_WIND, 3, 1024)
+
+    def close_stores(self) -> None:
+        """Write the ring files to disk and close them"""
+
+        with self.lock:
+            for store in (self.pressure_store, self.wind_store):
+                if store:
+                    store.close()
+            self.pressure_store = self.wind_store = None
+
+    def checkpoint_due(self, interval: int) -> bool:
+        """True if interval seconds have passed since the last save or a significant change requests a checkpoint"""
+
+        return self.checkpoint_requested or time.time() - self.last_checkpoint >= interval
+
+    def add_temp_data(self, data: dict) -> None:
         """
         Add calculated data to dict
 
         :param data: dict of parsed Ecowitt Gateway data
         """
 
+        meteo = self.meteo
+
         if DataPoints.OUTTEMP[0] in data:
 
             if DataPoints.WINDSPEED[0] in data:
-                data[DataPoints.WINDCHILL[0]] = get_windchill(data[DataPoints.OUTTEMP[0]], data[DataPoints.WINDSPEED[0]], units='metric')
+                data[DataPoints.WINDCHILL[0]] = meteo.get_windchill(data[DataPoints.OUTTEMP[0]], data[DataPoints.WINDSPEED[0]], units='metric')
 
             if DataPoints.OUTHUMI[0] in data:
-                data[DataPoints.OUTDEWPT[0]] = get_dew_point(data[DataPoints.OUTTEMP[0]], data[DataPoints.OUTHUMI[0]])
-                data[DataPoints.CLOUD_CEILING[0]] = get_cloud_ceiling(data[DataPoints.OUTTEMP[0]], data[DataPoints.OUTHUMI[0]])
-                data[DataPoints.OUTABSHUM[0]] = get_abs_hum(data[DataPoints.OUTTEMP[0]], data[DataPoints.OUTHUMI[0]])
-                data[DataPoints.HEATINDEX[0]] = get_heat_index(data[DataPoints.OUTTEMP[0]], data[DataPoints.OUTHUMI[0]], units='metric')
-                data[DataPoints.COMFORT[0]] = get_comfort_from_dewpoint(data[DataPoints.OUTDEWPT[0]])
-                data[DataPoints.CONDENSATION[0]] = condensation(data[DataPoints.OUTTEMP[0]], data[DataPoints.OUTHUMI[0]])[1]
+                # Magnus formula once per temperature / humidity pair
+                dew_point, abs_hum, cloud_ceiling, condensation_text = meteo.get_humidity_values(data[DataPoints.OUTTEMP[0]], data[DataPoints.OUTHUMI[0]])
+                data[DataPoints.OUTDEWPT[0]] = dew_point
+                data[DataPoints.CLOUD_CEILING[0]] = cloud_ceiling
+                data[DataPoints.OUTABSHUM[0]] = abs_hum
+                data[DataPoints.HEATINDEX[0]] = meteo.get_heat_index(data[DataPoints.OUTTEMP[0]], data[DataPoints.OUTHUMI[0]], units='metric')
+                data[DataPoints.COMFORT[0]] = meteo.get_comfort_from_dewpoint(dew_point)
+                data[DataPoints.CONDENSATION[0]] = condensation_text
 
             if DataPoints.WINDSPEED[0] in data and DataPoints.OUTHUMI[0] in data:
-                data[DataPoints.FEELS_LIKE[0]] = get_feels_like_temperature(data[DataPoints.OUTTEMP[0]], data[DataPoints.OUTHUMI[0]], data[DataPoints.WINDSPEED[0]], units='metric')
-                data[DataPoints.THERMOPHYSIOLOGICAL_STRAIN[0]] = get_thermophysiological_strain(data[DataPoints.FEELS_LIKE[0]])[1]
+                data[DataPoints.FEELS_LIKE[0]] = meteo.get_feels_like_temperature(data[DataPoints.OUTTEMP[0]], data[DataPoints.OUTHUMI[0]], data[DataPoints.WINDSPEED[0]], units='metric')
+                data[DataPoints.THERMOPHYSIOLOGICAL_STRAIN[0]] = meteo.get_thermophysiological_strain(data[DataPoints.FEELS_LIKE[0]])[1]
 
         if DataPoints.INTEMP[0] in data and DataPoints.INHUMI[0] in data:
-            data[DataPoints.INDEWPPOINT[0]] = get_dew_point(data[DataPoints.INTEMP[0]], data[DataPoints.INHUMI[0]])
-            data[DataPoints.INABSHUM[0]] = get_abs_hum(data[DataPoints.INTEMP[0]], data[DataPoints.INHUMI[0]])
+            data[DataPoints.INDEWPPOINT[0]], data[DataPoints.INABSHUM[0]], _, _ = meteo.get_humidity_values(data[DataPoints.INTEMP[0]], data[DataPoints.INHUMI[0]])
 
         for i in range(1, 9):
             if f'{MasterKeys.TEMP}{i}' in data and f'{MasterKeys.HUMID}{i}' in data:
-                data[f'{MasterKeys.DEWPT}{i}'] = get_dew_point(data[f'{MasterKeys.TEMP}{i}'], data[f'{MasterKeys.HUMID}{i}'])
-                data[f'{MasterKeys.ABSHUM}{i}'] = get_abs_hum(data[f'{MasterKeys.TEMP}{i}'], data[f'{MasterKeys.HUMID}{i}'])
+                data[f'{MasterKeys.DEWPT}{i}'], data[f'{MasterKeys.ABSHUM}{i}'], _, _ = meteo.get_humidity_values(data[f'{MasterKeys.TEMP}{i}'], data[f'{MasterKeys.HUMID}{i}'])
 
     def add_wind_data(self, data: dict) -> None:
         """
@@ -849,7 +1227,7 @@ class Gateway(object):
             data[DataPoints.WINDSPEED_BFT_TEXT[0]] = env.bft_to_text(windspeed_bft, self.interface_config.lang)
 
         if DataPoints.ABSBARO[0] in data:
-            data[DataPoints.WEATHER_TEXT[0]] = get_weather_now(data[DataPoints.ABSBARO[0]], self.interface_config.lang)
+            data[DataPoints.WEATHER_TEXT[0]] = self.meteo.get_weather_now(data[DataPoints.ABSBARO[0]], self.interface_config.lang)
                 
     def add_wind_avg(self, data: dict) -> None:
         """
@@ -858,42 +1236,45 @@ class Gateway(object):
         :param data: dict of parsed Ecowitt Gateway data
         """
 
-        if any(k in data for k in (DataPoints.WINDDIRECTION[0], DataPoints.WINDSPEED[0], DataPoints.GUSTSPEED[0])):
-            self.wind_avg10m.append([int(time.time()), data[DataPoints.WINDSPEED[0]], data[DataPoints.WINDDIRECTION[0]], data[DataPoints.GUSTSPEED[0]]])
+        if all(k in data for k in (DataPoints.WINDDIRECTION[0], DataPoints.WINDSPEED[0], DataPoints.GUSTSPEED[0])):
+            timestamp = data.get(MasterKeys.TIMESTAMP, int(time.time()))
+            self.wind_avg10m.append(timestamp, data[DataPoints.WINDSPEED[0]], data[DataPoints.WINDDIRECTION[0]], data[DataPoints.GUSTSPEED[0]])
+            if self.wind_store:
+                self.wind_store.append(timestamp, data[DataPoints.WINDSPEED[0]], data[DataPoints.WINDDIRECTION[0]], data[DataPoints.GUSTSPEED[0]])
 
             if DataPoints.WINDSPEED_AVG10M[0] not in data:
-                data[DataPoints.WINDSPEED_AVG10M[0]] = self.get_avg_wind(self.wind_avg10m, 1)
+                data[DataPoints.WINDSPEED_AVG10M[0]] = self.wind_avg10m.avg_speed
 
             if DataPoints.WINDDIR_AVG10M[0] not in data:
-                data[DataPoints.WINDDIR_AVG10M[0]] = self.get_avg_wind(self.wind_avg10m, 2)
+                data[DataPoints.WINDDIR_AVG10M[0]] = self.wind_avg10m.avg_direction
 
             if DataPoints.GUSTSPEED_AVG10M[0] not in data:
-                data[DataPoints.GUSTSPEED_AVG10M[0]] = self.get_max_wind(self.wind_avg10m, 3)
+                data[DataPoints.GUSTSPEED_AVG10M[0]] = self.wind_avg10m.max_gust
 
     def add_pressure_trend(self, data: dict) -> None:
-        """Fill deque for pressure trend and determine pressure trends etc"""
+        """Fill window for pressure trend and determine pressure trends etc"""
 
         VALUES = {-2: 'stark fallend', -1: 'fallend', 0: 'gleichbleibend', 1: 'steigend', 2: 'stark steigend'}
 
-        # feed deque
+        # feed window
         air_pressure_rel = data.get(DataPoints.RELBARO[0])
         if air_pressure_rel is not None:
-            self.pressure_3h.append([int(time.time()), air_pressure_rel])
-
-            # get index of current position of deque
-            pos_current = len(self.pressure_3h)
+            now = data.get(MasterKeys.TIMESTAMP, int(time.time()))
+            self.pressure_3h.append(now, air_pressure_rel)
+            if self.pressure_store:
+                self.pressure_store.append(now, air_pressure_rel)
 
             # calculate values für 1h and 3h ago
-            for x in [1, 3]:
-                # get position of data x hour before
-                pos_xh_ago = pos_current - int(x * 3600 / self.interface_config.api_data_cycle)
-
-                # calculation for x hour
-                if pos_xh_ago >= 0:
-                    self.logger.debug(f"calculate {x}h ago with {pos_xh_ago=}")
-                    time_xh_ago, air_pressure_rel_xh_ago = self.pressure_3h[pos_xh_ago]
+            for x, trend_window in self.pressure_trends.items():
+                # get data at or before x hour ago and the counts of the values since then
+                result = trend_window.update(now, air_pressure_rel)
+
+                # calculation for x hour, if the data is not too old
+                if result:
+                    time_xh_ago, air_pressure_rel_xh_ago, bigger, smaller, equal = result
+                    self.logger.debug(f"calculate {x}h ago with {time_xh_ago=}")
                     air_pressure_rel_diff_xh_ago = round(air_pressure_rel - air_pressure_rel_xh_ago, 1)
-                    air_pressure_rel_trend_xh_ago = self.get_trend(self.pressure_3h, pos_xh_ago, pos_current)
+                    air_pressure_rel_trend_xh_ago = self.get_trend_from_counts(bigger, smaller, equal, air_pressure_rel_diff_xh_ago, x == 3)
                     air_pressure_rel_trend_xh_ago_str = VALUES[air_pressure_rel_trend_xh_ago]
 
                     data[f'{DataPoints.AIR_PRESSURE_REL_DIFF_xh[0]}_{x}h'] = air_pressure_rel_diff_xh_ago
@@ -922,6 +1303,19 @@ class Gateway(object):
             data[DataPoints.SUN_DURATION_MONTH[0]] = sun_time[3]
             data[DataPoints.SUN_DURATION_YEAR[0]] = sun_time[4]
 
+    def add_aggregates(self, data: dict) -> None:
+        """
+        Add min, max and avg of the current day, week, month and year of the configured attributes to dict
+
+        :param data: dict of parsed Ecowitt Gateway data
+        """
+
+        timestamp = data.get(MasterKeys.TIMESTAMP, int(time.time()))
+        self.aggregates.update(data, timestamp)
+
+        # rain, piezo rain and lightning per hour, day, week, month and year from the deltas of the counters
+        self.counter_sums.update(data, timestamp)
+
     @staticmethod
     def check_ws_warning(data: dict, set_flag: bool) -> None:
         """
@@ -989,12 +1383,12 @@ class Gateway(object):
         if not self.piezo_rain_mapping_confirmed:
             # We have no field for calculating piezo rain so look for one, if device field 'p_rainyear' is present used that as our first
             # choice. Otherwise, work down the list in order of descending period.
-            if DataPoints.PIEZO_RAINYEAR in data:
-                self.piezo_rain_total_field = DataPoints.PIEZO_RAINYEAR
+            if DataPoints.PIEZO_RAINYEAR[0] in data:
+                self.piezo_rain_total_field = DataPoints.PIEZO_RAINYEAR[0]
                 self.piezo_rain_mapping_confirmed = True
             # rainyear is not present so now try rainmonth
-            elif DataPoints.PIEZO_RAINMONTH in data:
-                self.piezo_rain_total_field = DataPoints.PIEZO_RAINMONTH
+            elif DataPoints.PIEZO_RAINMONTH[0] in data:
+                self.piezo_rain_total_field = DataPoints.PIEZO_RAINMONTH[0]
                 self.piezo_rain_mapping_confirmed = True
             # do nothing, we can try again next packet
             else:
@@ -1016,16 +1410,28 @@ class Gateway(object):
         :type data: dict
         """
 
+        timestamp = data.get(MasterKeys.TIMESTAMP, int(time.time()))
+
+        # remember the month of the annual rain reset for reconciling rain_year after a restart
+        if DataPoints.RAIN_RST_YEAR[0] in data:
+            self.counter_state['rain_reset_year'] = data[DataPoints.RAIN_RST_YEAR[0]]
+
         # have we decided on a field to use and is the field present
         if self.rain_mapping_confirmed and self.rain_total_field in data:
             # yes on both counts, so get the new total
             new_total = data[self.rain_total_field]
+            # after a restart continue with the total saved at stop
+            if self.last_rain is None:
+                self.last_rain = self.get_restored_total('rain', self.rain_total_field, timestamp)
             # now calculate field rain as the difference between the new and old totals
             data[DataPoints.RAIN[0]] = self.delta_rain(new_total, self.last_rain)
+            if data[DataPoints.RAIN[0]]:
+                self.checkpoint_requested = True
 
             self.logger.info(f"calculate_rain: last_rain={self.last_rain} new_total={new_total} calculated rain={data['rain']}")
             # save the new total as the old total for next time
             self.last_rain = new_total
+            self.counter_state['rain'] = (self.rain_total_field, new_total, timestamp)
 
         # now do the same for piezo rain
 
@@ -1033,13 +1439,18 @@ class Gateway(object):
         if self.piezo_rain_mapping_confirmed and self.piezo_rain_total_field in data:
             # yes on both counts, so get the new total
             piezo_new_total = data[self.piezo_rain_total_field]
+            if self.piezo_last_rain is None:
+                self.piezo_last_rain = self.get_restored_total('piezo_rain', self.piezo_rain_total_field, timestamp)
             # now calculate field p_rain as the difference between the new and old totals
             data[DataPoints.PIEZO_RAIN[0]] = self.delta_rain(piezo_new_total, self.piezo_last_rain, descriptor='piezo rain')
+            if data[DataPoints.PIEZO_RAIN[0]]:
+                self.checkpoint_requested = True
 
             # log some pertinent values
             self.logger.info(f"calculate_rain: piezo_last_rain={self.piezo_last_rain} piezo_new_total={piezo_new_total} calculated p_rain={data['p_rain']}")
             # save the new total as the old total for next time
             self.piezo_last_rain = piezo_new_total
+            self.counter_state['piezo_rain'] = (self.piezo_rain_total_field, piezo_new_total, timestamp)
 
     def calculate_lightning_count(self, data: dict) -> None:
         """
@@ -1053,12 +1464,65 @@ class Gateway(object):
         """
 
         if DataPoints.LIGHTNING_COUNT[0] in data:
+            timestamp = data.get(MasterKeys.TIMESTAMP, int(time.time()))
             # yes, so get the new total
             new_total = data[DataPoints.LIGHTNING_COUNT[0]]
+            # after a restart continue with the count saved at stop
+            if self.last_lightning is None:
+                self.last_lightning = self.get_restored_total('lightning', DataPoints.LIGHTNING_COUNT[0], timestamp)
             # now calculate field lightning_strike_count as the difference between the new and old totals
             data[DataPoints.LIGHTNING_COUNT[0]] = self.delta_lightning(new_total, self.last_lightning)
+            if data[DataPoints.LIGHTNING_COUNT[0]]:
+                self.checkpoint_requested = True
             # save the new total as the old total for next time
             self.last_lightning = new_total
+            self.counter_state['lightning'] = (DataPoints.LIGHTNING_COUNT[0], new_total, timestamp)
+
+    def get_restored_total(self, counter: str, field: str, timestamp: int) -> Union[None, float]:
+        """
+        Get the total of a cumulative counter saved at last stop to calculate the delta of the first packet after a restart.
+
+        If the counter has been reset by the gateway since then, 0 is returned, so the current total is taken as delta. Rain and lightning before
+        the reset, but after the stop are lost.
+
+        :param counter:   'rain', 'piezo_rain' or 'lightning'
+        :param field:     field of the counter currently used
+        :param timestamp: timestamp of the current packet
+        """
+
+        state = self.counter_state.get(counter)
+        if not state or state[0] != field:
+            return None
+
+        _, total, last_timestamp = state
+        reset = self.get_last_counter_reset(field, timestamp)
+        if reset is not None and last_timestamp < reset <= timestamp:
+            self.logger.info(f"{field} has been reset since last stop at {datetime.fromtimestamp(last_timestamp)}: using current total as delta")
+            return 0
+        self.logger.info(f"Continue {field} with total of {total} saved at {datetime.fromtimestamp(last_timestamp)}")
+        return total
+
+    def get_last_counter_reset(self, field: str, timestamp: int) -> Union[None, int]:
+        """
+        Timestamp of the last reset of a cumulative counter by the gateway at or before timestamp; None for counters without periodic reset
+
+        rain_month is reset at the start of the month, rain_year at the start of the month given in rain_reset_year and the lightning count at the
+        start of the day.
+        """
+
+        hour_start, day_start, week_start, month_start, year_start = self.calendar.starts(timestamp)
+
+        if field in (DataPoints.RAINMONTH[0], DataPoints.PIEZO_RAINMONTH[0]):
+            return month_start
+        if field in (DataPoints.RAINYEAR[0], DataPoints.PIEZO_RAINYEAR[0]):
+            reset_month = self.counter_state.get('rain_reset_year', 1)
+            reset = datetime.fromtimestamp(year_start, self.calendar.tz).replace(month=reset_month)
+            if reset.timestamp() > timestamp:
+                reset = reset.replace(year=reset.year - 1)
+            return int(reset.timestamp())
+        if field == DataPoints.LIGHTNING_COUNT[0]:
+            return day_start
+        return None
 
     def delta_rain(self, rain: float, last_rain: float, descriptor: str = 'rain') -> Union[None, float]:
         """Calculate rainfall from successive cumulative values.
@@ -1148,12 +1612,13 @@ class Gateway(object):
                 s = d[i][w]
         return round(s, 1)
 
-    def get_trend(self, d: deque, start_pos: int, end_pos: int) -> int:
+    def get_trend(self, d: TimeWindow, start_pos: int, end_pos: int, is3h: bool) -> int:
         """Ermittelt den Trend des Luftdrucks auf Basis der Anzahl der Werte die kleine/equal/größer des Startwertes sind
 
-        :param d: deque mit tuple (timestamp, value)
-        :param start_pos: start pos in deque for evaluation
-        :param end_pos: end pos in deque for evaluation
+        :param d: TimeWindow mit tuple (timestamp, value)
+        :param start_pos: start pos in window for evaluation
+        :param end_pos: end pos in window for evaluation
+        :param is3h: window of 3h (else 1h) to select the thresholds
         :return trend: Trend: 2-stark steigend, 1-steigend, 0-equal, -1-fallend, -2-stark fallend
 
         bigger: Anzahl der Werte im Betrachtungszeitraum, die größer alse der Startwert sind
@@ -1164,7 +1629,6 @@ class Gateway(object):
         bigger = smaller = 0
         equal = 1
         end_pos -= 1
-        is3h = True if (end_pos - start_pos) * self.interface_config.api_data_cycle > 3600 else False
 
         # get start value
         start_value = d[start_pos][1]
@@ -1172,9 +1636,7 @@ class Gateway(object):
         # get diff value between start and end
         diff_value = round(d[end_pos][1] - d[start_pos][1], 1)
 
-        for i in range(start_pos, end_pos):
-            # get value to compare
-            vergleichswert = d[i][1]
+        for vergleichswert in d.values(start_pos, end_pos):
             # count all values which > first entry
             if vergleichswert > start_value:
                 bigger += 1
@@ -1185,6 +1647,20 @@ class Gateway(object):
             else:
                 equal += 1
 
+        trend = self.get_trend_from_counts(bigger, smaller, equal, diff_value, is3h)
+
+        s3hstr = "3h" if is3h else "1h"
+        self.logger.debug(f" {s3hstr} diff: {diff_value} hPa trend: {trend} // ({start_pos=} to {end_pos=}: {bigger=}, {smaller=},  {equal=}) ")
+
+        return trend
+
+    @staticmethod
+    def get_trend_from_counts(bigger: int, smaller: int, equal: int, diff_value: float, is3h: bool) -> int:
+        """Ermittelt den Trend des Luftdrucks aus der Anzahl der Werte, die größer/kleiner/gleich des Startwertes sind, und der Differenz
+
+        :return trend: Trend: 2-stark steigend, 1-steigend, 0-equal, -1-fallend, -2-stark fallend
+        """
+
         # if most values are bigger than first entry then rising
         if bigger > smaller and bigger > equal:
             trend = 1
@@ -1199,13 +1675,13 @@ class Gateway(object):
         else:
             trend = 0
 
-        s3hstr = "3h" if is3h else "1h"
-        self.logger.debug(f" {s3hstr} diff: {diff_value} hPa trend: {trend} // ({start_pos=} to {end_pos=}: {bigger=}, {smaller=},  {equal=}) ")
-
         return trend
 
-    def get_storm_warning(self):
-        """Create storm warning flag based on pressure differences"""
+    def get_storm_warning(self, now: int = None):
+        """Create storm warning flag based on pressure differences
+
+        :param now: timestamp of the data; current time if not given
+        """
 
         def what(_pressure_diff):
             return "dropped" if _pressure_diff < 0 else "risen"
@@ -1213,7 +1689,8 @@ class Gateway(object):
         storm_warning_1h = storm_warning_3h = False
         air_pressure_rel_diff_1h_ago = self.pressure_last['diff'].get('1', 0)
         air_pressure_rel_diff_3h_ago = self.pressure_last['diff'].get('3', 0)
-        now = int(time.time())
+        if now is None:
+            now = int(time.time())
 
         if abs(air_pressure_rel_diff_1h_ago) > Constants.STORM_WARNDIFF_1H:
             storm_warning_1h = True
@@ -1326,22 +1803,23 @@ class Gateway(object):
             return
 
         # get basic values
-        day_of_year = self._plugin_instance.shtime.day_of_year()
-        azimut_radians, elevation_radians = self._plugin_instance.get_sh().sun.pos()
-        elevation_degrees = math.degrees(elevation_radians)
-        timestamp = int(time.time())
+        timestamp = data.get(MasterKeys.TIMESTAMP, int(time.time()))
         last_timestamp, last_sun_sec_last = self.sun_time['last']
+        if self.solar_table:
+            # elevation and threshold interpolated from the table of the day
+            elevation_degrees, solar_threshold = self.solar_table.lookup(timestamp)
+        else:
+            azimut_radians, elevation_radians = self._plugin_instance.get_sh().sun.pos()
+            elevation_degrees = math.degrees(elevation_radians)
+            solar_threshold = None
 
         # evaluate sun shine and calc sun sec since last call
         if elevation_degrees <= 3 or solar_radiation < Constants.SUN_MIN:
             sun_sec = 0
         else:
-            solar_threshold = int(
-                    (0.73 + 0.06 * math.cos((math.pi / 180) * 360 * day_of_year / 365))
-                    * 1080
-                    * pow((math.sin(math.pi / 180 * elevation_degrees)), 1.25)
-                    * Constants.SUN_COEF
-                    )
+            if solar_threshold is None:
+                solar_threshold = sunshine_threshold(elevation_degrees, self._plugin_instance.shtime.day_of_year(), Constants.SUN_COEF)
+            solar_threshold = int(solar_threshold)
 
             if solar_radiation > solar_threshold:
                 sun_sec = timestamp - last_timestamp
@@ -1356,11 +1834,7 @@ class Gateway(object):
             new_dict = {'last': (timestamp, sun_sec_last)}
             result = None
         else:
-            year = self._plugin_instance.shtime.current_year(offset=0)
-            month = self._plugin_instance.shtime.current_month(offset=0)
-            week = self._plugin_instance.shtime.calendar_week(offset=0)
-            day = self._plugin_instance.shtime.current_day(offset=0)
-            hour = self._plugin_instance.shtime.now().hour
+            hour, day, week, month, year = self.calendar.starts(timestamp)
 
             last_hour, last_sun_sec_hour = self.sun_time['hour']
             last_day, last_sun_sec_day = self.sun_time['day']
@@ -1418,6 +1892,8 @@ class Gateway(object):
 
 class GatewayDriver(Gateway):
 
+    MAC_LOOKUP_MAX_BACKOFF = 3600       # max seconds between tries to get the MAC address to identify the uploads of the gateway
+
     def __init__(self, plugin_instance):
 
         # get instance
@@ -1447,10 +1923,23 @@ class GatewayDriver(Gateway):
                 self.logger.debug('Ecowitt Gateway does not support interface via HTTP requests')
             self.http = None
 
+        # further stations uploading via ECOWITT protocol by station id; the gateway itself is handled directly
+        self.stations = {}
+        self._primary_station_ids = None
+        self._mac_lookup_retry = 0                                         # time of next try to get the MAC address; None after success
+        self._mac_lookup_backoff = 60
+
         # get a GatewayTCP object to handle data from server upload
         if self.interface_config.post_server_ip and self.interface_config.post_server_port:
             self.logger.info('Init connection to Ecowitt Gateway via HTTP Post')
-            self.tcp = GatewayTcp(plugin_instance, self.get_current_tcp_data)
+            workers = self.interface_config.post_server_workers
+            if workers and not reuse_port_supported():
+                self.logger.warning(f"{workers} upload workers configured, but SO_REUSEPORT is not supported by this platform. Uploads will be received within the plugin process.")
+                workers = 0
+            if workers:
+                self.tcp = UploadWorkerPool(plugin_instance, self.get_current_tcp_data, workers)
+            else:
+                self.tcp = GatewayTcp(plugin_instance, self.get_current_tcp_data)
         else:
             if DebugLogConfig.gateway:
                 self.logger.debug('Interface via HTTP Post not activated')
@@ -1465,6 +1954,12 @@ class GatewayDriver(Gateway):
                 _msg = 'Legacy WH40 detected, WH40 battery state data will be reported'
             self.logger.info(_msg)
 
+    @property
+    def sensors(self):
+        """Sensors object holding the current sensor id data"""
+
+        return self.api.sensors
+
     #############################################################
     #  Data Collections and Update Methods
     #############################################################
@@ -1531,14 +2026,77 @@ class GatewayDriver(Gateway):
 
         self._plugin_instance.data_queue.put(('http', self._post_process_data(parsed_data)))
 
-    def get_current_tcp_data(self, parsed_data: dict) -> None:
-        """callback function for already parsed live data from tcp upload and put it to queue."""
+    def get_current_tcp_data(self, parsed_data: dict, station_id: str = None, client_ip: str = None) -> None:
+        """callback function for already parsed live data from tcp upload and put it to queue.
+
+        Uploads of the gateway itself are put to queue with source 'post'. Uploads of further stations are post-processed by their own
+        GatewayStation and put to queue with source 'post.<station_id>'; unknown stations are registered.
+        """
 
         if DebugLogConfig.gateway:
-            self.logger.debug(f"POST: {parsed_data=}")
-        self._plugin_instance.data_queue.put(('post', self._post_process_data(parsed_data)))
+            self.logger.debug(f"POST: {station_id=}, {client_ip=}, {parsed_data=}")
+
+        if station_id is None or self.is_primary_station(station_id, client_ip):
+            self._plugin_instance.data_queue.put(('post', self._post_process_data(parsed_data)))
+            return
+
+        station = self.stations.get(station_id)
+        if station is None:
+            station = self._register_station(station_id, client_ip)
+            if station is None:
+                return
+        self._plugin_instance.data_queue.put((station.source, station.process(parsed_data, client_ip)))
+
+    def _register_station(self, station_id: str, client_ip: str = None):
+        """Create GatewayStation for a new station if accepted; the least recently seen station is removed if post_server_max_stations is reached"""
+
+        allowed_stations = self.interface_config.post_server_stations
+        max_stations = self.interface_config.post_server_max_stations
+        if (allowed_stations and station_id not in allowed_stations) or not max_stations:
+            if DebugLogConfig.gateway:
+                self.logger.debug(f"Upload of station {station_id} from {client_ip} ignored; station not accepted.")
+            return None
+
+        while len(self.stations) >= max_stations:
+            oldest = min(self.stations, key=lambda sid: self.stations[sid].last_seen or 0)
+            del self.stations[oldest]
+            self.logger.info(f"Station {oldest} removed, as {max_stations} stations are registered.")
+
+        station = self.stations[station_id] = GatewayStation(self._plugin_instance, station_id, client_ip)
+        self.logger.info(f"New station {station_id} uploading from {client_ip} registered. Use 'foshk_station: {station_id}' to bind items to its data.")
+        return station
+
+    @property
+    def primary_station_ids(self) -> set:
+        """Station ids of the gateway itself: the PASSKEY of its uploads (MD5 of the MAC address) and its IP address."""
+
+        # while the MAC address is unknown, the IP address is used and the lookup is retried with increasing backoff, not with every upload
+        if self._mac_lookup_retry is not None and time.time() >= self._mac_lookup_retry:
+            self._mac_lookup_retry = time.time() + self._mac_lookup_backoff
+            ids = {self.ip_address}
+            try:
+                ids.add(station_id_from_mac(self.mac_address))
+            except GatewayIOError as e:
+                self.logger.warning(f"Unable to get MAC address of gateway to identify its uploads: {e}. Next try in {self._mac_lookup_backoff}s.")
+                self._mac_lookup_backoff = min(self._mac_lookup_backoff * 2, self.MAC_LOOKUP_MAX_BACKOFF)
+            else:
+                self._mac_lookup_retry = None
+            self._primary_station_ids = ids
+        return self._primary_station_ids
+
+    def is_primary_station(self, station_id: str, client_ip: str = None) -> bool:
+        """Return True, if the upload comes from the gateway itself"""
+
+        ids = self.primary_station_ids
+        return station_id in ids or client_ip in ids
         
     def _post_process_data(self, data: dict, master: bool = False) -> dict:
+        """Post-process parsed data; serialised with the checkpoints of the state"""
+
+        with self.lock:
+            return self._process_packet(data, master)
+
+    def _process_packet(self, data: dict, master: bool = False) -> dict:
 
         packet = {}
 
@@ -1568,6 +2126,9 @@ class GatewayDriver(Gateway):
             # add pressure trend
             self.add_pressure_trend(data)
 
+            # add min, max and avg per calendar period
+            self.add_aggregates(data)
+
         # add calculated data
         self.add_temp_data(data)
         self.add_wind_data(data)
@@ -1575,15 +2136,15 @@ class GatewayDriver(Gateway):
 
         if self.interface_config.show_sensor_warning:
             # add sensor warning data field
-            self.check_sensors(data, self.api.sensors.get_connected_addresses())
+            self.check_sensors(data, self.sensors.get_connected_addresses())
 
         if self.interface_config.show_battery_warning:
             # add battery warning data field
-            self.check_battery(data, self.api.sensors.get_battery_description_data())
+            self.check_battery(data, self.sensors.get_battery_description_data())
 
         if self.interface_config.show_storm_warning:
             # add storm warning data field
-            data[DataPoints.STORM_WARNING[0]] = self.get_storm_warning()
+            data[DataPoints.STORM_WARNING[0]] = self.get_storm_warning(data.get(MasterKeys.TIMESTAMP, packet.get(MasterKeys.TIMESTAMP)))
 
         if self.interface_config.show_leakage_warning:
             # add leakage warning data field
@@ -1770,6 +2331,202 @@ class GatewayDriver(Gateway):
         return result
 
 
+class GatewayStation(GatewayDriver):
+    """Further station uploading via ECOWITT protocol to the plugin.
+
+    Each station has its own derived data state (rain, lightning, wind average, pressure trend etc.). As the uploads are the only source of a
+    station, they are post-processed like the API data of the gateway. Sensor, battery and firmware warnings need the API and are not available.
+    """
+
+    def __init__(self, plugin_instance, station_id: str, client_ip: str = None):
+
+        # get instance
+        self._plugin_instance = plugin_instance
+        self.logger = self._plugin_instance.logger
+
+        # own interface config: the data windows follow the upload cycle, warnings based on the API are disabled
+        self.interface_config = replace(self._plugin_instance.interface_config,
+                                        api_data_cycle=self._plugin_instance.interface_config.post_server_cycle or self._plugin_instance.interface_config.api_data_cycle,
+                                        show_sensor_warning=False,
+                                        show_battery_warning=False,
+                                        show_fw_update_available=False,
+                                        fw_check_crontab=None)
+
+        # now initialize Gateway; there is no saved data of a station
+        Gateway.__init__(self, plugin_instance, restore=False, interface_config=self.interface_config)
+
+        self.api = None
+        self.http = None
+        self.tcp = None
+        self.station_id = station_id
+        self.client_ip = client_ip
+        self.model = None
+        self.last_seen = None
+        self.packets = 0
+
+    @property
+    def source(self) -> str:
+        """Source of the data of the station used for item matching"""
+
+        return f'post.{self.station_id}'
+
+    @property
+    def sensors(self):
+        return None
+
+    def process(self, data: dict, client_ip: str = None) -> dict:
+        """Post-process the parsed upload of the station and return the packet"""
+
+        if client_ip:
+            self.client_ip = client_ip
+        self.model = data.get(DataPoints.MODEL[0], self.model)
+        self.last_seen = int(time.time())
+        self.packets += 1
+        return self._post_process_data(data, True)
+
+    def save_all_relevant_data(self):
+        pass
+
+
+class GatewayReplay(GatewayDriver):
+    """Gateway driver without device connection replaying raw data recorded by RawDataRecorder.
+
+    The recorded API frames, HTTP responses and post bodies are run through the same parsers and the same post-processing as live data, the
+    resulting packets are handed to the callback together with their source. API frames are grouped like get_current_api_data() does: a live data
+    frame starts a new packet, the following rain and sensor id frames complete it. The packet is post-processed with the next live data frame
+    or at the end of the replay.
+    """
+
+    def __init__(self, plugin_instance, callback):
+
+        # get instance
+        self._plugin_instance = plugin_instance
+        self.logger = self._plugin_instance.logger
+
+        # get interface config
+        self.interface_config = self._plugin_instance.interface_config
+
+        # now initialize Gateway without the data saved at last stop, the replay starts from scratch
+        Gateway.__init__(self, plugin_instance, restore=False)
+
+        # no device connection; parse raw data directly
+        self.api = None
+        self.http = None
+        self.tcp = None
+        self.api_parser = ApiParser(plugin_instance)
+        self.http_parser = HttpParser(plugin_instance)
+        self.tcp_parser = TcpParser(plugin_instance)
+        self.wu_parser = WuParser(plugin_instance)
+        self._sensors = Sensors(plugin_instance=plugin_instance)
+
+        self.callback = callback
+        self.records = 0
+        self.packets = 0
+        self._api_packet = None
+
+    @property
+    def sensors(self):
+        """Sensors object holding the replayed sensor id data"""
+
+        return self._sensors
+
+    def replay(self, records, speed: float = 1.0, stop_event: threading.Event = None) -> int:
+        """Replay records and return the number of packets created.
+
+        :param records:     iterable of RawRecord, eg. read_log(filename)
+        :param speed:       acceleration against real time (2 means double speed); 0 replays as fast as possible
+        :param stop_event:  event to abort the replay
+        """
+
+        if stop_event is None:
+            stop_event = threading.Event()
+
+        first_ts = start = None
+        for record in records:
+            if speed > 0:
+                if first_ts is None:
+                    first_ts = record.timestamp
+                    start = time.monotonic()
+                delay = (record.timestamp - first_ts) / speed - (time.monotonic() - start)
+                if delay > 0 and stop_event.wait(delay):
+                    break
+            if stop_event.is_set():
+                break
+
+            try:
+                self.process_record(record)
+            except Exception as e:
+                self.logger.warning(f"Replay of {record.source} record from {timestamp_to_string(int(record.timestamp))} failed: {e!r}")
+
+        self.flush()
+        return self.packets
+
+    def process_record(self, record: RawRecord) -> None:
+        """Parse one record and post-process the data if complete"""
+
+        self.records += 1
+
+        if record.source == 'api':
+            self._process_api_frame(record)
+
+        elif record.source == 'http':
+            if record.tag == 'get_livedata_info':
+                data = self.http_parser.parse_livedata(json.loads(record.payload))
+                # the parser stamps the time of parsing; use the time of receipt instead
+                data['timestamp'] = int(record.timestamp)
+                self._emit('http', data, record.timestamp)
+
+        elif record.source == 'post':
+            self._emit('post', self.tcp_parser.parse_live_data(record.payload.decode(), record.tag), record.timestamp)
+
+        elif record.source == 'wu':
+            self._emit('post', self.wu_parser.parse_live_data(record.payload.decode(), record.tag), record.timestamp)
+
+    def flush(self) -> None:
+        """Post-process the pending API packet"""
+
+        if self._api_packet is not None:
+            data, self._api_packet = self._api_packet, None
+            self._emit('api', data, master=True)
+
+    def _process_api_frame(self, record: RawRecord) -> None:
+
+        frame = record.payload
+
+        # skip invalid responses; they were retried in live operation
+        if len(frame) < 6 or frame[:2] != GatewayApi.HEADER or frame[2:3].hex() != record.tag or GatewayApi._calc_checksum(frame[2:-1]) != frame[-1]:
+            if DebugLogConfig.gateway:
+                self.logger.debug(f"Replay: skip invalid API response '{bytes_to_hex(frame)}'")
+            return
+
+        cmd_code = frame[2:3]
+        if cmd_code == GatewayApi.API_COMMANDS['CMD_GW1000_LIVEDATA']:
+            self.flush()
+            data = self.api_parser.parse_livedata(frame)
+            data.setdefault(DataPoints.TIME[0], datetime.fromtimestamp(int(record.timestamp)))
+            data.setdefault(MasterKeys.TIMESTAMP, int(record.timestamp))
+            self._api_packet = data
+
+        elif self._api_packet is None:
+            return
+
+        elif cmd_code == GatewayApi.API_COMMANDS['CMD_READ_RAIN']:
+            self._api_packet.update(self.api_parser.parse_read_rain(frame))
+
+        elif cmd_code == GatewayApi.API_COMMANDS['CMD_READ_SENSOR_ID_NEW']:
+            self.sensors.set_sensor_id_data(frame)
+            self._api_packet.update(self.sensors.get_battery_and_signal_data())
+
+    def _emit(self, source: str, data: dict, timestamp: float = None, master: bool = False) -> None:
+
+        if timestamp is not None:
+            data.setdefault(DataPoints.TIME[0], datetime.fromtimestamp(int(timestamp)))
+            data.setdefault(MasterKeys.TIMESTAMP, int(timestamp))
+
+        self.packets += 1
+        self.callback(source, self._post_process_data(data, master))
+
+
 class GatewayApi(object):
     """Class to interact with a gateway device via the Ecowitt LAN/Wi-Fi Gateway API.
 
@@ -1853,6 +2610,9 @@ class GatewayApi(object):
         self.socket_timeout = self.interface_config.socket_timeout
         self.broadcast_timeout = self.interface_config.broadcast_timeout
 
+        # get the recorder for raw data, if activated
+        self.recorder = self._plugin_instance.raw_recorder
+
         # get a parser object to parse any API data
         self.parser = ApiParser(plugin_instance)
 
@@ -1930,61 +2690,6 @@ class GatewayApi(object):
         Construct a list of dicts with details of unique (MAC address) devices that responded. When complete return the list of devices found.
         """
 
-        def decode_broadcast_response(raw_data):
-            """Decode a broadcast response and return the results as a dict.
-
-            A device response to a CMD_BROADCAST API command consists of a number of control structures around a payload of a data. The API
-            response is structured as follows:
-                bytes 0-1 incl                  preamble, literal 0xFF 0xFF
-                byte 2                          literal value 0x12
-                bytes 3-4 incl                  payload size (big endian short integer)
-                bytes 5-5+payload size incl     data payload (details below)
-                byte 6+payload size             checksum
-
-            The data payload is structured as follows:
-                bytes 0-5 incl      device MAC address
-                bytes 6-9 incl      device IP address
-                bytes 10-11 incl    device port number
-                bytes 11-           device AP SSID
-
-            Note: The device AP SSID for a given device is fixed in size but this size can vary from device to device and across firmware versions.
-
-            There also seems to be a peculiarity in the CMD_BROADCAST response data payload whereby the first character of the device AP SSID is a
-            non-printable ASCII character. The WSView app appears to ignore or not display this character nor does it appear to be used elsewhere.
-            Consequently, this character is ignored.
-
-            raw_data:   a bytestring containing a validated (structure and checksum verified) raw data response to the CMD_BROADCAST API command
-
-            Returns a dict with decoded data keyed as follows:
-                'mac':          device MAC address (string)
-                'ip_address':   device IP address (string)
-                'port':         device port number (integer)
-                'ssid':         device AP SSID (string)
-            """
-
-            # obtain the response size, it's a big endian short (two byte) integer
-            resp_size = struct.unpack('>H', raw_data[3:5])[0]
-            # now extract the actual data payload
-            data = raw_data[5:resp_size + 2]
-            # initialise a dict to hold our result
-            data_dict = dict()
-            # extract and decode the MAC address
-            data_dict['mac'] = bytes_to_hex(data[0:6], separator=":")
-            # extract and decode the IP address
-            data_dict['ip_address'] = '%d.%d.%d.%d' % struct.unpack('>BBBB', data[6:10])
-            # extract and decode the port number
-            data_dict['port'] = struct.unpack('>H', data[10: 12])[0]
-            # get the SSID as a bytestring
-            ssid_b = data[13:]
-            # create a format string so the SSID string can be unpacked into its bytes, remember the length can vary
-            ssid_format = "B" * len(ssid_b)
-            # unpack the SSID bytestring, we now have a tuple of integers representing each of the bytes
-            ssid_t = struct.unpack(ssid_format, ssid_b)
-            # convert the sequence of bytes to unicode characters and assemble as a string and return the result
-            data_dict['ssid'] = "".join([chr(x) for x in ssid_t])
-            # return the result dict
-            return data_dict
-
         # create a socket object to broadcast to the network via IPv4 UDP
         s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         s.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
@@ -2020,13 +2725,69 @@ class GatewayApi(object):
                 except Exception as e:
                     self.logger.error(f"Unexpected exception occurred while checking response to command 'CMD_BROADCAST': {e}")
                 else:
-                    device = decode_broadcast_response(response)
+                    device = self.decode_broadcast_response(response)
                     if not any((d['mac'] == device['mac']) for d in result_list):
                         device['model'] = self.get_model_from_ssid(device.get('ssid'))
                         result_list.append(device)
         s.close()
         return result_list
 
+    @staticmethod
+    def decode_broadcast_response(raw_data):
+        """Decode a broadcast response and return the results as a dict.
+
+        A device response to a CMD_BROADCAST API command consists of a number of control structures around a payload of a data. The API
+        response is structured as follows:
+            bytes 0-1 incl                  preamble, literal 0xFF 0xFF
+            byte 2                          literal value 0x12
+            bytes 3-4 incl                  payload size (big endian short integer)
+            bytes 5-5+payload size incl     data payload (details below)
+            byte 6+payload size             checksum
+
+        The data payload is structured as follows:
+            bytes 0-5 incl      device MAC address
+            bytes 6-9 incl      device IP address
+            bytes 10-11 incl    device port number
+            bytes 11-           device AP SSID
+
+        Note: The device AP SSID for a given device is fixed in size but this size can vary from device to device and across firmware versions.
+
+        There also seems to be a peculiarity in the CMD_BROADCAST response data payload whereby the first character of the device AP SSID is a
+        non-printable ASCII character. The WSView app appears to ignore or not display this character nor does it appear to be used elsewhere.
+        Consequently, this character is ignored.
+
+        raw_data:   a bytestring containing a validated (structure and checksum verified) raw data response to the CMD_BROADCAST API command
+
+        Returns a dict with decoded data keyed as follows:
+            'mac':          device MAC address (string)
+            'ip_address':   device IP address (string)
+            'port':         device port number (integer)
+            'ssid':         device AP SSID (string)
+        """
+
+        # obtain the response size, it's a big endian short (two byte) integer
+        resp_size = struct.unpack('>H', raw_data[3:5])[0]
+        # now extract the actual data payload
+        data = raw_data[5:resp_size + 2]
+        # initialise a dict to hold our result
+        data_dict = dict()
+        # extract and decode the MAC address
+        data_dict['mac'] = bytes_to_hex(data[0:6], separator=":")
+        # extract and decode the IP address
+        data_dict['ip_address'] = '%d.%d.%d.%d' % struct.unpack('>BBBB', data[6:10])
+        # extract and decode the port number
+        data_dict['port'] = struct.unpack('>H', data[10: 12])[0]
+        # get the SSID as a bytestring
+        ssid_b = data[13:]
+        # create a format string so the SSID string can be unpacked into its bytes, remember the length can vary
+        ssid_format = "B" * len(ssid_b)
+        # unpack the SSID bytestring, we now have a tuple of integers representing each of the bytes
+        ssid_t = struct.unpack(ssid_format, ssid_b)
+        # convert the sequence of bytes to unicode characters and assemble as a string and return the result
+        data_dict['ssid'] = "".join([chr(x) for x in ssid_t])
+        # return the result dict
+        return data_dict
+
     def rediscover(self) -> bool:
         """Attempt to rediscover a lost device.
 
@@ -2642,6 +3403,8 @@ class GatewayApi(object):
                 response = s.recv(1024)
                 if DebugLogConfig.api:
                     self.logger.debug(f"Received response '{bytes_to_hex(response)}'")
+                if self.recorder:
+                    self.recorder.record('api', packet[2:3].hex(), response)
                 return response
             except socket.error as e:
                 self.logger.warning(f"Socket Error {e!r} occurred.")
@@ -4053,6 +4816,7 @@ class GatewayHttp(object):
         self.port = self.interface_config.port
         self.timeout = self.interface_config.request_timeout
         self._session = requests.Session()
+        self.recorder = self._plugin_instance.raw_recorder
 
         self.parser = HttpParser(plugin_instance)
 
@@ -4091,6 +4855,8 @@ class GatewayHttp(object):
             if status_code == 200:
                 if DebugLogConfig.http:
                     self.logger.debug("Sending HTTP request successful")
+                if self.recorder:
+                    self.recorder.record('http', cmd, rsp.content)
                 if result == 'json':
                     try:
                         data = rsp.json()
@@ -4283,22 +5049,30 @@ class GatewayHttp(object):
 class HttpParser(object):
     """Class to parse Ecowitt Gateway sensor data."""
 
-    # dict to match channels to senors
+    # dict to match channels to senors; name is the prefix of the battery key
     sensor_names = {
-        'common_list': {'name': MasterKeys.WN34, 'batt_fn': 'batt_int'},
-        'piezoRain':   {'name': MasterKeys.WS90, 'batt_fn': 'batt_int'},
-        'lightning':   {'name': MasterKeys.WH57, 'batt_fn': 'batt_int'},
-        'co2':         {'name': MasterKeys.WH45, 'batt_fn': 'batt_int'},
-        'wh25':        {'name': MasterKeys.WH25, 'batt_fn': 'batt_int'},
-        'ch_pm25':     {'name': MasterKeys.WH41, 'batt_fn': 'batt_int'},
-        'ch_leak':     {'name': MasterKeys.WH55, 'batt_fn': 'batt_int'},
-        'ch_aisle':    {'name': MasterKeys.WH31, 'batt_fn': 'batt_int'},
-        'ch_soil':     {'name': MasterKeys.WH51, 'batt_fn': 'batt_int'},
-        'ch_temp':     {'name': MasterKeys.WN30, 'batt_fn': 'batt_int'},
-        'ch_leaf':     {'name': MasterKeys.WN35, 'batt_fn': 'batt_int'},
-        'rain':        {'name': MasterKeys.WH65, 'batt_fn': 'batt_int'},
+        'common_list': {'name': MasterKeys.WN34,    'batt_fn': 'batt_int'},
+        'piezoRain':   {'name': SensorKeys.WS90[0], 'batt_fn': 'batt_int'},
+        'lightning':   {'name': SensorKeys.WH57[0], 'batt_fn': 'batt_int'},
+        'co2':         {'name': SensorKeys.WH45[0], 'batt_fn': 'batt_int'},
+        'wh25':        {'name': SensorKeys.WH25[0], 'batt_fn': 'batt_int'},
+        'ch_pm25':     {'name': SensorKeys.WH41[0], 'batt_fn': 'batt_int'},
+        'ch_leak':     {'name': SensorKeys.WH55[0], 'batt_fn': 'batt_int'},
+        'ch_aisle':    {'name': SensorKeys.WH31[0], 'batt_fn': 'batt_int'},
+        'ch_soil':     {'name': SensorKeys.WH51[0], 'batt_fn': 'batt_int'},
+        'ch_temp':     {'name': SensorKeys.WN30[0], 'batt_fn': 'batt_int'},
+        'ch_leaf':     {'name': SensorKeys.WN35[0], 'batt_fn': 'batt_int'},
+        'rain':        {'name': SensorKeys.WH65[0], 'batt_fn': 'batt_int'},
     }
 
+    # sections of the live data response and how their entries are structured
+    id_sections = ('common_list', 'rain', 'piezoRain')                                          # list of {'id', 'val', 'unit', 'battery'}
+    detail_sections = ('wh25', 'lightning', 'co2')                                              # list of {detail: value}
+    channel_sections = ('ch_pm25', 'ch_leak', 'ch_soil', 'ch_temp', 'ch_leaf', 'ch_aisle')      # list of {'channel', detail: value}
+
+    # prefix of the keys per section
+    section_prefix = {'piezoRain': MasterKeys.PIEZO}
+
     http_live_data_struct = {
         '0x01': DataPoints.INTEMP[0],
         '0x02': DataPoints.OUTTEMP[0],
@@ -4338,6 +5112,7 @@ class HttpParser(object):
         'count': DataPoints.LIGHTNING_COUNT[0],
         'distance': DataPoints.LIGHTNING_DIST[0],
         'timestamp': DataPoints.LIGHTNING_TIME[0],
+        'date': DataPoints.LIGHTNING_TIME[0],
         'abs': DataPoints.ABSBARO[0],
         'inhumi': DataPoints.INHUMI[0],
         'intemp': DataPoints.INTEMP[0],
@@ -4349,6 +5124,16 @@ class HttpParser(object):
         'battery': None,
     }
 
+    # converters to metric units; units in lower case
+    unit_converters = {
+        'f': f_to_c,
+        'mph': mph_to_ms,
+        'km/h': kmh_to_ms,
+        'in': in_to_mm,
+        'in/hr': in_to_mm,
+        'inhg': in_to_hpa,
+    }
+
     def __init__(self, plugin_instance):
 
         # get instance
@@ -4361,127 +5146,159 @@ class HttpParser(object):
         # do we log unknown fields at info or leave at debug
         self.log_unknown_fields = self.interface_config.log_unknown_fields
 
+        # keys compiled from http_live_data_struct: (section, id or detail, channel) -> key; completed on first use of a channel
+        self._keys = self.compile_keys()
+
+        # parse time statistics of parse_livedata in seconds
+        self.parse_count = 0
+        self.parse_time_last = 0.0
+        self.parse_time_total = 0.0
+        self.parse_time_max = 0.0
+
+    @classmethod
+    def compile_keys(cls) -> dict:
+        """Compile the target keys of all known sections and details without channel."""
+
+        keys = {}
+        for section in cls.id_sections + cls.detail_sections:
+            prefix = cls.section_prefix.get(section, '')
+            for detail, key in cls.http_live_data_struct.items():
+                keys[(section, detail, None)] = f"{prefix}{key}" if key else None
+            keys[(section, 'battery', None)] = f"{cls.sensor_names[section]['name']}{MasterKeys.BATTERY_EXTENTION}"
+        return keys
+
+    def _channel_key(self, section: str, detail: str, channel) -> Union[str, None]:
+        """Return the key for a detail of a channel sensor and remember it"""
+
+        if detail == 'battery':
+            key = f"{self.sensor_names[section]['name']}{channel}{MasterKeys.BATTERY_EXTENTION}"
+        else:
+            key = self.http_live_data_struct.get(detail)
+            if key:
+                key = f"{key}{channel}"
+        self._keys[(section, detail, channel)] = key
+        return key
+
+    @property
+    def parse_time_avg(self) -> float:
+        """Average parse time of parse_livedata in seconds"""
+
+        return self.parse_time_total / self.parse_count if self.parse_count else 0.0
+
     def parse_livedata(self, data: dict):
         """
         Parse raw sensor live data from get_request.
         Parse the raw sensor data and create a dict of sensor observations/status data. Add a timestamp to the data if one does not already exist.
         """
 
-        def parse_value(_val: str, unit: str = None, convert_to_si: bool = True):
-
-            if unit:
-                _val = f"{_val} {unit}"
-
-            try:
-                _value = float(_val)
-                if _value % 1 == 0:
-                    _value = int(_value)
-            except ValueError:
-                _value = _val.lstrip()
-                if _value == 'None':
-                    return
-                elif _value.endswith('%'):
-                    _value = parse_value(_value[:-1])
-                elif ' ' in _value:
-                    _value_var = _value.split(' ')
-                    _value = parse_value(_value_var[0])
-                    _unit = _value_var[1].lower()
-
-                    if convert_to_si:
-                        if _unit == 'mph':
-                            _value = mph_to_ms(_value)
-                        elif _unit == 'in':
-                            _value = in_to_mm(_value)
-                        elif _unit == 'inHg':
-                            _value = in_to_hpa(_value)
-                        elif _unit == 'f':
-                            _value = f_to_c(_value)
-                        elif _unit == 'mph':
-                            _value = mph_to_ms(_value)
-            return _value
+        start = time.perf_counter()
 
+        keys = self._keys
+        parse_value = self.parse_value
         data_dict = dict()
+        unknown = []
 
-        for entry in data:
+        for section, sensors in data.items():
             # parse sensor using sensor id
-            if entry in ['common_list', 'rain', 'piezoRain']:
-                for sensor in data[entry]:
-                    key = self.http_live_data_struct.get(sensor['id'])
+            if section in self.id_sections:
+                for sensor in sensors:
+                    key = keys.get((section, sensor.get('id'), None))
                     value = parse_value(sensor.get('val'), sensor.get('unit'))
                     if key:
-                        data_dict.update({key: value})
+                        data_dict[key] = value
                     else:
-                        self.logger.info(f"Parsing for {sensor['id']=} not defined. {key=}, {value=}")
+                        unknown.append((section, sensor.get('id'), value))
 
                     battery = sensor.get('battery')
                     if battery:
-                        data_dict.update({f"{self.sensor_names[entry]['name'][0]}{MasterKeys.BATTERY_EXTENTION}": parse_value(battery)})
-
-            # parse wh25
-            elif entry in ['wh25']:
-                for sensor in data[entry]:
-                    for detail in sensor:
-                        key = self.http_live_data_struct.get(detail)
-                        if detail == 'intemp':
-                            value = parse_value(sensor[detail], sensor.get('unit'))
-                        else:
-                            value = parse_value(sensor[detail])
+                        data_dict[keys[(section, 'battery', None)]] = self.batt_int(parse_value(battery))
+
+            # parse sensors without channel and sensors with channels
+            elif section in self.detail_sections or section in self.channel_sections:
+                for sensor in sensors:
+                    channel = parse_value(sensor.get('channel')) if section in self.channel_sections else None
+                    unit = sensor.get('unit')
+                    for detail, raw_value in sensor.items():
+                        try:
+                            key = keys[(section, detail, channel)]
+                        except KeyError:
+                            key = self._channel_key(section, detail, channel) if channel is not None else None
+
+                        if key is None:
+                            if detail not in self.http_live_data_struct:
+                                unknown.append((section, detail, raw_value))
+                            continue
 
-                        if key and value is not None:
-                            data_dict.update({key: value})
-                        else:
-                            self.logger.info(f"Parsing for {detail=} not defined. {key=}, {value=}")
-
-            # parse sensors without channel
-            elif entry in ['lightning', 'co2']:
-                for sensor in data[entry]:
-                    for detail in sensor:
-                        if 'battery' in detail:
-                            key = f"{self.sensor_names[entry]['name'][0]}{MasterKeys.BATTERY_EXTENTION}"
-                            raw_value = parse_value(sensor[detail])
-                            batt_fn = self.sensor_names[entry]['batt_fn']
-                            value = getattr(self, batt_fn)(raw_value)
-                        else:
-                            key = self.http_live_data_struct[detail]
-                            if detail in ['temp']:
-                                value = parse_value(sensor[detail], sensor.get('unit'))
-                            else:
-                                value = parse_value(sensor[detail])
-
-                        if key and value is not None:
-                            data_dict.update({key: value})
+                        if detail == 'battery':
+                            value = self.batt_int(parse_value(raw_value))
+                        elif 'temp' in detail:
+                            value = parse_value(raw_value, unit)
                         else:
-                            self.logger.info(f"Parsing for {detail=} not defined. {key=}, {value=}")
-
-            # parse sensors with channels
-            elif entry in ['ch_pm25', 'ch_leak', 'ch_soil', 'ch_temp', 'ch_leaf', 'ch_aisle']:
-                for sensor in data[entry]:
-                    channel = parse_value(sensor.get("channel"))
-                    for detail in sensor:
-                        value = None
-                        if 'battery' in detail:
-                            key = f"{self.sensor_names[entry]['name'][0]}{channel}{MasterKeys.BATTERY_EXTENTION}"
-                            raw_value = parse_value(sensor[detail])
-                            batt_fn = self.sensor_names[entry]['batt_fn']
-                            value = getattr(self, batt_fn)(raw_value)
-                        else:
-                            key = self.http_live_data_struct.get(detail)
-                            if key:
-                                key = f"{key}{channel}"
-                                if 'temp' in detail:
-                                    value = parse_value(sensor[detail], sensor.get('unit'))
-                                else:
-                                    value = parse_value(sensor[detail])
-
-                        if key and value is not None:
-                            data_dict.update({key: value})
-                        else:
-                            self.logger.info(f"Parsing for {detail=} not defined. {key=}, {value=}")
+                            value = parse_value(raw_value)
+
+                        if value is not None:
+                            data_dict[key] = value
+
+            else:
+                unknown.append((section, None, None))
+
+        if unknown:
+            _msg = f"Parsing for (section, detail, value) {unknown} not defined."
+            if self.log_unknown_fields:
+                self.logger.info(_msg)
+            elif DebugLogConfig.http:
+                self.logger.debug(_msg)
+
+        data_dict['timestamp'] = int(time.time())
 
-        data_dict.update({'timestamp': int(time.time())})
+        # update parse time statistics
+        self.parse_time_last = time.perf_counter() - start
+        self.parse_time_total += self.parse_time_last
+        self.parse_time_max = max(self.parse_time_max, self.parse_time_last)
+        self.parse_count += 1
+        if DebugLogConfig.http:
+            self.logger.debug(f"parse_livedata took {self.parse_time_last * 1000:.2f}ms (avg {self.parse_time_avg * 1000:.2f}ms, max {self.parse_time_max * 1000:.2f}ms)")
 
         return data_dict
 
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def parse_value(value: str, unit: str = None):
+        """Convert a value of the live data like '15.2' with unit 'F', '83%' or '5.40 km/h' to a number in metric units.
+
+        A unit within the value takes precedence over the given unit. Non-numeric values are returned as string, 'None' as None. The results
+        are memoised, since most values repeat between polls.
+        """
+
+        if value is None:
+            return None
+
+        # newer firmware may send numbers as json numbers
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            number = value
+        else:
+            value = str(value).strip()
+            if value == 'None':
+                return None
+
+            if value.endswith('%'):
+                value = value[:-1]
+            elif ' ' in value:
+                value, _, unit = value.partition(' ')
+
+            try:
+                number = float(value)
+            except ValueError:
+                return value
+        if number % 1 == 0:
+            number = int(number)
+
+        if unit:
+            converter = HttpParser.unit_converters.get(unit.lower())
+            if converter:
+                return converter(number)
+        return number
+
     @staticmethod
     def parse_version(data: dict) -> str:
         """extract current firmware version"""
@@ -4553,7 +5370,9 @@ class GatewayTcp(object):
         self._plugin_instance = plugin_instance
         self.logger = self._plugin_instance.logger
         self.parser = TcpParser(plugin_instance)
+        self.wu_parser = WuParser(plugin_instance)
         self.callback = callback
+        self.recorder = self._plugin_instance.raw_recorder
 
         # get interface config
         self.interface_config = self._plugin_instance.interface_config
@@ -4561,12 +5380,24 @@ class GatewayTcp(object):
         # define server thread
         self._server_thread = None
 
+        # received uploads as (raw data, client ip, receive timestamp) waiting for the parse thread
+        self._receive_queue = queue.Queue(maxsize=self.interface_config.post_server_queue_size)
+        self._parse_thread = None
+        self.received = 0
+        self.dropped = 0
+        self._dropping = False
+        self._lock = threading.Lock()                                      # counters are updated by the concurrent handler threads
+
+        # filter for uploads sent more than once and limiter of the upload rate per client ip
+        self.duplicate_filter = DuplicateFilter(self.interface_config.post_server_dedupe_ttl)
+        self.rate_limiter = RateLimiter(self.interface_config.post_server_rate_limit / 60, self.interface_config.post_server_rate_burst)
+
         # log the relevant settings/parameters we are using
         if DebugLogConfig.tcp:
             self.logger.debug("Starting GatewayTcp")
 
         # get tcp server object
-        self.tcp_server = GatewayTcp.TCPServer(self.make_handler(self.parse_tcp_live_data), plugin_instance)
+        self.tcp_server = GatewayTcp.TCPServer(self.make_handler(self.receive_tcp_live_data), plugin_instance)
         
     def run_server(self):
         self.tcp_server.run()
@@ -4576,7 +5407,16 @@ class GatewayTcp(object):
         self.tcp_server = None
 
     def startup(self):
-        """Start a thread that collects data from the Ecowitt Gateway TCP."""
+        """Start the threads that receive and parse data from the Ecowitt Gateway TCP."""
+
+        try:
+            self._parse_thread = threading.Thread(target=self.run_parser)
+            self._parse_thread.setDaemon(True)
+            self._parse_thread.setName('plugins.' + self._plugin_instance.get_fullname() + '.Gateway-TCP-Parser')
+            self._parse_thread.start()
+        except threading.ThreadError:
+            self.logger.error("Unable to launch Gateway-TCP-Parser thread")
+            self._parse_thread = None
 
         try:
             self._server_thread = threading.Thread(target=self.run_server)
@@ -4589,7 +5429,7 @@ class GatewayTcp(object):
             self._server_thread = None
 
     def shutdown(self):
-        """Shut down the thread that collects data from the Ecowitt Gateway TCP."""
+        """Shut down the threads that receive and parse data from the Ecowitt Gateway TCP."""
 
         if self._server_thread:
             self._server_thread.join(10)
@@ -4599,46 +5439,174 @@ class GatewayTcp(object):
                 self.logger.info("Gateway-TCP-Server thread has been shutdown.")
         self._server_thread = None
 
-    def parse_tcp_live_data(self, data: str, client_ip: str) -> None:
+        if self._parse_thread:
+            # the parse thread works off the uploads received so far and stops at the sentinel
+            self._receive_queue.put(None)
+            self._parse_thread.join(10)
+            if self._parse_thread.is_alive():
+                self.logger.error("Unable to shut down Gateway-TCP-Parser thread")
+        self._parse_thread = None
+
+    def receive_tcp_live_data(self, data: str, client_ip: str, protocol: str = 'post') -> None:
+        """Receive stage called by the request handler; only queues the upload, so the server thread never waits for parsing.
+
+        :param protocol:    'post' for ECOWITT protocol, 'wu' for Wunderground protocol
+        """
+
+        with self._lock:
+            self.received += 1
+        if self.duplicate_filter.is_duplicate(data):
+            if DebugLogConfig.tcp:
+                self.logger.debug(f"Duplicate upload from {client_ip} dropped.")
+            return
+
+        try:
+            self._receive_queue.put_nowait((data, client_ip, time.time(), protocol))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+                dropped = self.dropped
+                # warn once per overload, not for every dropped upload
+                warn = not self._dropping
+                self._dropping = True
+            if warn:
+                self.logger.warning(f"Upload from {client_ip} dropped, {self._receive_queue.maxsize} uploads are waiting for parsing. {dropped} uploads dropped so far.")
+        else:
+            # the overload is over, once the parse stage has caught up
+            if self._dropping and self._receive_queue.qsize() < self._receive_queue.maxsize // 2:
+                with self._lock:
+                    self._dropping = False
+
+    def run_parser(self) -> None:
+        """Parse stage working off the receive queue until the sentinel None is read."""
+
+        while True:
+            entry = self._receive_queue.get()
+            if entry is None:
+                return
+            try:
+                self.parse_tcp_live_data(*entry)
+            except Exception as e:
+                self.logger.error(f"Error while parsing upload from {entry[1]}: {e}")
+
+    @property
+    def queue_size(self) -> int:
+        """Number of received uploads waiting for parsing."""
+
+        return self._receive_queue.qsize()
+
+    @property
+    def statistics(self) -> dict:
+        """Counters of the upload server"""
+
+        return {'received': self.received,
+                'dropped': self.dropped,
+                'duplicates': self.duplicate_filter.duplicates,
+                'throttled': self.rate_limiter.throttled,
+                'queue_size': self.queue_size}
+
+    def parse_tcp_live_data(self, data: str, client_ip: str, timestamp: float = None, protocol: str = 'post') -> None:
 
         if DebugLogConfig.tcp:
-            self.logger.debug(f"raw post_data={data}")
+            self.logger.debug(f"raw {protocol} data={obfuscate_passwords(data)}")
+
+        if self.recorder:
+            self.recorder.record(protocol, client_ip, data, timestamp)
 
-        data_dict = self.parser.parse_live_data(data, client_ip)
+        parser = self.wu_parser if protocol == 'wu' else self.parser
+        data_dict = parser.parse_live_data(data, client_ip)
+
+        # the upload may have waited in the receive queue; stamp it with the time of receipt
+        if timestamp is not None:
+            data_dict.setdefault(MasterKeys.TIMESTAMP, int(timestamp))
 
         if DebugLogConfig.tcp:
             self.logger.debug(f"parsed post_data={data_dict}")
 
-        self.callback(data_dict)
+        self.callback(data_dict, parser.get_station_id(data, client_ip), client_ip)
+
+    def make_handler(self, receive_method):
 
-    def make_handler(self, parse_method):
+        logger = self.logger
+        max_size = self.interface_config.post_server_max_size
+        rate_limiter = self.rate_limiter
 
         class RequestHandler(BaseHTTPRequestHandler):
-            def reply(self):
-                ok_answer = "OK\n"
-                self.send_response(200)
-                self.send_header("Content-Length", str(len(ok_answer)))
+
+            # HTTP/1.1 keeps the connection open for further uploads; every response needs a Content-Length
+            protocol_version = 'HTTP/1.1'
+
+            # socket timeout for reading a request; also closes idle keep-alive connections
+            timeout = self.interface_config.post_server_timeout
+
+            # header and body of the reply are written separately; avoid the Nagle/delayed ACK stall on kept alive connections
+            disable_nagle_algorithm = True
+
+            def reply(self, code: int = 200, answer: str = "OK\n"):
+                self.send_response(code)
+                self.send_header("Content-Type", "text/plain")
+                self.send_header("Content-Length", str(len(answer)))
                 self.end_headers()
-                self.wfile.write(ok_answer.encode())
+                self.wfile.write(answer.encode())
+
+            def throttled(self) -> bool:
+                """Reply 429 and close the connection without reading the request, if the client exceeds the rate limit"""
+
+                if rate_limiter.allow(self.client_address[0]):
+                    return False
+                if DebugLogConfig.tcp:
+                    logger.debug(f"Upload from {self.client_address[0]} exceeds the rate limit; rejected.")
+                self.close_connection = True
+                self.reply(429, "Too Many Requests\n")
+                return True
 
             def do_POST(self):
-                length = int(self.headers["Content-Length"])
-                post_data = self.rfile.read(length).decode()
+                if self.throttled():
+                    return
+
+                try:
+                    length = int(self.headers.get("Content-Length", ''))
+                except ValueError:
+                    self.close_connection = True
+                    self.reply(411, "Length Required\n")
+                    return
+
+                if not 0 <= length <= max_size:
+                    logger.warning(f"POST from {self.client_address[0]} with {length} bytes exceeds the limit of {max_size} bytes; rejected.")
+                    self.close_connection = True
+                    self.reply(413, "Payload Too Large\n")
+                    return
+
+                post_data = self.rfile.read(length).decode(errors='replace')
                 self.reply()
-                parse_method(post_data,  self.client_address[0])
+                receive_method(post_data, self.client_address[0])
 
             def do_PUT(self):
-                pass
+                self.close_connection = True
+                self.reply(405, "Method Not Allowed\n")
 
             def do_GET(self):
+                # upload in Wunderground protocol; ID and PASSWORD are mandatory
                 data = urlparse.urlparse(self.path).query
-                self.reply()
+                if 'ID=' in data and 'PASSWORD=' in data:
+                    if self.throttled():
+                        return
+                    self.reply(200, "success\n")
+                    receive_method(data, self.client_address[0], 'wu')
+                else:
+                    self.reply()
+
+            def log_message(self, format, *args):
+                if DebugLogConfig.tcp:
+                    logger.debug(f"TCP Server: {self.address_string()} - {format % args}")
 
         return RequestHandler
 
-    class TCPServer(socketserver.TCPServer):
+    class TCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+        """HTTP server for the ecowitt protocol upload handling each connection in its own thread."""
 
         daemon_threads = True
+        block_on_close = False
         allow_reuse_address = True
 
         def __init__(self, handler, plugin_instance):
@@ -4655,6 +5623,12 @@ class GatewayTcp(object):
             self.logger.info(f"Init FoshkPlugin TCP Server at {address}:{port}")
             socketserver.TCPServer.__init__(self, (address, int(port)), handler)
 
+        def server_bind(self):
+            # several worker processes share the port; the kernel distributes the connections
+            if self.interface_config.post_server_reuse_port:
+                self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+            socketserver.TCPServer.server_bind(self)
+
         def run(self):
             if DebugLogConfig.tcp:
                 self.logger.debug("Start FoshkPlugin TCP Server")
@@ -4670,6 +5644,144 @@ class GatewayTcp(object):
 class TcpParser(object):
     """Class to parse Ecowitt Gateway sensor data coming via HTTP Post."""
 
+    # PASSKEY of the uploading station
+    passkey_re = re.compile(r'(?:^|&)PASSKEY=([^&\r\n]*)')
+
+    # key of the post data: (decoder, field); decoder gets the value converted by to_number(); decoder given as str is a method of TcpParser
+    # or a function of this module, defined after the class
+    tcp_live_data_struct = {
+        # Generic
+        'client_ip': (None, None),
+        'PASSKEY': (None, None),
+        'stationtype': (None, DataPoints.FIRMWARE[0]),
+        'freq': ('decode_freq', DataPoints.FREQ[0]),
+        'model': (None, DataPoints.MODEL[0]),
+        'dateutc': ('utcdatetimestr_to_datetime', DataPoints.TIME[0]),
+        'runtime': (None, DataPoints.RUNTIME[0]),
+        'interval': (None, DataPoints.INTERVAL[0]),
+        # Indoor
+        'tempinf': (f_to_c, DataPoints.INTEMP[0]),
+        'humidityin': (None, DataPoints.INHUMI[0]),
+        'baromrelin': (in_to_hpa, DataPoints.RELBARO[0]),
+        'baromabsin': (in_to_hpa, DataPoints.ABSBARO[0]),
+        # WH 65 / WH24
+        'tempf': (f_to_c, DataPoints.OUTTEMP[0]),
+        'humidity': (None, DataPoints.OUTHUMI[0]),
+        'winddir': (None, DataPoints.WINDDIRECTION[0]),
+        'windspeedmph': (mph_to_ms, DataPoints.WINDSPEED[0]),
+        'windgustmph': (mph_to_ms, DataPoints.GUSTSPEED[0]),
+        'maxdailygust': (mph_to_ms, DataPoints.DAYLWINDMAX[0]),
+        'solarradiation': (None, DataPoints.UV[0]),
+        'uv': (None, DataPoints.UVI[0]),
+        'rainratein': (in_to_mm, DataPoints.RAINRATE[0]),
+        'eventrainin': (in_to_mm, DataPoints.RAINEVENT[0]),
+        'hourlyrainin': (in_to_mm, DataPoints.RAINHOUR[0]),
+        'dailyrainin': (in_to_mm, DataPoints.RAINDAY[0]),
+        'weeklyrainin': (in_to_mm, DataPoints.RAINWEEK[0]),
+        'monthlyrainin': (in_to_mm, DataPoints.RAINMONTH[0]),
+        'yearlyrainin': (in_to_mm, DataPoints.RAINYEAR[0]),
+        'totalrainin': (in_to_mm, DataPoints.RAINTOTALS[0]),
+        'wh65batt': (None, f'wh65{MasterKeys.BATTERY_EXTENTION}'),
+        # WH31
+        'temp1f': (f_to_c, DataPoints.TEMP1[0]),
+        'humidity1': (None, DataPoints.HUMI1[0]),
+        'batt1': (None, f'wh31_ch1{MasterKeys.BATTERY_EXTENTION}'),
+        'temp2f': (f_to_c, DataPoints.TEMP2[0]),
+        'humidity2': (None, DataPoints.HUMI2[0]),
+        'batt2': (None, f'wh31_ch2{MasterKeys.BATTERY_EXTENTION}'),
+        'temp3f': (f_to_c, DataPoints.TEMP3[0]),
+        'humidity3': (None, DataPoints.HUMI3[0]),
+        'batt3': (None, f'wh31_ch3{MasterKeys.BATTERY_EXTENTION}'),
+        'temp4f': (f_to_c, DataPoints.TEMP4[0]),
+        'humidity4': (None, DataPoints.HUMI4[0]),
+        'batt4': (None, f'wh31_ch4{MasterKeys.BATTERY_EXTENTION}'),
+        'temp5f': (f_to_c, DataPoints.TEMP5[0]),
+        'humidity5': (None, DataPoints.HUMI5[0]),
+        'batt5': (None, f'wh31_ch5{MasterKeys.BATTERY_EXTENTION}'),
+        'temp6f': (f_to_c, DataPoints.TEMP6[0]),
+        'humidity6': (None, DataPoints.HUMI6[0]),
+        'batt6': (None, f'wh31_ch6{MasterKeys.BATTERY_EXTENTION}'),
+        'temp7f': (f_to_c, DataPoints.TEMP7[0]),
+        'humidity7': (None, DataPoints.HUMI7[0]),
+        'batt7': (None, f'wh31_ch7{MasterKeys.BATTERY_EXTENTION}'),
+        'temp8f': (f_to_c, DataPoints.TEMP8[0]),
+        'humidity8': (None, DataPoints.HUMI8[0]),
+        'batt8': (None, f'wh31_ch8{MasterKeys.BATTERY_EXTENTION}'),
+        # WN51
+        'soilmoisture1': (None, DataPoints.SOILMOISTURE1[0]),
+        'soilmoisture2': (None, DataPoints.SOILMOISTURE2[0]),
+        'soilmoisture3': (None, DataPoints.SOILMOISTURE3[0]),
+        'soilmoisture4': (None, DataPoints.SOILMOISTURE4[0]),
+        'soilmoisture5': (None, DataPoints.SOILMOISTURE5[0]),
+        'soilmoisture6': (None, DataPoints.SOILMOISTURE6[0]),
+        'soilmoisture7': (None, DataPoints.SOILMOISTURE7[0]),
+        'soilmoisture8': (None, DataPoints.SOILMOISTURE8[0]),
+        'soilbatt1': (None, f'wh51_ch1{MasterKeys.BATTERY_EXTENTION}'),
+        'soilbatt2': (None, f'wh51_ch2{MasterKeys.BATTERY_EXTENTION}'),
+        'soilbatt3': (None, f'wh51_ch3{MasterKeys.BATTERY_EXTENTION}'),
+        'soilbatt4': (None, f'wh51_ch4{MasterKeys.BATTERY_EXTENTION}'),
+        'soilbatt5': (None, f'wh51_ch5{MasterKeys.BATTERY_EXTENTION}'),
+        'soilbatt6': (None, f'wh51_ch6{MasterKeys.BATTERY_EXTENTION}'),
+        'soilbatt7': (None, f'wh51_ch7{MasterKeys.BATTERY_EXTENTION}'),
+        'soilbatt8': (None, f'wh51_ch8{MasterKeys.BATTERY_EXTENTION}'),
+        # WH34
+        'tf_ch1': (f_to_c, DataPoints.TF_USR1[0]),
+        'tf_ch2': (f_to_c, DataPoints.TF_USR2[0]),
+        'tf_ch3': (f_to_c, DataPoints.TF_USR3[0]),
+        'tf_ch4': (f_to_c, DataPoints.TF_USR4[0]),
+        'tf_ch5': (f_to_c, DataPoints.TF_USR5[0]),
+        'tf_ch6': (f_to_c, DataPoints.TF_USR6[0]),
+        'tf_ch7': (f_to_c, DataPoints.TF_USR7[0]),
+        'tf_ch8': (f_to_c, DataPoints.TF_USR8[0]),
+        # WH45
+        'tf_co2': (f_to_c, DataPoints.SENSOR_CO2_TEMP[0]),
+        'humi_co2': (None, DataPoints.SENSOR_CO2_HUM[0]),
+        'pm10_co2': (None, DataPoints.SENSOR_CO2_PM10[0]),
+        'pm10_24h_co2': (None, DataPoints.SENSOR_CO2_PM10_24[0]),
+        'pm25_co2': (None, DataPoints.SENSOR_CO2_PM255[0]),
+        'pm25_24h_co2': (None, DataPoints.SENSOR_CO2_PM255_24[0]),
+        'co2': (None, DataPoints.SENSOR_CO2_CO2[0]),
+        'co2_24h': (None, DataPoints.SENSOR_CO2_CO2_24[0]),
+        'co2_batt': (None, f'wh45{MasterKeys.BATTERY_EXTENTION}'),
+        # WH41 / WH43
+        'pm25_ch1': (None, DataPoints.PM251[0]),
+        'pm25_avg_24h_ch1': (None, DataPoints.PM25_24H_AVG1[0]),
+        'pm25batt1': ('to_int', f'pm251{MasterKeys.BATTERY_EXTENTION}'),
+        'pm25_ch2': (None, DataPoints.PM252[0]),
+        'pm25_avg_24h_ch2': (None, DataPoints.PM25_24H_AVG2[0]),
+        'pm25batt2': ('to_int', f'pm252{MasterKeys.BATTERY_EXTENTION}'),
+        'pm25_ch3': (None, DataPoints.PM253[0]),
+        'pm25_avg_24h_ch3': (None, DataPoints.PM25_24H_AVG3[0]),
+        'pm25batt3': ('to_int', f'pm253{MasterKeys.BATTERY_EXTENTION}'),
+        'pm25_ch4': (None, DataPoints.PM254[0]),
+        'pm25_avg_24h_ch4': (None, DataPoints.PM25_24H_AVG4[0]),
+        'pm25batt4': ('to_int', f'pm254{MasterKeys.BATTERY_EXTENTION}'),
+        # WH55
+        'leak_ch1': (Utils.to_bool, DataPoints.LEAK1[0]),
+        'leak_ch2': (Utils.to_bool, DataPoints.LEAK2[0]),
+        'leak_ch3': (Utils.to_bool, DataPoints.LEAK3[0]),
+        'leak_ch4': (Utils.to_bool, DataPoints.LEAK4[0]),
+        'leakbatt1': (None, f'wh55_ch1{MasterKeys.BATTERY_EXTENTION}'),
+        'leakbatt2': (None, f'wh55_ch2{MasterKeys.BATTERY_EXTENTION}'),
+        'leakbatt3': (None, f'wh55_ch3{MasterKeys.BATTERY_EXTENTION}'),
+        'leakbatt4': (None, f'wh55_ch4{MasterKeys.BATTERY_EXTENTION}'),
+        # WH25
+        'wh25batt': ('to_int', f'wh25{MasterKeys.BATTERY_EXTENTION}'),
+        # WH26
+        'wh26batt': ('to_int', f'wh26{MasterKeys.BATTERY_EXTENTION}'),
+        # WH57
+        'lightning_day': (None, DataPoints.LIGHTNING_COUNT[0]),
+        'lightning_distance': (None, DataPoints.LIGHTNING_DIST[0]),
+        'lightning_time': (None, DataPoints.LIGHTNING_TIME[0]),
+        # WH68
+        'wh68batt': ('to_float', f'wh68{MasterKeys.BATTERY_EXTENTION}'),
+        # WH40
+        'wh40batt': ('to_float', f'wh40{MasterKeys.BATTERY_EXTENTION}'),
+    }
+
+    # tcp_live_data_struct compiled to key: (field, converter of the raw string value), see compile_struct()
+    _compiled_struct = None
+
     def __init__(self, plugin_instance):
 
         # get instance
@@ -4682,183 +5794,86 @@ class TcpParser(object):
         # do we log unknown fields at info or leave at debug
         self.log_unknown_fields = self.interface_config.log_unknown_fields
 
+        # compile the struct once for all instances of the class
+        cls = type(self)
+        if cls.__dict__.get('_compiled_struct') is None:
+            cls._compiled_struct = cls.compile_struct()
+
+    @classmethod
+    def compile_struct(cls) -> dict:
+        """Compile tcp_live_data_struct to a dict of key: (field, converter) with the converter taking the raw string value.
+
+        Keys without field are omitted; they are known but not used.
+        """
+
+        compiled = {}
+        for key, (decoder, field) in cls.tcp_live_data_struct.items():
+            if field is None:
+                continue
+            if isinstance(decoder, str):
+                decoder = getattr(cls, decoder, None) or globals()[decoder]
+            if decoder is None:
+                converter = cls.to_number
+            else:
+                def converter(value, _decoder=decoder, _to_number=cls.to_number):
+                    return _decoder(_to_number(value))
+            compiled[key] = (field, converter)
+        return compiled
+
     def parse_live_data(self, data, client_ip):
         """Parse the ecowitt data and add it to a dictionary."""
 
-        tcp_live_data_struct = {
-            # Generic
-            'client_ip': (None, None),
-            'PASSKEY': (None, None),
-            'stationtype': (None, DataPoints.FIRMWARE[0]),
-            'freq': ('decode_freq', DataPoints.FREQ[0]),
-            'model': (None, DataPoints.MODEL[0]),
-            'dateutc': (utcdatetimestr_to_datetime, DataPoints.TIME[0]),
-            'runtime': (None, DataPoints.RUNTIME[0]),
-            'interval': (None, DataPoints.INTERVAL[0]),
-            # Indoor
-            'tempinf': (f_to_c, DataPoints.INTEMP[0]),
-            'humidityin': (None, DataPoints.INHUMI[0]),
-            'baromrelin': (in_to_hpa, DataPoints.RELBARO[0]),
-            'baromabsin': (in_to_hpa, DataPoints.ABSBARO[0]),
-            # WH 65 / WH24
-            'tempf': (f_to_c, DataPoints.OUTTEMP[0]),
-            'humidity': (None, DataPoints.OUTHUMI[0]),
-            'winddir': (None, DataPoints.WINDDIRECTION[0]),
-            'windspeedmph': (mph_to_ms, DataPoints.WINDSPEED[0]),
-            'windgustmph': (mph_to_ms, DataPoints.GUSTSPEED[0]),
-            'maxdailygust': (mph_to_ms, DataPoints.DAYLWINDMAX[0]),
-            'solarradiation': (None, DataPoints.UV[0]),
-            'uv': (None, DataPoints.UVI[0]),
-            'rainratein': (in_to_mm, DataPoints.RAINRATE[0]),
-            'eventrainin': (in_to_mm, DataPoints.RAINEVENT[0]),
-            'hourlyrainin': (in_to_mm, DataPoints.RAINHOUR[0]),
-            'dailyrainin': (in_to_mm, DataPoints.RAINDAY[0]),
-            'weeklyrainin': (in_to_mm, DataPoints.RAINWEEK[0]),
-            'monthlyrainin': (in_to_mm, DataPoints.RAINMONTH[0]),
-            'yearlyrainin': (in_to_mm, DataPoints.RAINYEAR[0]),
-            'totalrainin': (in_to_mm, DataPoints.RAINTOTALS[0]),
-            'wh65batt': (None, f'wh65{MasterKeys.BATTERY_EXTENTION}'),
-            # WH31
-            'temp1f': (f_to_c, DataPoints.TEMP1[0]),
-            'humidity1': (None, DataPoints.HUMI1[0]),
-            'batt1': (None, f'wh31_ch1{MasterKeys.BATTERY_EXTENTION}'),
-            'temp2f': (f_to_c, DataPoints.TEMP2[0]),
-            'humidity2': (None, DataPoints.HUMI2[0]),
-            'batt2': (None, f'wh31_ch2{MasterKeys.BATTERY_EXTENTION}'),
-            'temp3f': (f_to_c, DataPoints.TEMP3[0]),
-            'humidity3': (None, DataPoints.HUMI3[0]),
-            'batt3': (None, f'wh31_ch3{MasterKeys.BATTERY_EXTENTION}'),
-            'temp4f': (f_to_c, DataPoints.TEMP4[0]),
-            'humidity4': (None, DataPoints.HUMI4[0]),
-            'batt4': (None, f'wh31_ch4{MasterKeys.BATTERY_EXTENTION}'),
-            'temp5f': (f_to_c, DataPoints.TEMP5[0]),
-            'humidity5': (None, DataPoints.HUMI5[0]),
-            'batt5': (None, f'wh31_ch5{MasterKeys.BATTERY_EXTENTION}'),
-            'temp6f': (f_to_c, DataPoints.TEMP6[0]),
-            'humidity6': (None, DataPoints.HUMI6[0]),
-            'batt6': (None, f'wh31_ch6{MasterKeys.BATTERY_EXTENTION}'),
-            'temp7f': (f_to_c, DataPoints.TEMP7[0]),
-            'humidity7': (None, DataPoints.HUMI7[0]),
-            'batt7': (None, f'wh31_ch7{MasterKeys.BATTERY_EXTENTION}'),
-            'temp8f': (f_to_c, DataPoints.TEMP8[0]),
-            'humidity8': (None, DataPoints.HUMI8[0]),
-            'batt8': (None, f'wh31_ch8{MasterKeys.BATTERY_EXTENTION}'),
-            # WN51
-            'soilmoisture1': (None, DataPoints.SOILMOISTURE1[0]),
-            'soilmoisture2': (None, DataPoints.SOILMOISTURE2[0]),
-            'soilmoisture3': (None, DataPoints.SOILMOISTURE3[0]),
-            'soilmoisture4': (None, DataPoints.SOILMOISTURE4[0]),
-            'soilmoisture5': (None, DataPoints.SOILMOISTURE5[0]),
-            'soilmoisture6': (None, DataPoints.SOILMOISTURE6[0]),
-            'soilmoisture7': (None, DataPoints.SOILMOISTURE7[0]),
-            'soilmoisture8': (None, DataPoints.SOILMOISTURE8[0]),
-            'soilbatt1': (None, f'wh51_ch1{MasterKeys.BATTERY_EXTENTION}'),
-            'soilbatt2': (None, f'wh51_ch2{MasterKeys.BATTERY_EXTENTION}'),
-            'soilbatt3': (None, f'wh51_ch3{MasterKeys.BATTERY_EXTENTION}'),
-            'soilbatt4': (None, f'wh51_ch4{MasterKeys.BATTERY_EXTENTION}'),
-            'soilbatt5': (None, f'wh51_ch5{MasterKeys.BATTERY_EXTENTION}'),
-            'soilbatt6': (None, f'wh51_ch6{MasterKeys.BATTERY_EXTENTION}'),
-            'soilbatt7': (None, f'wh51_ch7{MasterKeys.BATTERY_EXTENTION}'),
-            'soilbatt8': (None, f'wh51_ch8{MasterKeys.BATTERY_EXTENTION}'),
-            # WH34
-            'tf_ch1': (f_to_c, DataPoints.TF_USR1[0]),
-            'tf_ch2': (f_to_c, DataPoints.TF_USR2[0]),
-            'tf_ch3': (f_to_c, DataPoints.TF_USR3[0]),
-            'tf_ch4': (f_to_c, DataPoints.TF_USR4[0]),
-            'tf_ch5': (f_to_c, DataPoints.TF_USR5[0]),
-            'tf_ch6': (f_to_c, DataPoints.TF_USR6[0]),
-            'tf_ch7': (f_to_c, DataPoints.TF_USR7[0]),
-            'tf_ch8': (f_to_c, DataPoints.TF_USR8[0]),
-            # WH45
-            'tf_co2': (f_to_c, DataPoints.SENSOR_CO2_TEMP[0]),
-            'humi_co2': (None, DataPoints.SENSOR_CO2_HUM[0]),
-            'pm10_co2': (None, DataPoints.SENSOR_CO2_PM10[0]),
-            'pm10_24h_co2': (None, DataPoints.SENSOR_CO2_PM10_24[0]),
-            'pm25_co2': (None, DataPoints.SENSOR_CO2_PM255[0]),
-            'pm25_24h_co2': (None, DataPoints.SENSOR_CO2_PM255_24[0]),
-            'co2': (None, DataPoints.SENSOR_CO2_CO2[0]),
-            'co2_24h': (None, DataPoints.SENSOR_CO2_CO2_24[0]),
-            'co2_batt': (None, f'wh45{MasterKeys.BATTERY_EXTENTION}'),
-            # WH41 / WH43
-            'pm25_ch1': (None, DataPoints.PM251[0]),
-            'pm25_avg_24h_ch1': (None, DataPoints.PM25_24H_AVG1[0]),
-            'pm25batt1': (to_int, f'pm251{MasterKeys.BATTERY_EXTENTION}'),
-            'pm25_ch2': (None, DataPoints.PM252[0]),
-            'pm25_avg_24h_ch2': (None, DataPoints.PM25_24H_AVG2[0]),
-            'pm25batt2': (to_int, f'pm252{MasterKeys.BATTERY_EXTENTION}'),
-            'pm25_ch3': (None, DataPoints.PM253[0]),
-            'pm25_avg_24h_ch3': (None, DataPoints.PM25_24H_AVG3[0]),
-            'pm25batt3': (to_int, f'pm253{MasterKeys.BATTERY_EXTENTION}'),
-            'pm25_ch4': (None, DataPoints.PM254[0]),
-            'pm25_avg_24h_ch4': (None, DataPoints.PM25_24H_AVG4[0]),
-            'pm25batt4': (to_int, f'pm254{MasterKeys.BATTERY_EXTENTION}'),
-            # WH55
-            'leak_ch1': (Utils.to_bool, DataPoints.LEAK1[0]),
-            'leak_ch2': (Utils.to_bool, DataPoints.LEAK2[0]),
-            'leak_ch3': (Utils.to_bool, DataPoints.LEAK3)[0],
-            'leak_ch4': (Utils.to_bool, DataPoints.LEAK4[0]),
-            'leakbatt1': (None, f'wh55_ch1{MasterKeys.BATTERY_EXTENTION}'),
-            'leakbatt2': (None, f'wh55_ch2{MasterKeys.BATTERY_EXTENTION}'),
-            'leakbatt3': (None, f'wh55_ch3{MasterKeys.BATTERY_EXTENTION}'),
-            'leakbatt4': (None, f'wh55_ch4{MasterKeys.BATTERY_EXTENTION}'),
-            # WH25
-            'wh25batt': (to_int, f'wh25{MasterKeys.BATTERY_EXTENTION}'),
-            # WH26
-            'wh26batt': (to_int, f'wh26{MasterKeys.BATTERY_EXTENTION}'),
-            # WH57
-            'lightning_day': (None, DataPoints.LIGHTNING_COUNT[0]),
-            'lightning_distance': (None, DataPoints.LIGHTNING_DIST[0]),
-            'lightning_time': (None, DataPoints.LIGHTNING_TIME[0]),
-            # WH68
-            'wh68batt': (to_float, f'wh68{MasterKeys.BATTERY_EXTENTION}'),
-            # WH40
-            'wh40batt': (to_float, f'wh40{MasterKeys.BATTERY_EXTENTION}'),
-        }
+        compiled_struct = self._compiled_struct
+        data_dict = {}
+        unknown = []
 
-        # convert string to dict
-        raw_data_dict = {}
-        line = data.splitlines()[0]
-        if ':' in line and '&' in line:
-            for item in line.split('&'):
-                key, value = item.split('=', 1)
-                try:
-                    value = float(value)
-                    if value % 1 == 0:
-                        value = int(value)
-                except ValueError:
-                    value = value.lstrip()
-                raw_data_dict[key] = value
-        raw_data_dict.update({'client_ip': client_ip})
+        line = data.partition('\n')[0].rstrip('\r')
+        if ':' not in line or '&' not in line:
+            return data_dict
 
-        # Harmonize key names and convert into metric units
-        data_dict = {}
-        for key in raw_data_dict:
+        # split query string, harmonize key names and convert into metric units in one pass
+        for item in line.split('&'):
+            key, _, value = item.partition('=')
             try:
-                decoder, field = tcp_live_data_struct[key]
+                field, converter = compiled_struct[key]
             except KeyError:
-                _msg = f"Unknown key '{key}' with value '{raw_data_dict[key]}'detected. Try do decode remaining sensor data."
-                if self.log_unknown_fields:
-                    self.logger.info(_msg)
-                else:
-                    if DebugLogConfig.tcp:
-                        self.logger.debug(_msg)
-                pass
-            else:
-                if field is None:
-                    continue
+                if key not in self.tcp_live_data_struct:
+                    unknown.append(item)
+                continue
+            try:
+                data_dict[field] = converter(value)
+            except (ValueError, TypeError) as e:
+                self.logger.warning(f"POST: Unable to convert value '{value}' of key '{key}' from {client_ip}: {e}")
 
-                if decoder:
-                    if isinstance(decoder, str):
-                        data_dict[field] = getattr(self, decoder)(raw_data_dict[key])
-                    else:
-                        data_dict[field] = decoder(raw_data_dict[key])
-                else:
-                    data_dict[field] = raw_data_dict[key]
+        if unknown:
+            _msg = f"Unknown keys {unknown} detected. Try do decode remaining sensor data."
+            if self.log_unknown_fields:
+                self.logger.info(_msg)
+            elif DebugLogConfig.tcp:
+                self.logger.debug(_msg)
 
-        self.logger.info(f"POST: convert_data {data_dict=}")
+        if DebugLogConfig.tcp:
+            self.logger.debug(f"POST: convert_data {data_dict=}")
 
         return data_dict
 
+    @classmethod
+    def get_station_id(cls, data: str, client_ip: str) -> str:
+        """Return the id of the uploading station: the PASSKEY in lower case or the client IP, if the upload has no PASSKEY"""
+
+        match = cls.passkey_re.search(data)
+        return match.group(1).lower() if match and match.group(1) else client_ip
+
+    @staticmethod
+    def to_number(value: str):
+        """Convert a numeric string to int if integral, otherwise to float; non-numeric strings are returned stripped"""
+
+        try:
+            value = float(value)
+        except ValueError:
+            return value.lstrip()
+        return int(value) if value % 1 == 0 else value
+
     @staticmethod
     def decode_freq(freq):
         return f"{freq[:-1]} MHz"
@@ -4876,6 +5891,98 @@ class TcpParser(object):
         return data
 
 
+class WuParser(TcpParser):
+    """Class to parse Ecowitt Gateway sensor data uploaded via HTTP Get in Wunderground protocol.
+
+    The data is decoded into the same fields as the ECOWITT protocol. The station is identified by its Wunderground station ID.
+    """
+
+    # Wunderground station ID of the uploading station
+    passkey_re = re.compile(r'(?:^|&)ID=([^&\r\n]*)')
+
+    # key of the query string: (decoder, field); see TcpParser
+    tcp_live_data_struct = {
+        # Generic
+        'ID': (None, None),
+        'PASSWORD': (None, None),
+        'action': (None, None),
+        'realtime': (None, None),
+        'rtfreq': (None, None),
+        'lowbatt': (None, None),
+        'softwaretype': (None, DataPoints.FIRMWARE[0]),
+        'dateutc': ('wu_datetimestr_to_datetime', DataPoints.TIME[0]),
+        # Indoor
+        'indoortempf': (f_to_c, DataPoints.INTEMP[0]),
+        'indoorhumidity': (None, DataPoints.INHUMI[0]),
+        'baromin': (in_to_hpa, DataPoints.RELBARO[0]),
+        'absbaromin': (in_to_hpa, DataPoints.ABSBARO[0]),
+        # Outdoor
+        'tempf': (f_to_c, DataPoints.OUTTEMP[0]),
+        'humidity': (None, DataPoints.OUTHUMI[0]),
+        'dewptf': (f_to_c, DataPoints.OUTDEWPT[0]),
+        'windchillf': (f_to_c, DataPoints.WINDCHILL[0]),
+        'winddir': (None, DataPoints.WINDDIRECTION[0]),
+        'windspeedmph': (mph_to_ms, DataPoints.WINDSPEED[0]),
+        'windgustmph': (mph_to_ms, DataPoints.GUSTSPEED[0]),
+        'solarradiation': (None, DataPoints.UV[0]),
+        'UV': (None, DataPoints.UVI[0]),
+        'rainin': (in_to_mm, DataPoints.RAINHOUR[0]),
+        'dailyrainin': (in_to_mm, DataPoints.RAINDAY[0]),
+        'weeklyrainin': (in_to_mm, DataPoints.RAINWEEK[0]),
+        'monthlyrainin': (in_to_mm, DataPoints.RAINMONTH[0]),
+        'yearlyrainin': (in_to_mm, DataPoints.RAINYEAR[0]),
+        'totalrainin': (in_to_mm, DataPoints.RAINTOTALS[0]),
+    }
+
+    # tcp_live_data_struct compiled to key: (field, converter of the raw string value), see compile_struct()
+    _compiled_struct = None
+
+    def parse_live_data(self, data, client_ip):
+        """Parse the query string of a Wunderground upload and add it to a dictionary."""
+
+        compiled_struct = self._compiled_struct
+        data_dict = {}
+        unknown = []
+
+        for item in data.split('&'):
+            key, _, value = item.partition('=')
+            try:
+                field, converter = compiled_struct[key]
+            except KeyError:
+                if key not in self.tcp_live_data_struct:
+                    unknown.append(key)
+                continue
+            if '%' in value or '+' in value:
+                value = urlparse.unquote_plus(value)
+            try:
+                data_dict[field] = converter(value)
+            except (ValueError, TypeError) as e:
+                self.logger.warning(f"WU: Unable to convert value '{value}' of key '{key}' from {client_ip}: {e}")
+
+        if unknown:
+            _msg = f"Unknown keys {unknown} detected in Wunderground upload."
+            if self.log_unknown_fields:
+                self.logger.info(_msg)
+            elif DebugLogConfig.tcp:
+                self.logger.debug(_msg)
+
+        if DebugLogConfig.tcp:
+            self.logger.debug(f"WU: convert_data {data_dict=}")
+
+        return data_dict
+
+    @staticmethod
+    def wu_datetimestr_to_datetime(utc_datetime_str: str) -> Union[datetime, None]:
+        """Decodes the dateutc of a Wunderground upload, which is 'now' or a date in format YYYY-MM-DD HH:MM:SS"""
+
+        if utc_datetime_str == 'now':
+            return datetime.now().astimezone().replace(microsecond=0)
+        try:
+            return datetime.strptime(utc_datetime_str, "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc).astimezone(tz=None)
+        except ValueError:
+            return None
+
+
 class Sensors(object):
     """Class to manage device sensor ID data.
 
@@ -4884,6 +5991,9 @@ class Sensors(object):
 
     A Sensors object can be initialised with sensor ID data on instantiation or an existing Sensors object can be updated by calling
     the set_sensor_id_data() method and passing the sensor ID data to be used as the only parameter.
+
+    The connected addresses, the battery and signal data and the battery descriptions are computed once per update of the sensor ID data
+    and only if the raw sensor ID data has changed. The getters return these cached views, which must not be modified by the caller.
     """
 
     # map of sensor ids to (short name, long name) and battery byte decode function
@@ -4976,15 +6086,27 @@ class Sensors(object):
         # initialise a dict to hold the parsed sensor data
         self.sensor_data = dict()
 
+        # initialise the raw sensor ID data of the last update and the views computed from it
+        self._id_data = None
+        self._connected_addresses = []
+        self._battery_and_signal_data = {}
+        self._battery_description_data = {}
+
         # parse the raw sensor ID data and store the results in my parsed sensor data dict
         self.set_sensor_id_data(sensor_id_data)
 
     def set_sensor_id_data(self, id_data):
         """Parse the raw sensor ID data and store the results.
 
+        If the raw sensor ID data is unchanged since the last update, nothing needs to be done.
+
         id_data: bytestring of sensor ID data
         """
 
+        if id_data == self._id_data:
+            return
+        self._id_data = id_data
+
         self.sensor_data = {}
         # do we have any raw sensor ID data
         if id_data is not None and len(id_data) > 0:
@@ -5015,6 +6137,29 @@ class Sensors(object):
                 # each sensor entry is seven bytes in length so skip to the start of the next sensor
                 index += 7
 
+        self._update_views()
+
+    def _update_views(self) -> None:
+        """Compute connected addresses, battery and signal data and battery descriptions from the parsed sensor data."""
+
+        connected_addresses = []
+        battery_and_signal_data = {}
+        battery_description_data = {}
+
+        for address, data in self.sensor_data.items():
+            # if the sensor ID is neither 'fffffffe' or 'ffffffff' then it must be connected
+            if data['id'] in self.not_registered:
+                continue
+            connected_addresses.append(address)
+            sensor_name = self.sensor_ids[address]['name'][0]
+            battery_and_signal_data[f'{sensor_name}{MasterKeys.BATTERY_EXTENTION}'] = data['battery']
+            battery_and_signal_data[f'{sensor_name}{MasterKeys.SIGNAL_EXTENTION}'] = data['signal']
+            battery_description_data[sensor_name] = self.get_batt_state_desc(address, data['battery'])
+
+        self._connected_addresses = connected_addresses
+        self._battery_and_signal_data = battery_and_signal_data
+        self._battery_description_data = battery_description_data
+
     def get_addresses(self):
         """Obtain a list of sensor addresses.
 
@@ -5037,15 +6182,7 @@ class Sensors(object):
         address is disabled.
         """
 
-        # initialise a list to hold our connected sensor addresses
-        connected_list = list()
-        # iterate over all sensors
-        for address, data in self.sensor_data.items():
-            # if the sensor ID is neither 'fffffffe' or 'ffffffff' then it
-            # must be connected
-            if data['id'] not in self.not_registered:
-                connected_list.append(address)
-        return connected_list
+        return self._connected_addresses
 
     def get_data(self):
         """Obtain the data dict for all known sensors."""
@@ -5070,29 +6207,19 @@ class Sensors(object):
     def get_battery_and_signal_data(self) -> dict:
         """Obtain a dict of sensor battery state and signal level data.
 
-        Iterate over the list of connected sensors and obtain a dict of sensor battery state data for each connected sensor.
+        The dict holds the battery state and signal level of each connected sensor and is computed once per update of the sensor ID data.
         """
 
-        data = {}
-        for sensor in self.get_connected_addresses():
-            sensor_name = Sensors.sensor_ids[sensor]['name'][0]
-            data[f'{sensor_name}{MasterKeys.BATTERY_EXTENTION}'] = self.get_battery_state(sensor)
-            data[f'{sensor_name}{MasterKeys.SIGNAL_EXTENTION}'] = self.get_signal_level(sensor)
-        return data
+        return self._battery_and_signal_data
 
     def get_battery_description_data(self) -> dict:
         """
         Obtain a dict of sensor battery state description data.
 
-        Iterate over the list of connected sensors and obtain a dict of sensor battery state description data for each connected sensor.
+        The dict holds the battery state description of each connected sensor and is computed once per update of the sensor ID data.
         """
 
-        data = {}
-        for sensor in self.get_connected_addresses():
-            sensor_name = self.sensor_ids[sensor]['name'][0]
-            data[sensor_name] = self.get_batt_state_desc(sensor, self.get_battery_state(sensor))
-
-        return data
+        return self._battery_description_data
 
     @staticmethod
     def get_batt_state_desc(address, value: float) -> Union[str, None]:
@@ -5299,6 +6426,11 @@ def to_float(value) -> float:
         return 0
 
 
+def station_id_from_mac(mac: str) -> str:
+    """Station id of a gateway as used in its ECOWITT uploads: the PASSKEY is the MD5 hash of the MAC address in upper case"""
+    return hashlib.md5(mac.upper().encode()).hexdigest()
+
+
 def obfuscate_passwords(msg: str) -> str:
     """Hide password"""
     return re.sub(r'(PASSWORD|PASSKEY)=[^&]+', r'\1=XXXX', msg)
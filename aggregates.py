@@ -0,0 +1,132 @@
+import datetime
+
+
+class Accumulator(object):
+    """Minimum and maximum with their timestamps, sum and count of the readings of one calendar period.
+
+    The period is identified by the timestamp of its start; a reading of another period resets the accumulator. min_time and max_time hold the
+    datetime of the extremes once converted by the owner and are reset when an extreme changes, so the conversion is done once per new extreme.
+    """
+
+    __slots__ = ('start', 'min', 'min_ts', 'min_time', 'max', 'max_ts', 'max_time', 'sum', 'count')
+
+    def __init__(self, start: int = None):
+        self.reset(start)
+
+    def reset(self, start: int) -> None:
+        self.start = start
+        self.min = None
+        self.min_ts = None
+        self.min_time = None
+        self.max = None
+        self.max_ts = None
+        self.max_time = None
+        self.sum = 0
+        self.count = 0
+
+    def add(self, timestamp: float, value: float) -> None:
+        if self.count == 0:
+            self.min = self.max = value
+            self.min_ts = self.max_ts = timestamp
+            self.min_time = self.max_time = None
+        elif value < self.min:
+            self.min = value
+            self.min_ts = timestamp
+            self.min_time = None
+        elif value > self.max:
+            self.max = value
+            self.max_ts = timestamp
+            self.max_time = None
+        self.sum += value
+        self.count += 1
+
+    @property
+    def avg(self):
+        return self.sum / self.count if self.count else None
+
+    def get_state(self) -> tuple:
+        return self.start, self.min, self.min_ts, self.max, self.max_ts, self.sum, self.count
+
+    @classmethod
+    def from_state(cls, state: tuple):
+        acc = cls()
+        acc.start, acc.min, acc.min_ts, acc.max, acc.max_ts, acc.sum, acc.count = state
+        acc.min_time = acc.max_time = None
+        return acc
+
+
+class Aggregates(object):
+    """Minimum, maximum, average and sum of attributes per calendar period, updated in O(1) per reading.
+
+    statistics maps an attribute to the statistics to publish out of 'min', 'max', 'avg' and 'sum'. For each attribute and period one Accumulator
+    is kept, which is reset when a reading belongs to a new period (start of period from CalendarPeriods). update() adds the fields
+    <attribute>_<period>_<statistic> to the data dict, for min and max additionally <attribute>_<period>_<statistic>_time as datetime of the extreme.
+
+    As the periods are identified by their start, the state can be restored after any downtime: accumulators of past periods are reset with the
+    next reading.
+    """
+
+    STATISTICS = ('min', 'max', 'avg', 'sum')
+
+    def __init__(self, calendar, statistics: dict, periods: tuple = ('day', 'week', 'month', 'year'), state: dict = None):
+
+        self.calendar = calendar
+        self.statistics = {attribute: tuple(stat for stat in self.STATISTICS if stat in stats) for attribute, stats in statistics.items()}
+        self.periods = tuple(period for period in calendar.PERIODS if period in periods)
+        self._period_index = tuple(calendar.PERIODS.index(period) for period in self.periods)
+
+        # accumulators per attribute in order of periods
+        self._accumulators = {attribute: [Accumulator() for _ in self.periods] for attribute in self.statistics}
+
+        # field names per attribute and period as (min, min_time, max, max_time, avg, sum)
+        self._fields = {attribute: [tuple(f"{attribute}_{period}_{stat}" for stat in ('min', 'min_time', 'max', 'max_time', 'avg', 'sum')) for period in self.periods]
+                        for attribute in self.statistics}
+
+        if state:
+            self.set_state(state)
+
+    def update(self, data: dict, timestamp: float) -> None:
+        """Add the readings of the configured attributes in data to the accumulators and the aggregates to data"""
+
+        starts = self.calendar.starts(timestamp)
+        tz = self.calendar.tz
+
+        for attribute, stats in self.statistics.items():
+            value = data.get(attribute)
+            if value is None:
+                continue
+
+            for index, acc, fields in zip(self._period_index, self._accumulators[attribute], self._fields[attribute]):
+                start = starts[index]
+                if acc.start != start:
+                    acc.reset(start)
+                acc.add(timestamp, value)
+
+                if 'min' in stats:
+                    if acc.min_time is None:
+                        acc.min_time = datetime.datetime.fromtimestamp(acc.min_ts, tz)
+                    data[fields[0]] = acc.min
+                    data[fields[1]] = acc.min_time
+                if 'max' in stats:
+                    if acc.max_time is None:
+                        acc.max_time = datetime.datetime.fromtimestamp(acc.max_ts, tz)
+                    data[fields[2]] = acc.max
+                    data[fields[3]] = acc.max_time
+                if 'avg' in stats:
+                    data[fields[4]] = round(acc.avg, 1)
+                if 'sum' in stats:
+                    data[fields[5]] = round(acc.sum, 1)
+
+    def get_state(self) -> dict:
+        """Accumulators as dict of {(attribute, period): state} to be pickled"""
+
+        return {(attribute, period): acc.get_state() for attribute, accumulators in self._accumulators.items() for period, acc in zip(self.periods, accumulators)}
+
+    def set_state(self, state: dict) -> None:
+        """Restore the accumulators of configured attributes and periods from get_state()"""
+
+        for attribute, accumulators in self._accumulators.items():
+            for i, period in enumerate(self.periods):
+                acc_state = state.get((attribute, period))
+                if acc_state:
+                    accumulators[i] = Accumulator.from_state(acc_state)
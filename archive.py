@@ -0,0 +1,169 @@
+import math
+import re
+import time
+
+from collections import deque
+from dataclasses import fields
+from datetime import datetime
+
+from .datapoints import DataPoints, MasterKeys
+
+
+AVG = 'avg'
+MAX = 'max'
+SUM = 'sum'
+LAST = 'last'
+VECTOR = 'vector'
+
+# units of measured values reduced to their average; other values keep the last value
+AVG_UNITS = ('°C', '%', '%RH', 'hpa', 'hPa', 'm/s', 'm', 'lux', 'uW/m2', '0-15', 'μg/m3', 'Vol%')
+
+# reductions differing from the rule by unit
+FIELD_REDUCTIONS = {DataPoints.RAIN[0]: SUM,
+                    DataPoints.PIEZO_RAIN[0]: SUM,
+                    DataPoints.LIGHTNING_COUNT[0]: SUM,
+                    DataPoints.GUSTSPEED[0]: MAX,
+                    DataPoints.RAINRATE[0]: MAX,
+                    DataPoints.PIEZO_RAINRATE[0]: MAX,
+                    DataPoints.WINDDIRECTION[0]: VECTOR,
+                    DataPoints.WINDDIR_AVG10M[0]: VECTOR,
+                    DataPoints.DAYLWINDMAX[0]: MAX,
+                    DataPoints.HEATINDEX[0]: AVG,
+                    DataPoints.SENSOR_CO2_PM10[0]: AVG,
+                    DataPoints.SENSOR_CO2_PM255[0]: AVG,
+                    DataPoints.INABSHUM[0]: AVG,
+                    DataPoints.OUTABSHUM[0]: AVG,
+                    DataPoints.RAIN_RST_DAY[0]: LAST,
+                    DataPoints.RAIN_RST_WEEK[0]: LAST,
+                    DataPoints.RAIN_RST_YEAR[0]: LAST,
+                    DataPoints.AIR_PRESSURE_REL_DIFF_1h[0]: LAST,
+                    DataPoints.AIR_PRESSURE_REL_DIFF_3h[0]: LAST,
+                    }
+
+# min, max and avg of calendar periods (see Aggregates) are running values
+PERIOD_AGGREGATE = re.compile(r'.+_(hour|day|week|month|year)_(min|max|avg|sum)')
+
+
+def _get_units() -> dict:
+    data_points = DataPoints()
+    units = {}
+    for field in fields(data_points):
+        key, _, unit = getattr(data_points, field.name)
+        if isinstance(key, str):
+            units[key] = unit
+    return units
+
+
+class ArchiveGenerator(object):
+    """Reduce the packets of a source to one record per fixed interval, as the archive records of WeeWX.
+
+    Packets are binned by their timestamp into intervals aligned to interval seconds (e.g. xx:00, xx:05, ... for 300s). Each field is reduced
+    according to its type: average for measured values (temperatures, humidity, pressure, wind speed, ...), vector average for wind direction,
+    maximum for gusts, daily max gust and rain rate, sum for the per packet deltas rain, p_rain and lightningcount, last value for counters, texts and everything
+    else. The record of an interval is returned by add() with the first packet of a later interval; it carries the end of the interval as timestamp.
+
+    Only the accumulators of the open interval and the last max_records records are kept. Packets of an already closed interval are dropped.
+    """
+
+    UNITS = _get_units()
+
+    def __init__(self, interval: int = 300, max_records: int = 288):
+
+        self.interval = interval
+        self.records = deque(maxlen=max_records)
+        self._start = None
+        self._accumulators = {}
+        self._packets = 0
+        self._reductions = {}
+
+    def get_reduction(self, key: str) -> str:
+        """Reduction of field key; values of fields unknown to DataPoints keep the last value"""
+
+        reduction = self._reductions.get(key)
+        if reduction is None:
+            if key in FIELD_REDUCTIONS:
+                reduction = FIELD_REDUCTIONS[key]
+            elif PERIOD_AGGREGATE.fullmatch(key):
+                reduction = LAST
+            elif self.UNITS.get(key, LAST) in AVG_UNITS:
+                reduction = AVG
+            else:
+                reduction = LAST
+            self._reductions[key] = reduction
+        return reduction
+
+    def add(self, packet: dict):
+        """Add a post-processed packet; return the record of the previous interval if the packet starts a new one, otherwise None"""
+
+        timestamp = packet.get(MasterKeys.TIMESTAMP, int(time.time()))
+        start = timestamp - timestamp % self.interval
+
+        record = None
+        if self._start is not None and start != self._start:
+            if start < self._start:
+                return None
+            record = self.close()
+        self._start = start
+        self._packets += 1
+
+        accumulators = self._accumulators
+        for key, value in packet.items():
+            if value is None or key == MasterKeys.TIMESTAMP or key == DataPoints.TIME[0]:
+                continue
+
+            reduction = self.get_reduction(key)
+            if reduction != LAST and (isinstance(value, bool) or not isinstance(value, (int, float))):
+                reduction = LAST
+
+            acc = accumulators.get(key)
+            if acc is None or acc[0] != reduction:
+                accumulators[key] = self._new_accumulator(reduction, value)
+            elif reduction == AVG:
+                acc[1] += value
+                acc[2] += 1
+            elif reduction == MAX:
+                if value > acc[1]:
+                    acc[1] = value
+            elif reduction == SUM:
+                acc[1] += value
+            elif reduction == VECTOR:
+                rad = math.radians(value)
+                acc[1] += math.sin(rad)
+                acc[2] += math.cos(rad)
+            else:
+                acc[1] = value
+
+        return record
+
+    @staticmethod
+    def _new_accumulator(reduction: str, value) -> list:
+        if reduction == AVG:
+            return [AVG, value, 1]
+        if reduction == VECTOR:
+            rad = math.radians(value)
+            return [VECTOR, math.sin(rad), math.cos(rad)]
+        return [reduction, value]
+
+    def close(self):
+        """Return the record of the open interval and start a new one; None if no packet has been added"""
+
+        if not self._packets:
+            return None
+
+        end = self._start + self.interval
+        record = {MasterKeys.TIMESTAMP: end, DataPoints.TIME[0]: datetime.fromtimestamp(end)}
+        for key, acc in self._accumulators.items():
+            reduction = acc[0]
+            if reduction == AVG:
+                record[key] = round(acc[1] / acc[2], 1)
+            elif reduction == VECTOR:
+                record[key] = round((math.degrees(math.atan2(acc[1], acc[2])) + 360) % 360, 1)
+            elif reduction == SUM:
+                record[key] = round(acc[1], 2)
+            else:
+                record[key] = acc[1]
+
+        self.records.append(record)
+        self._accumulators = {}
+        self._packets = 0
+        return record
@@ -0,0 +1,679 @@
+#!/usr/bin/env python3
+# vim: set encoding=utf-8 tabstop=4 softtabstop=4 shiftwidth=4 expandtab
+#########################################################################
+#  Copyright 2022-      Michael Wenzel              wenzel_michael@web.de
+#########################################################################
+#  This file is part of SmartHomeNG.
+#  https://www.smarthomeNG.de
+#  https://knx-user-forum.de/forum/supportforen/smarthome-py
+#
+#  Offline benchmark suite for the Foshk / Ecowitt Weather Gateway plugin.
+#
+#  SmartHomeNG is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  SmartHomeNG is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with SmartHomeNG. If not, see <http://www.gnu.org/licenses/>.
+#
+#########################################################################
+
+"""Offline benchmark suite for the foshk parsers.
+
+The benchmark runs the parser classes of the plugin against gateway traffic recorded in ./fixtures. No gateway and no running
+SmartHomeNG instance are needed; only the SmartHomeNG lib package has to be importable. Run it from the SmartHomeNG base directory:
+
+    python3 -m plugins.foshk.benchmark
+    python3 -m plugins.foshk.benchmark --save-baseline var/foshk_benchmark.json
+    python3 -m plugins.foshk.benchmark --baseline var/foshk_benchmark.json --threshold 0.15
+
+Fixture formats:
+    *.hex   raw API frame as hex string (as written to the debug log by bytes_to_hex)
+    *.txt   raw body of an ECOWITT http post request
+    *.json  http live data response of get_livedata_info
+"""
+
+import gc
+import json
+import logging
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from collections import deque
+from dataclasses import dataclass, asdict
+from typing import Callable, Union
+
+from .. import InterfaceConfig, Gateway, GatewayApi, ApiParser, HttpParser, TcpParser, WuParser, Sensors, RollingWind, TimeWindow, TrendWindow
+from .. import DataPoints, MasterKeys, MeteoCache, meteocalcs
+from ..sun import SolarTable, solar_elevation, sunshine_threshold
+from ..aggregates import Aggregates
+from ..archive import ArchiveGenerator
+from ..checkpoint import write_checkpoint
+from ..store import RingStore
+from ..history import HistoryStore
+from ..periods import CalendarPeriods
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+BASELINE_VERSION = 1
+CLIENT_IP = '192.168.2.32'
+
+
+class BenchPlugin(object):
+    """Minimal stand-in for the plugin instance providing the attributes the parser classes use."""
+
+    def __init__(self, interface_config: InterfaceConfig = None):
+        self.logger = logging.getLogger('plugins.foshk.benchmark')
+        self.interface_config = interface_config if interface_config else InterfaceConfig()
+        self.raw_recorder = None
+        self.checkpoint_interval = 0
+
+    @staticmethod
+    def get_fullname():
+        return 'foshk'
+
+
+@dataclass
+class BenchCase:
+    """A benchmark case; setup gets the plugin stand-in and returns the callable processing one frame."""
+
+    name: str
+    description: str
+    setup: Callable
+
+
+@dataclass
+class BenchResult:
+    """Result of one benchmark case."""
+
+    name: str
+    iterations: int
+    ops_per_sec: float
+    usec_per_op: float
+    alloc_peak_bytes: int
+    alloc_blocks: int
+
+
+CASES = []
+
+
+def add_case(name: str, description: str, setup: Callable) -> None:
+    """Register a benchmark case."""
+
+    CASES.append(BenchCase(name, description, setup))
+
+
+def bench_case(name: str, description: str):
+    """Decorator to register a benchmark case setup function."""
+
+    def register(setup):
+        add_case(name, description, setup)
+        return setup
+    return register
+
+
+def load_fixture(name: str) -> Union[bytes, str, dict]:
+    """Load a fixture file and return it in the format the corresponding parser expects."""
+
+    with open(os.path.join(FIXTURE_DIR, name), encoding='utf-8') as f:
+        content = f.read()
+
+    if name.endswith('.hex'):
+        return bytes.fromhex(content)
+    elif name.endswith('.json'):
+        return json.loads(content)
+    return content.rstrip('\n')
+
+
+def check_frame(frame: bytes, cmd: str) -> None:
+    """Verify header, command code and checksum of a fixture frame as GatewayApi._check_response does."""
+
+    if frame[2] != GatewayApi.API_COMMANDS[cmd][0] or GatewayApi._calc_checksum(frame[2:-1]) != frame[-1]:
+        raise ValueError(f"Fixture frame for {cmd} is corrupt.")
+
+
+def run_case(case: BenchCase, plugin: BenchPlugin, min_time: float = 1.0, repeat: int = 3, alloc_runs: int = 50) -> BenchResult:
+    """Run a benchmark case and return the best of 'repeat' timing rounds together with the allocation per frame."""
+
+    fn = case.setup(plugin)
+
+    # warm up and calibrate the number of iterations per round to roughly min_time
+    iterations = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / 10:
+            break
+        iterations *= 2
+    iterations = max(1, int(iterations * min_time / elapsed))
+
+    best = None
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(iterations):
+                fn()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    # measure allocation per frame; peak is the transient memory needed, blocks the memory still held after the call
+    tracemalloc.start()
+    try:
+        peak_total = 0
+        blocks_total = 0
+        for _ in range(alloc_runs):
+            before = tracemalloc.take_snapshot()
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+            result = fn()
+            _, peak = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot()
+            peak_total += peak - base
+            blocks_total += sum(stat.count_diff for stat in after.compare_to(before, 'filename') if stat.count_diff > 0)
+            del result
+    finally:
+        tracemalloc.stop()
+
+    return BenchResult(name=case.name,
+                       iterations=iterations,
+                       ops_per_sec=iterations / best,
+                       usec_per_op=best / iterations * 1e6,
+                       alloc_peak_bytes=peak_total // alloc_runs,
+                       alloc_blocks=blocks_total // alloc_runs)
+
+
+def save_baseline(results: list, filename: str) -> None:
+    """Write results as baseline json file."""
+
+    data = {'version': BASELINE_VERSION, 'results': {r.name: asdict(r) for r in results}}
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+
+
+def load_baseline(filename: str) -> dict:
+    """Read a baseline json file and return the results dict keyed by case name."""
+
+    with open(filename, encoding='utf-8') as f:
+        data = json.load(f)
+    if data.get('version') != BASELINE_VERSION:
+        raise ValueError(f"Baseline {filename} has unsupported version {data.get('version')}.")
+    return data['results']
+
+
+def compare_to_baseline(results: list, baseline: dict, threshold: float) -> list:
+    """Compare results against a baseline and return a list of regression messages.
+
+    A case regresses if its throughput drops by more than 'threshold' (fraction) or its peak allocation per frame grows by more than
+    'threshold'. Cases missing in the baseline are ignored.
+    """
+
+    regressions = []
+    for result in results:
+        base = baseline.get(result.name)
+        if not base:
+            continue
+        if result.ops_per_sec < base['ops_per_sec'] * (1 - threshold):
+            regressions.append(f"{result.name}: {result.ops_per_sec:.0f} ops/s vs. baseline {base['ops_per_sec']:.0f} ops/s")
+        if result.alloc_peak_bytes > base['alloc_peak_bytes'] * (1 + threshold):
+            regressions.append(f"{result.name}: {result.alloc_peak_bytes} B/frame vs. baseline {base['alloc_peak_bytes']} B/frame")
+    return regressions
+
+
+#############################################################
+#   Benchmark cases
+#############################################################
+
+def _api_case(fixture: str, cmd: str, parse_fn: str):
+
+    def setup(plugin):
+        frame = load_fixture(fixture)
+        check_frame(frame, cmd)
+        parse = getattr(ApiParser(plugin), parse_fn)
+
+        def run():
+            if GatewayApi._calc_checksum(frame[2:-1]) != frame[-1]:
+                raise ValueError
+            return parse(frame)
+        return run
+    return setup
+
+
+add_case('api_livedata_small', 'ApiParser.parse_livedata, outdoor sensor array only', _api_case('api_livedata_small.hex', 'CMD_GW1000_LIVEDATA', 'parse_livedata'))
+add_case('api_livedata_large', 'ApiParser.parse_livedata, 8 channels of WH31/WH51, WN34, WH45, WH55, WH57', _api_case('api_livedata_large.hex', 'CMD_GW1000_LIVEDATA', 'parse_livedata'))
+add_case('api_read_rain', 'ApiParser.parse_read_rain incl. piezo rain', _api_case('api_read_rain.hex', 'CMD_READ_RAIN', 'parse_read_rain'))
+
+
+@bench_case('api_sensor_id_new', 'Sensors: set unchanged sensor id data and get connected/battery/description data')
+def _sensor_id_case(plugin):
+    frame = load_fixture('api_sensor_id_new.hex')
+    check_frame(frame, 'CMD_READ_SENSOR_ID_NEW')
+    sensors = Sensors(plugin)
+
+    def run():
+        sensors.set_sensor_id_data(frame)
+        return sensors.get_connected_addresses(), sensors.get_battery_and_signal_data(), sensors.get_battery_description_data()
+    return run
+
+
+@bench_case('api_sensor_id_changed', 'Sensors: alternating sensor id data, views recomputed on every update')
+def _sensor_id_changed_case(plugin):
+    frame = load_fixture('api_sensor_id_new.hex')
+    check_frame(frame, 'CMD_READ_SENSOR_ID_NEW')
+    # second frame with the signal level of the first sensor changed
+    changed = bytearray(frame)
+    changed[11] ^= 1
+    changed[-1] = GatewayApi._calc_checksum(bytes(changed[2:-1]))
+    frames = (frame, bytes(changed))
+    sensors = Sensors(plugin)
+    state = [0]
+
+    def run():
+        state[0] ^= 1
+        sensors.set_sensor_id_data(frames[state[0]])
+        return sensors.get_connected_addresses(), sensors.get_battery_and_signal_data(), sensors.get_battery_description_data()
+    return run
+
+
+@bench_case('api_broadcast', 'GatewayApi.decode_broadcast_response')
+def _broadcast_case(plugin):
+    frame = load_fixture('api_broadcast.hex')
+    check_frame(frame, 'CMD_BROADCAST')
+
+    def run():
+        if GatewayApi._calc_checksum(frame[2:-1]) != frame[-1]:
+            raise ValueError
+        return GatewayApi.decode_broadcast_response(frame)
+    return run
+
+
+def _post_case(fixture: str):
+
+    def setup(plugin):
+        body = load_fixture(fixture)
+        parser = TcpParser(plugin)
+
+        def run():
+            return parser.parse_live_data(body, CLIENT_IP)
+        return run
+    return setup
+
+
+add_case('post_ecowitt_small', 'TcpParser.parse_live_data, GW1000 with outdoor sensor array', _post_case('post_ecowitt_small.txt'))
+add_case('post_ecowitt_large', 'TcpParser.parse_live_data, GW2000 with many channels', _post_case('post_ecowitt_large.txt'))
+add_case('post_ecowitt_channels', 'TcpParser.parse_live_data, GW2000 with all channels of WH31, WH51, WN34, WH41, WH55', _post_case('post_ecowitt_channels.txt'))
+
+
+def _wu_case(fixture: str):
+
+    def setup(plugin):
+        query = load_fixture(fixture).strip()
+        parser = WuParser(plugin)
+
+        def run():
+            return parser.parse_live_data(query, CLIENT_IP)
+        return run
+    return setup
+
+
+add_case('wu_upload', 'WuParser.parse_live_data, GW2000 upload in Wunderground protocol', _wu_case('wu_upload.txt'))
+
+
+def _http_case(fixture: str):
+
+    def setup(plugin):
+        data = load_fixture(fixture)
+        parser = HttpParser(plugin)
+
+        def run():
+            return parser.parse_livedata(data)
+        return run
+    return setup
+
+
+add_case('http_livedata_gw1100', 'HttpParser.parse_livedata, GW1100', _http_case('http_livedata_gw1100.json'))
+add_case('http_livedata_gw2000', 'HttpParser.parse_livedata, GW2000 with many channels', _http_case('http_livedata_gw2000.json'))
+
+
+def _wind_readings(count: int, cycle: int) -> list:
+    rnd = random.Random(10)
+    return [(i * cycle, round(rnd.uniform(0, 10), 1), round(rnd.uniform(0, 360), 1), round(rnd.uniform(0, 20), 1)) for i in range(count)]
+
+
+def _wind_scan_case(cycle: int):
+
+    def setup(plugin):
+        readings = _wind_readings(4 * 600 // cycle, cycle)
+        wind = deque(maxlen=600 // cycle)
+        state = [0]
+
+        def run():
+            wind.append(list(readings[state[0]]))
+            state[0] = (state[0] + 1) % len(readings)
+            return Gateway.get_avg_wind(wind, 1), Gateway.get_avg_wind(wind, 2), Gateway.get_max_wind(wind, 3)
+        return run
+    return setup
+
+
+def _wind_rolling_case(cycle: int):
+
+    def setup(plugin):
+        readings = _wind_readings(4 * 600 // cycle, cycle)
+        wind = RollingWind(span=600)
+        state = [0, 0]
+
+        def run():
+            ts, speed, direction, gust = readings[state[0]]
+            wind.append(ts + state[1], speed, direction, gust)
+            state[0] += 1
+            if state[0] == len(readings):
+                # continue with increasing timestamps
+                state[0] = 0
+                state[1] += len(readings) * cycle
+            return wind.avg_speed, wind.avg_direction, wind.max_gust
+        return run
+    return setup
+
+
+add_case('wind_avg10m_scan', '10 minute wind average of 30 readings (api_data_cycle 20s), scan of the deque per reading', _wind_scan_case(20))
+add_case('wind_avg10m_rolling', '10 minute wind average of 30 readings (api_data_cycle 20s), RollingWind', _wind_rolling_case(20))
+add_case('wind_avg10m_scan_fast', '10 minute wind average of 600 readings (1s cycle), scan of the deque per reading', _wind_scan_case(1))
+add_case('wind_avg10m_rolling_fast', '10 minute wind average of 600 readings (1s cycle), RollingWind', _wind_rolling_case(1))
+
+
+def _pressure_readings(count: int, cycle: int) -> list:
+    rnd = random.Random(3)
+    value = 1013.0
+    readings = []
+    for i in range(count):
+        value = round(value + rnd.uniform(-0.15, 0.16), 1)
+        readings.append((i * cycle, value))
+    return readings
+
+
+def _pressure_trend_case(incremental: bool):
+
+    def setup(plugin):
+        # Gateway without __init__, which would need a running SmartHomeNG; get_trend only uses the logger
+        gateway = Gateway.__new__(Gateway)
+        gateway.logger = plugin.logger
+        readings = _pressure_readings(4 * 540, 20)
+        window = TimeWindow(3 * 3600 + Gateway.PRESSURE_TREND_TOLERANCE)
+        trends = {x: TrendWindow(x * 3600, Gateway.PRESSURE_TREND_TOLERANCE) for x in (1, 3)}
+        state = [0, 0]
+
+        def run():
+            ts, value = readings[state[0]]
+            ts += state[1]
+            state[0] += 1
+            if state[0] == len(readings):
+                state[0] = 0
+                state[1] += len(readings) * 20
+            window.append(ts, value)
+            result = []
+            for x, trend in trends.items():
+                if incremental:
+                    counts = trend.update(ts, value)
+                    if counts:
+                        result.append(Gateway.get_trend_from_counts(*counts[2:], round(value - counts[1], 1), x == 3))
+                else:
+                    pos = window.index_at(ts - x * 3600)
+                    if pos is not None:
+                        result.append(gateway.get_trend(window, pos, len(window), x == 3))
+            return result
+        return run
+    return setup
+
+
+add_case('pressure_trend_scan', '1h and 3h pressure trend at api_data_cycle 20s, Gateway.get_trend scan of the window', _pressure_trend_case(False))
+add_case('pressure_trend_incremental', '1h and 3h pressure trend at api_data_cycle 20s, TrendWindow', _pressure_trend_case(True))
+
+
+def _history_columns(count: int) -> tuple:
+    rnd = random.Random(41)
+    temperature = [round(rnd.uniform(-20, 38), 1) for _ in range(count)]
+    humidity = [rnd.randint(10, 100) for _ in range(count)]
+    wind_speed = [round(rnd.uniform(0, 60), 1) for _ in range(count)]
+    return temperature, humidity, wind_speed
+
+
+def _meteocalcs_history_case(batch: bool, years: int = 1):
+
+    def setup(plugin):
+        temperature, humidity, wind_speed = _history_columns(years * 365 * 24)
+
+        if batch:
+            temperature, humidity, wind_speed = (meteocalcs.np.array(column, dtype=float) for column in (temperature, humidity, wind_speed))
+
+            def run():
+                return (meteocalcs.get_dew_point_batch(temperature, humidity),
+                        meteocalcs.get_abs_hum_batch(temperature, humidity),
+                        meteocalcs.get_feels_like_temperature_batch(temperature, humidity, wind_speed, units='metric'))
+            return run
+
+        def run():
+            return ([meteocalcs.get_dew_point(t, h) for t, h in zip(temperature, humidity)],
+                    [meteocalcs.get_abs_hum(t, h) for t, h in zip(temperature, humidity)],
+                    [meteocalcs.get_feels_like_temperature(t, h, v, units='metric') for t, h, v in zip(temperature, humidity, wind_speed)])
+        return run
+    return setup
+
+
+add_case('meteocalcs_history_scalar', 'dew point, abs. humidity and feels like of 1 year of hourly history, scalar functions', _meteocalcs_history_case(False))
+if meteocalcs.NUMPY_IMPORTED:
+    add_case('meteocalcs_history_batch', 'dew point, abs. humidity and feels like of 1 year of hourly history, numpy batch functions', _meteocalcs_history_case(True))
+
+
+def _add_temp_data_case(cache_size: int):
+
+    def setup(plugin):
+        # Gateway without __init__, which would need a running SmartHomeNG; add_temp_data only uses the meteo cache
+        gateway = Gateway.__new__(Gateway)
+        gateway.meteo = MeteoCache(cache_size)
+        rnd = random.Random(43)
+        packets = []
+        for _ in range(1000):
+            # slowly changing values as delivered by a station: outdoor, indoor and 8 channels
+            data = {DataPoints.OUTTEMP[0]: round(12 + rnd.randint(-3, 3) / 10, 1), DataPoints.OUTHUMI[0]: 77 + rnd.randint(-1, 1),
+                    DataPoints.WINDSPEED[0]: round(rnd.randint(0, 40) / 10, 1), DataPoints.INTEMP[0]: round(21 + rnd.randint(-1, 1) / 10, 1), DataPoints.INHUMI[0]: 45}
+            for i in range(1, 9):
+                data[f'{MasterKeys.TEMP}{i}'] = round(20 + i / 10 + rnd.randint(-1, 1) / 10, 1)
+                data[f'{MasterKeys.HUMID}{i}'] = 40 + i
+            packets.append(data)
+        state = [0]
+
+        def run():
+            packet = dict(packets[state[0]])
+            state[0] = (state[0] + 1) % len(packets)
+            gateway.add_temp_data(packet)
+            return packet
+        return run
+    return setup
+
+
+add_case('meteo_add_temp_data', 'Gateway.add_temp_data for outdoor, indoor and 8 channels of temperature and humidity, without cache', _add_temp_data_case(0))
+add_case('meteo_add_temp_data_cached', 'Gateway.add_temp_data for outdoor, indoor and 8 channels of temperature and humidity, MeteoCache of 256 entries', _add_temp_data_case(256))
+
+
+def _sun_case(table: bool):
+
+    def setup(plugin):
+        lat, lon = 52.52, 13.405
+        solar_table = SolarTable(lat, lon, 0.8)
+        start = 1718964000
+        state = [0]
+
+        def run():
+            state[0] = (state[0] + 20) % 86400
+            ts = start + state[0]
+            if table:
+                return solar_table.lookup(ts)
+            elevation = solar_elevation(ts, lat, lon)
+            return elevation, sunshine_threshold(elevation, 173, 0.8) if elevation > 3 else 0.0
+        return run
+    return setup
+
+
+add_case('sun_elevation_direct', 'solar elevation (NOAA) and sunshine threshold computed per packet every 20s', _sun_case(False))
+add_case('sun_elevation_table', 'solar elevation and sunshine threshold interpolated from SolarTable, rebuilt once per day of packets every 20s', _sun_case(True))
+
+
+def _aggregates_case(plugin):
+    # Aggregates of the default attributes per day, week, month and year with a packet every 20s
+    aggregates = Aggregates(CalendarPeriods(), Gateway.AGGREGATE_STATISTICS)
+    rnd = random.Random(44)
+    packets = [{DataPoints.OUTTEMP[0]: round(12 + rnd.randint(-30, 30) / 10, 1), DataPoints.OUTHUMI[0]: 70 + rnd.randint(-10, 10),
+                DataPoints.RELBARO[0]: round(1013 + rnd.randint(-50, 50) / 10, 1), DataPoints.GUSTSPEED[0]: round(rnd.randint(0, 100) / 10, 1)} for _ in range(1000)]
+    start = 1718964000
+    state = [0]
+
+    def run():
+        packet = dict(packets[state[0] % len(packets)])
+        state[0] += 1
+        aggregates.update(packet, start + state[0] * 20)
+        return packet
+    return run
+
+
+add_case('aggregates_update', 'min, max (with time) and avg per day, week, month and year of outtemp, outhumid, air_pressure_rel and gustspeed per packet', _aggregates_case)
+
+
+def _archive_case(plugin):
+    # post-processed packets every 16s reduced to 5 minute records
+    archive = ArchiveGenerator(300)
+    rnd = random.Random(45)
+    packets = []
+    for _ in range(1000):
+        data = {DataPoints.OUTTEMP[0]: round(12 + rnd.randint(-3, 3) / 10, 1), DataPoints.OUTHUMI[0]: 77 + rnd.randint(-1, 1),
+                DataPoints.RELBARO[0]: round(1013 + rnd.randint(-5, 5) / 10, 1), DataPoints.WINDSPEED[0]: round(rnd.randint(0, 40) / 10, 1),
+                DataPoints.GUSTSPEED[0]: round(rnd.randint(0, 80) / 10, 1), DataPoints.WINDDIRECTION[0]: rnd.randint(0, 359), DataPoints.RAIN[0]: 0.0,
+                MasterKeys.RAIN_DAY: 1.2, DataPoints.WEATHER_TEXT[0]: 'bedeckt', DataPoints.SENSOR_WARNING[0]: False}
+        for i in range(1, 9):
+            data[f'{MasterKeys.TEMP}{i}'] = round(20 + i / 10 + rnd.randint(-1, 1) / 10, 1)
+            data[f'{MasterKeys.HUMID}{i}'] = 40 + i
+        packets.append(data)
+    start = 1718964000
+    state = [0]
+
+    def run():
+        packet = packets[state[0] % len(packets)]
+        state[0] += 1
+        packet[MasterKeys.TIMESTAMP] = start + state[0] * 16
+        return archive.add(packet)
+    return run
+
+
+add_case('archive_add', 'ArchiveGenerator.add of packets with 26 fields every 16s, reduced to 5 minute records', _archive_case)
+
+
+def _pressure_store_case(ring: bool):
+
+    def setup(plugin):
+        # persist each air pressure reading of a 3h window at api_data_cycle 20s; files are written to a temporary directory
+        directory = tempfile.mkdtemp(prefix='foshk_benchmark_')
+        readings = _pressure_readings(4 * 540, 20)
+        window = TimeWindow(3 * 3600 + Gateway.PRESSURE_TREND_TOLERANCE)
+        store = RingStore(os.path.join(directory, 'air_pressure.ring'), 1, 4096)
+        filename = os.path.join(directory, 'air_pressure.pkl')
+        state = [0]
+
+        def run():
+            ts, value = readings[state[0] % len(readings)]
+            ts += (state[0] // len(readings)) * len(readings) * 20
+            state[0] += 1
+            window.append(ts, value)
+            if ring:
+                store.append(ts, value)
+            else:
+                write_checkpoint(filename, {'data': list(window), 'stop_time': ts})
+        return run
+    return setup
+
+
+add_case('pressure_store_pickle', 'air pressure reading persisted by a checkpoint of the whole 3h window', _pressure_store_case(False))
+add_case('pressure_store_ring', 'air pressure reading persisted by RingStore.append', _pressure_store_case(True))
+
+
+HISTORY_ATTRIBUTES = (DataPoints.OUTTEMP[0], DataPoints.OUTHUMI[0], DataPoints.RELBARO[0], DataPoints.WINDSPEED[0], DataPoints.GUSTSPEED[0],
+                      DataPoints.WINDDIRECTION[0], DataPoints.RAINRATE[0], f'{MasterKeys.TEMP}1', f'{MasterKeys.HUMID}1', DataPoints.UV[0])
+
+
+def _history_packets(count: int) -> list:
+    rnd = random.Random(50)
+    return [{attribute: round(rnd.uniform(0, 100), 1) for attribute in HISTORY_ATTRIBUTES} for _ in range(count)]
+
+
+def _history_add_case(plugin):
+    # packets every 16s with 10 history attributes; flush and compaction once per minute as done by the scheduler
+    history = HistoryStore(os.path.join(tempfile.mkdtemp(prefix='foshk_benchmark_'), 'history.db'), HISTORY_ATTRIBUTES)
+    packets = _history_packets(1000)
+    start = 1718964000
+    state = [0]
+
+    def run():
+        packet = packets[state[0] % len(packets)]
+        state[0] += 1
+        packet[MasterKeys.TIMESTAMP] = start + state[0] * 16
+        history.add(packet)
+        if state[0] % 4 == 0:
+            history.compact(start + state[0] * 16)
+    return run
+
+
+def _history_query_case(resolution: str):
+
+    def setup(plugin):
+        # query one day of outtemp out of two days of packets every 16s
+        history = HistoryStore(os.path.join(tempfile.mkdtemp(prefix='foshk_benchmark_'), 'history.db'), HISTORY_ATTRIBUTES)
+        start = 1718964000
+        for i, packet in enumerate(_history_packets(2 * 5400)):
+            packet[MasterKeys.TIMESTAMP] = start + i * 16
+            history.add(packet)
+        end = start + 2 * 86400
+        history.compact(end)
+
+        def run():
+            return history.query(DataPoints.OUTTEMP[0], end - 86400, end, resolution)
+        return run
+    return setup
+
+
+add_case('history_add', 'HistoryStore.add of packets with 10 attributes every 16s, flushed and compacted once per minute', _history_add_case)
+add_case('history_query_raw', 'HistoryStore.query of one day of raw outtemp values', _history_query_case('raw'))
+add_case('history_query_hour', 'HistoryStore.query of one day of hourly outtemp values', _history_query_case('hour'))
+
+
+def _replay_case(plugin):
+    # a complete GatewayReplay (Gateway.__init__ with the plugin stand-in of the replay tool) post-processing live data and rain frames every 20s
+    from .replay import ReplayPlugin
+    from .. import GatewayReplay, RawRecord
+
+    driver = GatewayReplay(ReplayPlugin(InterfaceConfig(api_data_cycle=20)), lambda source, packet: None)
+    frames = [load_fixture('api_livedata_large.hex'), load_fixture('api_read_rain.hex')]
+    start = 1718964000
+    state = [0]
+
+    def run():
+        state[0] += 1
+        for frame in frames:
+            driver.process_record(RawRecord(start + state[0] * 20, 'api', frame[2:3].hex(), frame))
+        driver.flush()
+        return driver.packets
+    return run
+
+
+add_case('replay_api_packet', 'GatewayReplay built by its __init__ replaying live data and rain frames as one post-processed API packet', _replay_case)
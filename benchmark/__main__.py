@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# vim: set encoding=utf-8 tabstop=4 softtabstop=4 shiftwidth=4 expandtab
+#########################################################################
+#  Copyright 2022-      Michael Wenzel              wenzel_michael@web.de
+#########################################################################
+#  This file is part of SmartHomeNG.
+#
+#  Command line entry of the offline benchmark suite of the foshk plugin:
+#
+#      python3 -m plugins.foshk.benchmark --help
+#
+#########################################################################
+
+import argparse
+import fnmatch
+import logging
+import sys
+
+from . import CASES, BenchPlugin, run_case, save_baseline, load_baseline, compare_to_baseline
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python3 -m plugins.foshk.benchmark', description='Offline benchmark of the foshk plugin parsers.')
+    parser.add_argument('-c', '--case', action='append', help='run only cases matching this pattern (may be given multiple times)')
+    parser.add_argument('-l', '--list', action='store_true', help='list the available cases and exit')
+    parser.add_argument('-t', '--time', type=float, default=1.0, help='minimum time in seconds per timing round (default: 1.0)')
+    parser.add_argument('-r', '--repeat', type=int, default=3, help='number of timing rounds, the best one is reported (default: 3)')
+    parser.add_argument('--baseline', help='json file with baseline results to compare against')
+    parser.add_argument('--save-baseline', metavar='FILE', help='write results to FILE as new baseline')
+    parser.add_argument('--threshold', type=float, default=0.2, help='allowed regression against baseline as fraction (default: 0.2)')
+    parser.add_argument('-v', '--verbose', action='store_true', help='show the log output of the parsers')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING, format='%(levelname)-8s %(name)s: %(message)s')
+
+    cases = CASES
+    if args.case:
+        cases = [case for case in CASES if any(fnmatch.fnmatch(case.name, f"*{pattern}*") for pattern in args.case)]
+
+    if args.list:
+        for case in cases:
+            print(f"{case.name:<28} {case.description}")
+        return 0
+
+    if not cases:
+        print("No benchmark case selected.", file=sys.stderr)
+        return 2
+
+    plugin = BenchPlugin()
+    results = []
+    print(f"{'case':<28} {'ops/s':>12} {'us/op':>10} {'peak B/op':>10} {'blocks/op':>10}")
+    for case in cases:
+        result = run_case(case, plugin, min_time=args.time, repeat=args.repeat)
+        results.append(result)
+        print(f"{result.name:<28} {result.ops_per_sec:>12.0f} {result.usec_per_op:>10.2f} {result.alloc_peak_bytes:>10} {result.alloc_blocks:>10}")
+
+    if args.save_baseline:
+        save_baseline(results, args.save_baseline)
+        print(f"Baseline written to {args.save_baseline}")
+
+    if args.baseline:
+        regressions = compare_to_baseline(results, load_baseline(args.baseline), args.threshold)
+        if regressions:
+            print(f"Regression of more than {args.threshold:.0%} against baseline {args.baseline}:", file=sys.stderr)
+            for msg in regressions:
+                print(f"  {msg}", file=sys.stderr)
+            return 1
+        print(f"No regression of more than {args.threshold:.0%} against baseline {args.baseline}.")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
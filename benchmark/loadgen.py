@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# vim: set encoding=utf-8 tabstop=4 softtabstop=4 shiftwidth=4 expandtab
+#########################################################################
+#  Copyright 2022-      Michael Wenzel              wenzel_michael@web.de
+#########################################################################
+#  This file is part of SmartHomeNG.
+#
+#  Load generator for the ECOWITT upload server of the foshk plugin:
+#
+#      python3 -m plugins.foshk.benchmark.loadgen --connections 16 --duration 10
+#
+#  Without --port an upload server (GatewayTcp) is started in a subprocess on 127.0.0.1, so client and server do not share the GIL.
+#  Use --port to load an already running server, eg. the plugin itself or an older version started with --serve.
+#
+#  Scaling of the multi-process ingestion (Upload_Workers) with the number of workers, using 4 client processes:
+#
+#      python3 -m plugins.foshk.benchmark.loadgen --workers 0,1,2,4 --processes 4 --connections 32
+#
+#########################################################################
+
+import argparse
+import http.client
+import logging
+import multiprocessing
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+from . import BenchPlugin, load_fixture
+from .. import InterfaceConfig, GatewayTcp, UploadWorkerPool
+
+
+def serve(host: str, port: int, workers: int = 0) -> int:
+    """Run the upload server of the plugin with a callback counting the parsed packets until interrupted."""
+
+    # the load generator sends the same body over and over; disable the duplicate filter
+    plugin = BenchPlugin(InterfaceConfig(post_server_ip=host, post_server_port=port, post_server_dedupe_ttl=0))
+    packets = 0
+    lock = threading.Lock()
+
+    def callback(data, *args):
+        nonlocal packets
+        with lock:
+            packets += 1
+
+    server = UploadWorkerPool(plugin, callback, workers) if workers else GatewayTcp(plugin, callback)
+    server.startup()
+    print(f"Serving on {host}:{port}", flush=True)
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop_server()
+        server.shutdown()
+    print(f"{packets} packets parsed, " + ', '.join(f"{value} {key}" for key, value in server.statistics.items() if key != 'queue_size'))
+    return 0
+
+
+def wait_for_port(host: str, port: int, timeout: float = 10.0) -> bool:
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        try:
+            with socket.create_connection((host, port), timeout=0.5):
+                return True
+        except OSError:
+            time.sleep(0.1)
+    return False
+
+
+def free_port(host: str) -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind((host, 0))
+        return s.getsockname()[1]
+
+
+def client(host: str, port: int, path: str, body: bytes, keep_alive: bool, end: float, count: int, latencies: list, errors: list) -> None:
+    """Post body until end or count requests are done; latencies in seconds are appended to the given list."""
+
+    headers = {'Content-Type': 'application/x-www-form-urlencoded', 'Connection': 'keep-alive' if keep_alive else 'close'}
+    conn = None
+    done = 0
+    while (not count or done < count) and time.monotonic() < end:
+        done += 1
+        start = time.perf_counter()
+        try:
+            if conn is None:
+                conn = http.client.HTTPConnection(host, port, timeout=10)
+            conn.request('POST', path, body=body, headers=headers)
+            rsp = conn.getresponse()
+            rsp.read()
+            if rsp.status != 200:
+                errors.append(rsp.status)
+            if not keep_alive or rsp.will_close:
+                conn.close()
+                conn = None
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(type(e).__name__)
+            if conn:
+                conn.close()
+                conn = None
+            continue
+        latencies.append(time.perf_counter() - start)
+    if conn:
+        conn.close()
+
+
+def client_process(host: str, port: int, path: str, body: bytes, keep_alive: bool, duration: float, count: int, connections: int) -> tuple:
+    """Run connections client threads and return their latencies and errors."""
+
+    latencies = []
+    errors = []
+    end = time.monotonic() + duration
+    threads = [threading.Thread(target=client, args=(host, port, path, body, keep_alive, end, count, latencies, errors)) for _ in range(connections)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors
+
+
+def run_load(host: str, port: int, args, body: bytes) -> tuple:
+    """Load the server with args.connections connections spread over args.processes processes; return latencies, errors and elapsed time."""
+
+    duration = args.duration if not args.requests else 3600
+    processes = max(1, min(args.processes, args.connections))
+    shares = [args.connections // processes + (1 if i < args.connections % processes else 0) for i in range(processes)]
+    params = [(host, port, args.path, body, not args.new_connection, duration, args.requests, share) for share in shares]
+
+    start = time.perf_counter()
+    if processes == 1:
+        results = [client_process(*params[0])]
+    else:
+        with multiprocessing.get_context('spawn').Pool(processes) as pool:
+            results = pool.starmap(client_process, params)
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for result in results for latency in result[0])
+    errors = [error for result in results for error in result[1]]
+    return latencies, errors, elapsed
+
+
+def start_server(host: str, workers: int) -> tuple:
+    """Start an upload server in a subprocess and return it with its port."""
+
+    port = free_port(host)
+    server = subprocess.Popen([sys.executable, '-m', __spec__.name, '--serve', '--host', host, '--port', str(port), '--workers', str(workers)],
+                              stdout=subprocess.PIPE, text=True)
+    if not wait_for_port(host, port):
+        server.kill()
+        raise RuntimeError(f"Upload server did not start on {host}:{port}.")
+    return server, port
+
+
+def stop_server(server) -> str:
+    """Stop the upload server subprocess and return its summary line."""
+
+    server.send_signal(signal.SIGINT)
+    out, _ = server.communicate(timeout=30)
+    return out.strip().splitlines()[-1] if out.strip() else 'no server output'
+
+
+def percentile(values: list, p: float) -> float:
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python3 -m plugins.foshk.benchmark.loadgen', description='Load generator for the ECOWITT upload server of the foshk plugin.')
+    parser.add_argument('--host', default='127.0.0.1', help='address of the upload server (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, help='port of a running upload server; if omitted, a server is started in a subprocess')
+    parser.add_argument('-c', '--connections', type=int, default=8, help='number of concurrent client connections (default: 8)')
+    parser.add_argument('-p', '--processes', type=int, default=1, help='number of client processes the connections are spread over (default: 1)')
+    parser.add_argument('-d', '--duration', type=float, default=5.0, help='duration of the test in seconds (default: 5)')
+    parser.add_argument('-n', '--requests', type=int, default=0, help='number of requests per connection; 0 runs for --duration (default: 0)')
+    parser.add_argument('-w', '--workers', default='0', help='upload worker processes of the started server, comma separated list runs one test per value (default: 0)')
+    parser.add_argument('--new-connection', action='store_true', help='open a new connection for every request instead of keep-alive')
+    parser.add_argument('--fixture', default='post_ecowitt_large.txt', help='post body fixture (default: post_ecowitt_large.txt)')
+    parser.add_argument('--path', default='/data/report/', help='request path (default: /data/report/)')
+    parser.add_argument('--serve', action='store_true', help='only run the upload server on --host/--port until interrupted')
+    parser.add_argument('-v', '--verbose', action='store_true', help='show the log output of the plugin')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING, format='%(levelname)-8s %(name)s: %(message)s')
+    worker_counts = [int(value) for value in args.workers.split(',')]
+
+    if args.serve:
+        return serve(args.host, args.port or 8080, worker_counts[0])
+
+    body = load_fixture(args.fixture).strip().encode()
+    mode = 'new connection per request' if args.new_connection else 'keep-alive'
+
+    if args.port is not None:
+        latencies, errors, elapsed = run_load(args.host, args.port, args, body)
+        print(f"{len(latencies)} requests, {len(errors)} errors in {elapsed:.2f}s with {args.connections} connections ({mode}): {len(latencies) / elapsed:.0f} req/s")
+        print(f"latency ms: p50 {percentile(latencies, 0.5) * 1000:.2f}  p95 {percentile(latencies, 0.95) * 1000:.2f}  "
+              f"p99 {percentile(latencies, 0.99) * 1000:.2f}  max {(latencies[-1] if latencies else 0) * 1000:.2f}")
+        return 1 if errors else 0
+
+    print(f"{args.connections} connections ({mode}) from {args.processes} client processes, {multiprocessing.cpu_count()} CPUs")
+    print(f"{'workers':>7} {'req/s':>9} {'errors':>7} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}  server")
+    failed = False
+    for workers in worker_counts:
+        server, port = start_server(args.host, workers)
+        try:
+            latencies, errors, elapsed = run_load(args.host, port, args, body)
+        finally:
+            summary = stop_server(server)
+        failed = failed or bool(errors)
+        print(f"{workers:>7} {len(latencies) / elapsed:>9.0f} {len(errors):>7} {percentile(latencies, 0.5) * 1000:>8.2f} {percentile(latencies, 0.99) * 1000:>8.2f} "
+              f"{(latencies[-1] if latencies else 0) * 1000:>8.2f}  {summary}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# vim: set encoding=utf-8 tabstop=4 softtabstop=4 shiftwidth=4 expandtab
+#########################################################################
+#  Copyright 2022-      Michael Wenzel              wenzel_michael@web.de
+#########################################################################
+#  This file is part of SmartHomeNG.
+#
+#  Offline replay of raw data recorded by the foshk plugin (Record_Raw_Data) through parsers and post-processing:
+#
+#      python3 -m plugins.foshk.benchmark.replay var/plugin_data/foshk/foshk_raw.bin --speed 0 --output packets.jsonl
+#
+#  The packets written with --output can be diffed between two versions of the plugin to verify, that a change does not alter the results.
+#
+#########################################################################
+
+import argparse
+import json
+import logging
+import sys
+import time
+
+from datetime import datetime
+
+from . import BenchPlugin
+from .. import InterfaceConfig, GatewayReplay, read_log
+
+
+class ReplayClock(object):
+    """Stand-in for lib.shtime.Shtime providing the methods used by Gateway."""
+
+    @staticmethod
+    def now():
+        return datetime.now().astimezone()
+
+    @staticmethod
+    def tzinfo():
+        return datetime.now().astimezone().tzinfo
+
+    def current_year(self, offset=0):
+        return self.now().year
+
+    def current_month(self, offset=0):
+        return self.now().month
+
+    def calendar_week(self, offset=0):
+        return self.now().isocalendar()[1]
+
+    def current_day(self, offset=0):
+        return self.now().day
+
+    def day_of_year(self):
+        return self.now().timetuple().tm_yday
+
+
+class NoSun(object):
+    """Stand-in for the sun orb if no position is given; the sun is always below the horizon."""
+
+    @staticmethod
+    def pos():
+        return 0, 0
+
+
+class ReplayPlugin(BenchPlugin):
+    """Plugin stand-in for GatewayReplay without a running SmartHomeNG instance."""
+
+    def __init__(self, interface_config: InterfaceConfig):
+        super().__init__(interface_config)
+        self.shtime = ReplayClock()
+        self.sun = NoSun()
+        if interface_config.lat is not None and interface_config.lon is not None:
+            try:
+                from lib.orb import Orb
+                self.sun = Orb('sun', interface_config.lon, interface_config.lat, interface_config.alt or 0)
+            except ImportError as e:
+                self.logger.warning(f"Sun position not available ({e}); sun duration will not be calculated.")
+
+    def get_sh(self):
+        return self
+
+    @staticmethod
+    def read_pickle(filename):
+        return None
+
+    @staticmethod
+    def save_pickle(filename, data):
+        pass
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python3 -m plugins.foshk.benchmark.replay', description='Replay raw data recorded by the foshk plugin.')
+    parser.add_argument('filename', help='record file; rotated files (.1, .2, ...) are replayed before it')
+    parser.add_argument('-s', '--speed', type=float, default=0, help='replay speed as multiple of real time; 0 replays as fast as possible (default: 0)')
+    parser.add_argument('-o', '--output', help='write the post-processed packets as json lines to OUTPUT')
+    parser.add_argument('--cycle', type=int, default=20, help='API poll cycle of the recording in seconds (default: 20)')
+    parser.add_argument('--lat', type=float, help='latitude for the sun duration calculation')
+    parser.add_argument('--lon', type=float, help='longitude for the sun duration calculation')
+    parser.add_argument('--alt', type=float, help='altitude for the sun duration calculation')
+    parser.add_argument('-v', '--verbose', action='store_true', help='show the log output of the plugin')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING, format='%(levelname)-8s %(name)s: %(message)s')
+
+    plugin = ReplayPlugin(InterfaceConfig(api_data_cycle=args.cycle, lat=args.lat, lon=args.lon, alt=args.alt))
+    output = open(args.output, 'w', encoding='utf-8') if args.output else None
+
+    def sink(source, packet):
+        if output:
+            output.write(json.dumps({'source': source, 'packet': packet}, default=str, sort_keys=True) + '\n')
+
+    try:
+        driver = GatewayReplay(plugin, sink)
+        start = time.perf_counter()
+        packets = driver.replay(read_log(args.filename), speed=args.speed)
+        elapsed = time.perf_counter() - start
+    finally:
+        if output:
+            output.close()
+
+    print(f"{driver.records} records, {packets} packets in {elapsed:.3f}s ({packets / elapsed if elapsed else 0:.0f} packets/s)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
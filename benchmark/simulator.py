@@ -0,0 +1,464 @@
+#!/usr/bin/env python3
+# vim: set encoding=utf-8 tabstop=4 softtabstop=4 shiftwidth=4 expandtab
+#########################################################################
+#  Copyright 2022-      Michael Wenzel              wenzel_michael@web.de
+#########################################################################
+#  This file is part of SmartHomeNG.
+#  https://www.smarthomeNG.de
+#  https://knx-user-forum.de/forum/supportforen/smarthome-py
+#
+#  Local simulator of an Ecowitt GW1000/GW1100/GW2000 gateway.
+#
+#  SmartHomeNG is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  SmartHomeNG is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with SmartHomeNG. If not, see <http://www.gnu.org/licenses/>.
+#
+#########################################################################
+
+"""Local gateway simulator for load and latency tests of the foshk plugin.
+
+The simulator provides
+    - the binary API on TCP (default port 45000) for all read commands used by the plugin, write commands are acknowledged
+    - the answer to CMD_BROADCAST on UDP (default port 46000)
+    - get_livedata_info, get_version and get_sensors_info via HTTP (GW1100/GW2000 only)
+    - ECOWITT http post uploads to a configurable receiver at a configurable interval
+
+Live data is taken from the recorded fixtures of the benchmark suite. Faults (latency, truncated frames, bad checksums, refused
+connections) can be injected with a given probability to measure the retry and throughput behaviour of the plugin end to end.
+
+Point the plugin to the simulator by setting Gateway_IP to the simulator address. The HTTP interface listens on port 8081 by default,
+as the upload receiver of the plugin uses port 8080. The plugin sends its HTTP requests to port 80, so to test the HTTP path run the
+simulator with --http-port 80 or forward port 80 to 8081. Run it from the SmartHomeNG base directory:
+
+    python3 -m plugins.foshk.benchmark.simulator --model GW2000 --post-url http://127.0.0.1:8080/data/report/ --post-interval 16
+"""
+
+import argparse
+import json
+import random
+import re
+import socket
+import socketserver
+import struct
+import threading
+import time
+import http.client
+
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+from .. import GatewayApi
+from . import load_fixture
+
+# commands with a two byte (big endian) size field in the response
+LONG_SIZE_COMMANDS = (b'\x12', b'\x27', b'\x3C', b'\x57', b'\x59')
+
+# firmware version and fixtures per simulated model
+MODELS = {
+    'GW1000': {'firmware': 'GW1000A_V1.7.3', 'livedata': 'api_livedata_small.hex', 'post': 'post_ecowitt_small.txt', 'http': None},
+    'GW1100': {'firmware': 'GW1100A_V2.1.4', 'livedata': 'api_livedata_small.hex', 'post': 'post_ecowitt_small.txt', 'http': 'http_livedata_gw1100.json'},
+    'GW2000': {'firmware': 'GW2000A_V2.2.4', 'livedata': 'api_livedata_large.hex', 'post': 'post_ecowitt_large.txt', 'http': 'http_livedata_gw2000.json'},
+}
+
+
+@dataclass
+class Faults:
+    """Faults to be injected; rates are probabilities per request (0.0 - 1.0)."""
+
+    # latency in sec added before each API/HTTP answer
+    latency: float = 0.0
+
+    # random additional latency in sec (uniform 0..jitter)
+    jitter: float = 0.0
+
+    # probability of an API frame being cut off
+    truncate_rate: float = 0.0
+
+    # probability of an API frame with wrong checksum
+    bad_checksum_rate: float = 0.0
+
+    # probability of a connection being reset without answer
+    refuse_rate: float = 0.0
+
+    # seed of the random generator to get reproducible fault sequences
+    seed: int = None
+
+
+@dataclass
+class SimulatorStats:
+    """Counters of the simulator."""
+
+    api_requests: dict = field(default_factory=dict)
+    broadcasts: int = 0
+    http_requests: int = 0
+    posts_sent: int = 0
+    posts_failed: int = 0
+    truncated: int = 0
+    bad_checksum: int = 0
+    refused: int = 0
+
+
+class GatewaySimulator(object):
+    """Simulated gateway serving the API, discovery, HTTP and post upload interfaces."""
+
+    def __init__(self, model: str = 'GW2000', host: str = '127.0.0.1', api_port: int = 45000, broadcast_port: int = 46000,
+                 http_port: int = 8081, post_url: str = None, post_interval: float = 16.0, faults: Faults = None,
+                 mac: str = 'E8:68:E7:12:9D:D7'):
+
+        if model not in MODELS:
+            raise ValueError(f"Unknown model {model}, use one of {', '.join(MODELS)}")
+
+        self.model = model
+        self.host = host
+        self.api_port = api_port
+        self.broadcast_port = broadcast_port
+        self.http_port = http_port
+        self.post_url = post_url
+        self.post_interval = post_interval
+        self.faults = faults if faults else Faults()
+        self.mac = bytes.fromhex(mac.replace(':', ''))
+        self.firmware = MODELS[model]['firmware']
+        self.stats = SimulatorStats()
+
+        self._random = random.Random(self.faults.seed)
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._threads = []
+        self._api_server = None
+        self._http_server = None
+        self._udp_socket = None
+
+        self._livedata = load_fixture(MODELS[model]['livedata'])
+        self._rain = load_fixture('api_read_rain.hex')
+        self._sensor_id = load_fixture('api_sensor_id_new.hex')
+        self._post_body = load_fixture(MODELS[model]['post'])
+        self._http_livedata = load_fixture(MODELS[model]['http']) if MODELS[model]['http'] else None
+
+    #############################################################
+    #   Start / Stop
+    #############################################################
+
+    def start(self) -> None:
+        """Start all interfaces of the simulator, each in its own thread."""
+
+        self._stop_event.clear()
+
+        self._api_server = socketserver.ThreadingTCPServer((self.host, self.api_port), self._make_api_handler())
+        self._api_server.daemon_threads = True
+        self._start_thread(self._api_server.serve_forever, 'Simulator-API')
+
+        self._udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._udp_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._udp_socket.bind(('', self.broadcast_port))
+        self._udp_socket.settimeout(0.5)
+        self._start_thread(self._serve_broadcast, 'Simulator-Broadcast')
+
+        if self._http_livedata is not None and self.http_port:
+            self._http_server = ThreadingHTTPServer((self.host, self.http_port), self._make_http_handler())
+            self._http_server.daemon_threads = True
+            self._start_thread(self._http_server.serve_forever, 'Simulator-HTTP')
+
+        if self.post_url:
+            self._start_thread(self._post_loop, 'Simulator-Post')
+
+    def stop(self) -> None:
+        """Stop all interfaces of the simulator."""
+
+        self._stop_event.set()
+        for server in (self._api_server, self._http_server):
+            if server:
+                server.shutdown()
+                server.server_close()
+        for thread in self._threads:
+            thread.join(2)
+        if self._udp_socket:
+            self._udp_socket.close()
+        self._threads = []
+
+    def _start_thread(self, target, name: str) -> None:
+        thread = threading.Thread(target=target, name=name, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    #############################################################
+    #   Faults
+    #############################################################
+
+    def _chance(self, rate: float) -> bool:
+        if rate <= 0:
+            return False
+        with self._lock:
+            return self._random.random() < rate
+
+    def _delay(self) -> None:
+        delay = self.faults.latency
+        if self.faults.jitter:
+            with self._lock:
+                delay += self._random.uniform(0, self.faults.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self.stats, counter, getattr(self.stats, counter) + 1)
+
+    def _apply_frame_faults(self, frame: bytes) -> bytes:
+        """Return the frame truncated or with wrong checksum according to the fault settings."""
+
+        if self._chance(self.faults.truncate_rate):
+            self._count('truncated')
+            with self._lock:
+                return frame[:self._random.randint(1, len(frame) - 1)]
+        if self._chance(self.faults.bad_checksum_rate):
+            self._count('bad_checksum')
+            return frame[:-1] + bytes([(frame[-1] + 1) % 256])
+        return frame
+
+    #############################################################
+    #   API
+    #############################################################
+
+    @staticmethod
+    def build_frame(cmd: bytes, payload: bytes) -> bytes:
+        """Build an API response frame with size field and checksum as the gateway does."""
+
+        if cmd in LONG_SIZE_COMMANDS:
+            body = cmd + struct.pack('>H', len(payload) + 4) + payload
+        else:
+            body = cmd + struct.pack('B', len(payload) + 3) + payload
+        return GatewayApi.HEADER + body + struct.pack('B', GatewayApi._calc_checksum(body))
+
+    def build_response(self, cmd: bytes):
+        """Return the response frame for an API command or None if the command is not supported."""
+
+        def text(value: str) -> bytes:
+            raw = value.encode()
+            return struct.pack('B', len(raw)) + raw
+
+        cmd_name = next((name for name, code in GatewayApi.API_COMMANDS.items() if code == cmd), None)
+        if cmd_name is None:
+            return None
+
+        if cmd_name == 'CMD_GW1000_LIVEDATA':
+            return self._livedata
+        elif cmd_name == 'CMD_READ_RAIN':
+            return self._rain
+        elif cmd_name == 'CMD_READ_SENSOR_ID_NEW':
+            return self._sensor_id
+        elif cmd_name == 'CMD_BROADCAST':
+            return self.build_broadcast_response()
+        elif cmd_name.startswith(('CMD_WRITE', 'CMD_SET')):
+            # write commands are acknowledged with status 0 = success
+            return self.build_frame(cmd, b'\x00')
+
+        payloads = {
+            'CMD_READ_STATION_MAC': lambda: self.mac,
+            'CMD_READ_FIRMWARE_VERSION': lambda: text(self.firmware),
+            'CMD_READ_SSSS': lambda: struct.pack('>BBLBB', 1, 1, int(time.time()), 39, 1),
+            'CMD_READ_ECOWITT': lambda: b'\x01',
+            'CMD_READ_WUNDERGROUND': lambda: text('ISIMULATOR1') + text('secret') + b'\x01',
+            'CMD_READ_WOW': lambda: text('simulator') + text('secret') + text('') + b'\x01',
+            'CMD_READ_WEATHERCLOUD': lambda: text('simulator') + text('secret') + b'\x01',
+            'CMD_READ_CUSTOMIZED': lambda: text('') + text('') + text(self.host) + struct.pack('>HHBB', 8080, 16, 0, 1),
+            'CMD_READ_USR_PATH': lambda: text('/data/report/') + text('/weatherstation/updateweatherstation.php?'),
+            'CMD_READ_RAINDATA': lambda: struct.pack('>LLLLL', 0, 3, 86, 547, 5428),
+            'CMD_READ_GAIN': lambda: struct.pack('>HHHHHH', 1267, 100, 100, 100, 100, 0),
+            'CMD_READ_CALIBRATION': lambda: bytes(16),
+            'CMD_GET_SOILHUMIAD': lambda: b''.join(struct.pack('>BBHBBH', ch, 30 + ch, 200 + ch, 0, 70, 1000) for ch in range(8)),
+            'CMD_GET_MulCH_OFFSET': lambda: b''.join(struct.pack('>Bbb', ch, 0, 0) for ch in range(8)),
+            'CMD_GET_MulCH_T_OFFSET': lambda: b''.join(struct.pack('>Bh', 0x63 + ch, 0) for ch in range(4)),
+            'CMD_GET_PM25_OFFSET': lambda: b''.join(struct.pack('>Bh', ch, 0) for ch in range(4)),
+            'CMD_GET_CO2_OFFSET': lambda: struct.pack('>hhh', 0, 0, 0),
+            'CMD_READ_RSTRAIN_TIME': lambda: bytes([0, 0, 1]),
+        }
+        if cmd_name not in payloads:
+            return None
+        return self.build_frame(cmd, payloads[cmd_name]())
+
+    def build_broadcast_response(self) -> bytes:
+        """Return the CMD_BROADCAST response announcing the simulator."""
+
+        ip = socket.inet_aton(self.host if self.host not in ('', '0.0.0.0') else '127.0.0.1')
+        ssid = f"{self.model}-WIFI{self.mac[-2:].hex().upper()} V{self.firmware.split('_V')[-1]}".encode()
+        return self.build_frame(b'\x12', self.mac + ip + struct.pack('>H', self.api_port) + struct.pack('B', len(ssid)) + ssid)
+
+    def _make_api_handler(self):
+        simulator = self
+
+        class ApiHandler(socketserver.BaseRequestHandler):
+            def handle(self):
+                try:
+                    request = self.request.recv(1024)
+                except OSError:
+                    return
+                if len(request) < 5 or request[:2] != GatewayApi.HEADER:
+                    return
+                cmd = request[2:3]
+                with simulator._lock:
+                    simulator.stats.api_requests[cmd.hex()] = simulator.stats.api_requests.get(cmd.hex(), 0) + 1
+
+                if simulator._chance(simulator.faults.refuse_rate):
+                    simulator._count('refused')
+                    # close with RST instead of FIN
+                    self.request.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+                    return
+
+                response = simulator.build_response(cmd)
+                if response is None:
+                    # unknown commands are ignored by the gateway, the client runs into its timeout
+                    return
+
+                simulator._delay()
+                try:
+                    self.request.sendall(simulator._apply_frame_faults(response))
+                except OSError:
+                    pass
+
+        return ApiHandler
+
+    #############################################################
+    #   Discovery
+    #############################################################
+
+    def _serve_broadcast(self) -> None:
+        broadcast_cmd = GatewayApi.API_COMMANDS['CMD_BROADCAST']
+        while not self._stop_event.is_set():
+            try:
+                request, address = self._udp_socket.recvfrom(1024)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            if request[:2] == GatewayApi.HEADER and request[2:3] == broadcast_cmd:
+                self._count('broadcasts')
+                self._udp_socket.sendto(self._apply_frame_faults(self.build_broadcast_response()), address)
+
+    #############################################################
+    #   HTTP
+    #############################################################
+
+    def _make_http_handler(self):
+        simulator = self
+
+        class HttpHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                simulator._count('http_requests')
+                cmd = urlparse(self.path).path.strip('/')
+                if cmd == 'get_livedata_info':
+                    data = simulator._http_livedata
+                elif cmd == 'get_version':
+                    data = {'version': f"Version: {simulator.firmware}", 'newVersion': '0', 'platform': 'ecowitt'}
+                elif cmd == 'get_sensors_info':
+                    data = simulator.build_sensors_info()
+                else:
+                    self.send_error(404)
+                    return
+
+                if simulator._chance(simulator.faults.refuse_rate):
+                    simulator._count('refused')
+                    self.close_connection = True
+                    self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+                    return
+
+                simulator._delay()
+                body = json.dumps(data).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return HttpHandler
+
+    def build_sensors_info(self) -> list:
+        """Build the get_sensors_info answer from the sensor id fixture."""
+
+        frame = self._sensor_id
+        payload = frame[5:5 + struct.unpack('>H', frame[3:5])[0] - 4]
+        sensors = []
+        for index in range(0, len(payload), 7):
+            address, sensor_id, batt, signal = payload[index], payload[index + 1:index + 5].hex().upper(), payload[index + 5], payload[index + 6]
+            sensors.append({'type': str(address), 'id': sensor_id, 'batt': str(batt), 'rssi': '--', 'signal': str(signal),
+                            'idst': '1' if sensor_id not in ('FFFFFFFF', 'FFFFFFFE') else '0'})
+        return sensors
+
+    #############################################################
+    #   ECOWITT post upload
+    #############################################################
+
+    def build_post_body(self) -> str:
+        """Return the post body fixture with the current time as dateutc."""
+
+        now = datetime.now(timezone.utc).strftime('%Y-%m-%d+%H:%M:%S')
+        return re.sub(r'dateutc=[^&]*', f'dateutc={now}', self._post_body, count=1)
+
+    def _post_loop(self) -> None:
+        url = urlparse(self.post_url)
+        path = url.path or '/'
+        next_post = time.monotonic()
+        while not self._stop_event.is_set():
+            body = self.build_post_body().encode()
+            try:
+                connection = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=5)
+                connection.request('POST', path, body=body, headers={'Content-Type': 'application/x-www-form-urlencoded'})
+                connection.getresponse().read()
+                connection.close()
+            except (OSError, http.client.HTTPException):
+                self._count('posts_failed')
+            else:
+                self._count('posts_sent')
+
+            next_post += self.post_interval
+            self._stop_event.wait(max(0.0, next_post - time.monotonic()))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python3 -m plugins.foshk.benchmark.simulator', description='Simulate an Ecowitt gateway.')
+    parser.add_argument('--model', choices=sorted(MODELS), default='GW2000')
+    parser.add_argument('--host', default='127.0.0.1', help='address to bind API and HTTP server to (default: 127.0.0.1)')
+    parser.add_argument('--api-port', type=int, default=45000)
+    parser.add_argument('--broadcast-port', type=int, default=46000)
+    parser.add_argument('--http-port', type=int, default=8081, help='port of the HTTP interface, 0 to disable (default: 8081)')
+    parser.add_argument('--post-url', help='receiver of the ECOWITT post upload, eg http://127.0.0.1:8080/data/report/')
+    parser.add_argument('--post-interval', type=float, default=16.0, help='interval of post uploads in sec (default: 16)')
+    parser.add_argument('--latency', type=float, default=0.0, help='latency in sec added to each answer')
+    parser.add_argument('--jitter', type=float, default=0.0, help='random additional latency in sec')
+    parser.add_argument('--truncate', type=float, default=0.0, help='probability of truncated API frames')
+    parser.add_argument('--bad-checksum', type=float, default=0.0, help='probability of API frames with wrong checksum')
+    parser.add_argument('--refuse', type=float, default=0.0, help='probability of connections reset without answer')
+    parser.add_argument('--seed', type=int, help='seed for reproducible fault sequences')
+    args = parser.parse_args(argv)
+
+    faults = Faults(latency=args.latency, jitter=args.jitter, truncate_rate=args.truncate, bad_checksum_rate=args.bad_checksum,
+                    refuse_rate=args.refuse, seed=args.seed)
+    simulator = GatewaySimulator(model=args.model, host=args.host, api_port=args.api_port, broadcast_port=args.broadcast_port,
+                                 http_port=args.http_port, post_url=args.post_url, post_interval=args.post_interval, faults=faults)
+    simulator.start()
+    print(f"Simulating {args.model} ({simulator.firmware}) at {args.host}:{args.api_port}, press Ctrl-C to stop.")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        simulator.stop()
+        print(simulator.stats)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,109 @@
+import os
+import pickle
+import struct
+import time
+import zlib
+
+
+MAGIC = b'FOSHKCP'
+VERSION = 1
+HEADER = struct.Struct('<7sBIId')           # magic, version, length and crc32 of the payload, time of writing
+BACKUP_SUFFIX = '.1'
+TEMP_SUFFIX = '.tmp'
+
+
+class CheckpointError(Exception):
+    """Exception raised when a checkpoint file is missing, truncated or corrupted."""
+
+
+def write_checkpoint(filename: str, data) -> None:
+    """Write data pickled with a header to filename, crash-safe.
+
+    The data is written to a temporary file, which is flushed to disk and renamed to filename; an interrupted write leaves the previous file
+    untouched. The previous file is kept as filename.1, so there is a valid snapshot even if the disk loses the last rename.
+    """
+
+    payload = pickle.dumps(data, pickle.HIGHEST_PROTOCOL)
+    header = HEADER.pack(MAGIC, VERSION, len(payload), zlib.crc32(payload), time.time())
+
+    directory = os.path.dirname(filename) or '.'
+    os.makedirs(directory, exist_ok=True)
+    temp_filename = filename + TEMP_SUFFIX
+    with open(temp_filename, 'wb') as f:
+        f.write(header)
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+
+    if os.path.exists(filename):
+        os.replace(filename, filename + BACKUP_SUFFIX)
+    os.replace(temp_filename, filename)
+    _fsync_directory(directory)
+
+
+def read_checkpoint(filename: str) -> tuple:
+    """Read data and time of writing from a checkpoint file; raise CheckpointError if the file is not valid
+
+    Files written by older versions as plain pickle are read as well; their time of writing is the modification time of the file.
+    """
+
+    try:
+        with open(filename, 'rb') as f:
+            content = f.read()
+    except OSError as e:
+        raise CheckpointError(f"{filename}: {e}")
+
+    if not content.startswith(MAGIC):
+        try:
+            return pickle.loads(content), os.path.getmtime(filename)
+        except Exception as e:
+            raise CheckpointError(f"{filename}: no checkpoint and no pickle: {e}")
+
+    if len(content) < HEADER.size:
+        raise CheckpointError(f"{filename}: truncated header")
+    _, version, length, crc, written = HEADER.unpack_from(content)
+    if version > VERSION:
+        raise CheckpointError(f"{filename}: unsupported version {version}")
+    payload = content[HEADER.size:]
+    if len(payload) != length or zlib.crc32(payload) != crc:
+        raise CheckpointError(f"{filename}: truncated or corrupted payload")
+    try:
+        return pickle.loads(payload), written
+    except Exception as e:
+        raise CheckpointError(f"{filename}: {e}")
+
+
+def read_newest_checkpoint(filename: str):
+    """Data of the newest valid snapshot of filename and its backup; None if there is none"""
+
+    snapshots = []
+    errors = []
+    for name in (filename, filename + BACKUP_SUFFIX):
+        if not os.path.exists(name):
+            continue
+        try:
+            data, written = read_checkpoint(name)
+        except CheckpointError as e:
+            errors.append(str(e))
+        else:
+            snapshots.append((written, data))
+
+    if not snapshots:
+        if errors:
+            raise CheckpointError('; '.join(errors))
+        return None
+    return max(snapshots, key=lambda snapshot: snapshot[0])[1]
+
+
+def _fsync_directory(directory: str) -> None:
+    # make the rename durable; not possible on every platform
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
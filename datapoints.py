@@ -313,6 +313,85 @@ class DataPoints:
     SUN_DURATION_WEEK: tuple = (f"{MasterKeys.SUN_DURATION}_week", 'Sonnenstunden in der aktuellen Woche *Berechnung im Plugin', 'h')
     SUN_DURATION_MONTH: tuple = (f"{MasterKeys.SUN_DURATION}_month", 'Sonnenstunden im aktuellen Monat *Berechnung im Plugin', 'h')
     SUN_DURATION_YEAR: tuple = (f"{MasterKeys.SUN_DURATION}_year", 'Sonnenstunden im aktuellen Jahr *Berechnung im Plugin', 'h')
+    OUTTEMP_DAY_MIN: tuple = (f"{OUTTEMP[0]}_day_min", 'Minimale Außentemperatur am aktuellen Tag *Berechnung im Plugin', '°C')
+    OUTTEMP_DAY_MIN_TIME: tuple = (f"{OUTTEMP[0]}_day_min_time", 'Zeitpunkt der minimalen Außentemperatur am aktuellen Tag *Berechnung im Plugin', '-')
+    OUTTEMP_DAY_MAX: tuple = (f"{OUTTEMP[0]}_day_max", 'Maximale Außentemperatur am aktuellen Tag *Berechnung im Plugin', '°C')
+    OUTTEMP_DAY_MAX_TIME: tuple = (f"{OUTTEMP[0]}_day_max_time", 'Zeitpunkt der maximalen Außentemperatur am aktuellen Tag *Berechnung im Plugin', '-')
+    OUTTEMP_DAY_AVG: tuple = (f"{OUTTEMP[0]}_day_avg", 'Mittlere Außentemperatur am aktuellen Tag *Berechnung im Plugin', '°C')
+    OUTTEMP_WEEK_MIN: tuple = (f"{OUTTEMP[0]}_week_min", 'Minimale Außentemperatur in der aktuellen Woche *Berechnung im Plugin', '°C')
+    OUTTEMP_WEEK_MIN_TIME: tuple = (f"{OUTTEMP[0]}_week_min_time", 'Zeitpunkt der minimalen Außentemperatur in der aktuellen Woche *Berechnung im Plugin', '-')
+    OUTTEMP_WEEK_MAX: tuple = (f"{OUTTEMP[0]}_week_max", 'Maximale Außentemperatur in der aktuellen Woche *Berechnung im Plugin', '°C')
+    OUTTEMP_WEEK_MAX_TIME: tuple = (f"{OUTTEMP[0]}_week_max_time", 'Zeitpunkt der maximalen Außentemperatur in der aktuellen Woche *Berechnung im Plugin', '-')
+    OUTTEMP_WEEK_AVG: tuple = (f"{OUTTEMP[0]}_week_avg", 'Mittlere Außentemperatur in der aktuellen Woche *Berechnung im Plugin', '°C')
+    OUTTEMP_MONTH_MIN: tuple = (f"{OUTTEMP[0]}_month_min", 'Minimale Außentemperatur im aktuellen Monat *Berechnung im Plugin', '°C')
+    OUTTEMP_MONTH_MIN_TIME: tuple = (f"{OUTTEMP[0]}_month_min_time", 'Zeitpunkt der minimalen Außentemperatur im aktuellen Monat *Berechnung im Plugin', '-')
+    OUTTEMP_MONTH_MAX: tuple = (f"{OUTTEMP[0]}_month_max", 'Maximale Außentemperatur im aktuellen Monat *Berechnung im Plugin', '°C')
+    OUTTEMP_MONTH_MAX_TIME: tuple = (f"{OUTTEMP[0]}_month_max_time", 'Zeitpunkt der maximalen Außentemperatur im aktuellen Monat *Berechnung im Plugin', '-')
+    OUTTEMP_MONTH_AVG: tuple = (f"{OUTTEMP[0]}_month_avg", 'Mittlere Außentemperatur im aktuellen Monat *Berechnung im Plugin', '°C')
+    OUTTEMP_YEAR_MIN: tuple = (f"{OUTTEMP[0]}_year_min", 'Minimale Außentemperatur im aktuellen Jahr *Berechnung im Plugin', '°C')
+    OUTTEMP_YEAR_MIN_TIME: tuple = (f"{OUTTEMP[0]}_year_min_time", 'Zeitpunkt der minimalen Außentemperatur im aktuellen Jahr *Berechnung im Plugin', '-')
+    OUTTEMP_YEAR_MAX: tuple = (f"{OUTTEMP[0]}_year_max", 'Maximale Außentemperatur im aktuellen Jahr *Berechnung im Plugin', '°C')
+    OUTTEMP_YEAR_MAX_TIME: tuple = (f"{OUTTEMP[0]}_year_max_time", 'Zeitpunkt der maximalen Außentemperatur im aktuellen Jahr *Berechnung im Plugin', '-')
+    OUTTEMP_YEAR_AVG: tuple = (f"{OUTTEMP[0]}_year_avg", 'Mittlere Außentemperatur im aktuellen Jahr *Berechnung im Plugin', '°C')
+    OUTHUMI_DAY_MIN: tuple = (f"{OUTHUMI[0]}_day_min", 'Minimale Außenluftfeuchtigkeit am aktuellen Tag *Berechnung im Plugin', '%RH')
+    OUTHUMI_DAY_MIN_TIME: tuple = (f"{OUTHUMI[0]}_day_min_time", 'Zeitpunkt der minimalen Außenluftfeuchtigkeit am aktuellen Tag *Berechnung im Plugin', '-')
+    OUTHUMI_DAY_MAX: tuple = (f"{OUTHUMI[0]}_day_max", 'Maximale Außenluftfeuchtigkeit am aktuellen Tag *Berechnung im Plugin', '%RH')
+    OUTHUMI_DAY_MAX_TIME: tuple = (f"{OUTHUMI[0]}_day_max_time", 'Zeitpunkt der maximalen Außenluftfeuchtigkeit am aktuellen Tag *Berechnung im Plugin', '-')
+    OUTHUMI_DAY_AVG: tuple = (f"{OUTHUMI[0]}_day_avg", 'Mittlere Außenluftfeuchtigkeit am aktuellen Tag *Berechnung im Plugin', '%RH')
+    OUTHUMI_WEEK_MIN: tuple = (f"{OUTHUMI[0]}_week_min", 'Minimale Außenluftfeuchtigkeit in der aktuellen Woche *Berechnung im Plugin', '%RH')
+    OUTHUMI_WEEK_MIN_TIME: tuple = (f"{OUTHUMI[0]}_week_min_time", 'Zeitpunkt der minimalen Außenluftfeuchtigkeit in der aktuellen Woche *Berechnung im Plugin', '-')
+    OUTHUMI_WEEK_MAX: tuple = (f"{OUTHUMI[0]}_week_max", 'Maximale Außenluftfeuchtigkeit in der aktuellen Woche *Berechnung im Plugin', '%RH')
+    OUTHUMI_WEEK_MAX_TIME: tuple = (f"{OUTHUMI[0]}_week_max_time", 'Zeitpunkt der maximalen Außenluftfeuchtigkeit in der aktuellen Woche *Berechnung im Plugin', '-')
+    OUTHUMI_WEEK_AVG: tuple = (f"{OUTHUMI[0]}_week_avg", 'Mittlere Außenluftfeuchtigkeit in der aktuellen Woche *Berechnung im Plugin', '%RH')
+    OUTHUMI_MONTH_MIN: tuple = (f"{OUTHUMI[0]}_month_min", 'Minimale Außenluftfeuchtigkeit im aktuellen Monat *Berechnung im Plugin', '%RH')
+    OUTHUMI_MONTH_MIN_TIME: tuple = (f"{OUTHUMI[0]}_month_min_time", 'Zeitpunkt der minimalen Außenluftfeuchtigkeit im aktuellen Monat *Berechnung im Plugin', '-')
+    OUTHUMI_MONTH_MAX: tuple = (f"{OUTHUMI[0]}_month_max", 'Maximale Außenluftfeuchtigkeit im aktuellen Monat *Berechnung im Plugin', '%RH')
+    OUTHUMI_MONTH_MAX_TIME: tuple = (f"{OUTHUMI[0]}_month_max_time", 'Zeitpunkt der maximalen Außenluftfeuchtigkeit im aktuellen Monat *Berechnung im Plugin', '-')
+    OUTHUMI_MONTH_AVG: tuple = (f"{OUTHUMI[0]}_month_avg", 'Mittlere Außenluftfeuchtigkeit im aktuellen Monat *Berechnung im Plugin', '%RH')
+    OUTHUMI_YEAR_MIN: tuple = (f"{OUTHUMI[0]}_year_min", 'Minimale Außenluftfeuchtigkeit im aktuellen Jahr *Berechnung im Plugin', '%RH')
+    OUTHUMI_YEAR_MIN_TIME: tuple = (f"{OUTHUMI[0]}_year_min_time", 'Zeitpunkt der minimalen Außenluftfeuchtigkeit im aktuellen Jahr *Berechnung im Plugin', '-')
+    OUTHUMI_YEAR_MAX: tuple = (f"{OUTHUMI[0]}_year_max", 'Maximale Außenluftfeuchtigkeit im aktuellen Jahr *Berechnung im Plugin', '%RH')
+    OUTHUMI_YEAR_MAX_TIME: tuple = (f"{OUTHUMI[0]}_year_max_time", 'Zeitpunkt der maximalen Außenluftfeuchtigkeit im aktuellen Jahr *Berechnung im Plugin', '-')
+    OUTHUMI_YEAR_AVG: tuple = (f"{OUTHUMI[0]}_year_avg", 'Mittlere Außenluftfeuchtigkeit im aktuellen Jahr *Berechnung im Plugin', '%RH')
+    RELBARO_DAY_MIN: tuple = (f"{RELBARO[0]}_day_min", 'Minimaler relativer Luftdruck am aktuellen Tag *Berechnung im Plugin', 'hPa')
+    RELBARO_DAY_MIN_TIME: tuple = (f"{RELBARO[0]}_day_min_time", 'Zeitpunkt des minimalen relativen Luftdrucks am aktuellen Tag *Berechnung im Plugin', '-')
+    RELBARO_DAY_MAX: tuple = (f"{RELBARO[0]}_day_max", 'Maximaler relativer Luftdruck am aktuellen Tag *Berechnung im Plugin', 'hPa')
+    RELBARO_DAY_MAX_TIME: tuple = (f"{RELBARO[0]}_day_max_time", 'Zeitpunkt des maximalen relativen Luftdrucks am aktuellen Tag *Berechnung im Plugin', '-')
+    RELBARO_WEEK_MIN: tuple = (f"{RELBARO[0]}_week_min", 'Minimaler relativer Luftdruck in der aktuellen Woche *Berechnung im Plugin', 'hPa')
+    RELBARO_WEEK_MIN_TIME: tuple = (f"{RELBARO[0]}_week_min_time", 'Zeitpunkt des minimalen relativen Luftdrucks in der aktuellen Woche *Berechnung im Plugin', '-')
+    RELBARO_WEEK_MAX: tuple = (f"{RELBARO[0]}_week_max", 'Maximaler relativer Luftdruck in der aktuellen Woche *Berechnung im Plugin', 'hPa')
+    RELBARO_WEEK_MAX_TIME: tuple = (f"{RELBARO[0]}_week_max_time", 'Zeitpunkt des maximalen relativen Luftdrucks in der aktuellen Woche *Berechnung im Plugin', '-')
+    RELBARO_MONTH_MIN: tuple = (f"{RELBARO[0]}_month_min", 'Minimaler relativer Luftdruck im aktuellen Monat *Berechnung im Plugin', 'hPa')
+    RELBARO_MONTH_MIN_TIME: tuple = (f"{RELBARO[0]}_month_min_time", 'Zeitpunkt des minimalen relativen Luftdrucks im aktuellen Monat *Berechnung im Plugin', '-')
+    RELBARO_MONTH_MAX: tuple = (f"{RELBARO[0]}_month_max", 'Maximaler relativer Luftdruck im aktuellen Monat *Berechnung im Plugin', 'hPa')
+    RELBARO_MONTH_MAX_TIME: tuple = (f"{RELBARO[0]}_month_max_time", 'Zeitpunkt des maximalen relativen Luftdrucks im aktuellen Monat *Berechnung im Plugin', '-')
+    RELBARO_YEAR_MIN: tuple = (f"{RELBARO[0]}_year_min", 'Minimaler relativer Luftdruck im aktuellen Jahr *Berechnung im Plugin', 'hPa')
+    RELBARO_YEAR_MIN_TIME: tuple = (f"{RELBARO[0]}_year_min_time", 'Zeitpunkt des minimalen relativen Luftdrucks im aktuellen Jahr *Berechnung im Plugin', '-')
+    RELBARO_YEAR_MAX: tuple = (f"{RELBARO[0]}_year_max", 'Maximaler relativer Luftdruck im aktuellen Jahr *Berechnung im Plugin', 'hPa')
+    RELBARO_YEAR_MAX_TIME: tuple = (f"{RELBARO[0]}_year_max_time", 'Zeitpunkt des maximalen relativen Luftdrucks im aktuellen Jahr *Berechnung im Plugin', '-')
+    GUSTSPEED_DAY_MAX: tuple = (f"{GUSTSPEED[0]}_day_max", 'Maximale Böengeschwindigkeit am aktuellen Tag *Berechnung im Plugin', 'm/s')
+    GUSTSPEED_DAY_MAX_TIME: tuple = (f"{GUSTSPEED[0]}_day_max_time", 'Zeitpunkt der maximalen Böengeschwindigkeit am aktuellen Tag *Berechnung im Plugin', '-')
+    GUSTSPEED_WEEK_MAX: tuple = (f"{GUSTSPEED[0]}_week_max", 'Maximale Böengeschwindigkeit in der aktuellen Woche *Berechnung im Plugin', 'm/s')
+    GUSTSPEED_WEEK_MAX_TIME: tuple = (f"{GUSTSPEED[0]}_week_max_time", 'Zeitpunkt der maximalen Böengeschwindigkeit in der aktuellen Woche *Berechnung im Plugin', '-')
+    GUSTSPEED_MONTH_MAX: tuple = (f"{GUSTSPEED[0]}_month_max", 'Maximale Böengeschwindigkeit im aktuellen Monat *Berechnung im Plugin', 'm/s')
+    GUSTSPEED_MONTH_MAX_TIME: tuple = (f"{GUSTSPEED[0]}_month_max_time", 'Zeitpunkt der maximalen Böengeschwindigkeit im aktuellen Monat *Berechnung im Plugin', '-')
+    GUSTSPEED_YEAR_MAX: tuple = (f"{GUSTSPEED[0]}_year_max", 'Maximale Böengeschwindigkeit im aktuellen Jahr *Berechnung im Plugin', 'm/s')
+    GUSTSPEED_YEAR_MAX_TIME: tuple = (f"{GUSTSPEED[0]}_year_max_time", 'Zeitpunkt der maximalen Böengeschwindigkeit im aktuellen Jahr *Berechnung im Plugin', '-')
+    RAIN_HOUR_SUM: tuple = (f"{RAIN[0]}_hour_sum", 'Regenmenge in der aktuellen Stunde aus dem Zählerstand *Berechnung im Plugin', 'mm')
+    RAIN_DAY_SUM: tuple = (f"{RAIN[0]}_day_sum", 'Regenmenge am aktuellen Tag aus dem Zählerstand *Berechnung im Plugin', 'mm')
+    RAIN_WEEK_SUM: tuple = (f"{RAIN[0]}_week_sum", 'Regenmenge in der aktuellen Woche aus dem Zählerstand *Berechnung im Plugin', 'mm')
+    RAIN_MONTH_SUM: tuple = (f"{RAIN[0]}_month_sum", 'Regenmenge im aktuellen Monat aus dem Zählerstand *Berechnung im Plugin', 'mm')
+    RAIN_YEAR_SUM: tuple = (f"{RAIN[0]}_year_sum", 'Regenmenge im aktuellen Jahr aus dem Zählerstand *Berechnung im Plugin', 'mm')
+    PIEZO_RAIN_HOUR_SUM: tuple = (f"{PIEZO_RAIN[0]}_hour_sum", 'Regenmenge des Piezo Regensensors in der aktuellen Stunde aus dem Zählerstand *Berechnung im Plugin', 'mm')
+    PIEZO_RAIN_DAY_SUM: tuple = (f"{PIEZO_RAIN[0]}_day_sum", 'Regenmenge des Piezo Regensensors am aktuellen Tag aus dem Zählerstand *Berechnung im Plugin', 'mm')
+    PIEZO_RAIN_WEEK_SUM: tuple = (f"{PIEZO_RAIN[0]}_week_sum", 'Regenmenge des Piezo Regensensors in der aktuellen Woche aus dem Zählerstand *Berechnung im Plugin', 'mm')
+    PIEZO_RAIN_MONTH_SUM: tuple = (f"{PIEZO_RAIN[0]}_month_sum", 'Regenmenge des Piezo Regensensors im aktuellen Monat aus dem Zählerstand *Berechnung im Plugin', 'mm')
+    PIEZO_RAIN_YEAR_SUM: tuple = (f"{PIEZO_RAIN[0]}_year_sum", 'Regenmenge des Piezo Regensensors im aktuellen Jahr aus dem Zählerstand *Berechnung im Plugin', 'mm')
+    LIGHTNING_COUNT_HOUR_SUM: tuple = (f"{LIGHTNING_COUNT[0]}_hour_sum", 'Anzahl der Blitze in der aktuellen Stunde aus dem Zählerstand *Berechnung im Plugin', '-')
+    LIGHTNING_COUNT_DAY_SUM: tuple = (f"{LIGHTNING_COUNT[0]}_day_sum", 'Anzahl der Blitze am aktuellen Tag aus dem Zählerstand *Berechnung im Plugin', '-')
+    LIGHTNING_COUNT_WEEK_SUM: tuple = (f"{LIGHTNING_COUNT[0]}_week_sum", 'Anzahl der Blitze in der aktuellen Woche aus dem Zählerstand *Berechnung im Plugin', '-')
+    LIGHTNING_COUNT_MONTH_SUM: tuple = (f"{LIGHTNING_COUNT[0]}_month_sum", 'Anzahl der Blitze im aktuellen Monat aus dem Zählerstand *Berechnung im Plugin', '-')
+    LIGHTNING_COUNT_YEAR_SUM: tuple = (f"{LIGHTNING_COUNT[0]}_year_sum", 'Anzahl der Blitze im aktuellen Jahr aus dem Zählerstand *Berechnung im Plugin', '-')
     COMFORT: tuple = ('comfort', 'Komfort basierend auf dem Taupunkt', '-')
     THERMOPHYSIOLOGICAL_STRAIN: tuple = ('thermophysiologisch', 'thermophysiologische Beanspruchung', '-')
     CONDENSATION: tuple = ('condensation', 'Kondensationbildung', '-')
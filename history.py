@@ -0,0 +1,234 @@
+import array
+import os
+import sqlite3
+import threading
+import time
+
+from datetime import datetime
+
+from .datapoints import MasterKeys
+
+
+RAW = 'raw'
+MINUTE = 'minute'
+HOUR = 'hour'
+AUTO = 'auto'
+RESOLUTIONS = (RAW, MINUTE, HOUR, AUTO)
+
+# width of the buckets of the aggregated tiers in seconds
+BUCKETS = {MINUTE: 60, HOUR: 3600}
+
+SCHEMA = ("CREATE TABLE IF NOT EXISTS attribute (id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL)",
+          "CREATE TABLE IF NOT EXISTS raw (attribute INTEGER NOT NULL, ts INTEGER NOT NULL, value REAL NOT NULL, PRIMARY KEY (attribute, ts)) WITHOUT ROWID",
+          "CREATE TABLE IF NOT EXISTS minute (attribute INTEGER NOT NULL, ts INTEGER NOT NULL, min REAL, max REAL, sum REAL, count INTEGER, PRIMARY KEY (attribute, ts)) WITHOUT ROWID",
+          "CREATE TABLE IF NOT EXISTS hour (attribute INTEGER NOT NULL, ts INTEGER NOT NULL, min REAL, max REAL, sum REAL, count INTEGER, PRIMARY KEY (attribute, ts)) WITHOUT ROWID",
+          "CREATE TABLE IF NOT EXISTS compacted (tier TEXT PRIMARY KEY, ts INTEGER NOT NULL)",
+          )
+
+
+class HistoryError(Exception):
+    """Exception raised when the history database cannot be opened or a query is not valid."""
+
+
+def _timestamp(value, default: float) -> int:
+    if value is None:
+        return int(default)
+    if isinstance(value, datetime):
+        return int(value.timestamp())
+    return int(value)
+
+
+class HistoryStore(object):
+    """History of the values of attributes in a SQLite database with three tiers of resolution.
+
+    raw keeps every reading of the last raw_days days, minute the min, max, sum and count per minute of the last minute_days days and hour the
+    same per hour without limit. Readings are collected by add() in memory and written in one transaction by flush(); compact() aggregates the
+    completed minutes and hours into the next tier and deletes expired rows. Both are meant to run in the background (e.g. by the scheduler every
+    minute), so add() only appends to a list.
+
+    The tables compacted holds the end of the last compacted minute and hour; queries of an aggregated tier aggregate the readings after it from
+    the finer tiers, so they are complete up to the last flush. Readings older than the last compaction are not aggregated anymore.
+    """
+
+    def __init__(self, filename: str, attributes: tuple, raw_days: int = 7, minute_days: int = 90):
+
+        self.filename = filename
+        self.attributes = tuple(attributes)
+        self.raw_days = raw_days
+        self.minute_days = minute_days
+        self._pending = []
+        self._lock = threading.Lock()                                      # lock of pending readings
+        self._db_lock = threading.Lock()                                   # lock of the database connection
+        self._ids = {}
+        self._db = None
+        self.open()
+
+    def open(self) -> None:
+        """Open the database, e.g. again after close(); nothing to do if it is open"""
+
+        with self._db_lock:
+            if self._db is not None:
+                return
+            try:
+                os.makedirs(os.path.dirname(self.filename) or '.', exist_ok=True)
+                db = sqlite3.connect(self.filename, check_same_thread=False)
+                db.execute("PRAGMA journal_mode=WAL")
+                db.execute("PRAGMA synchronous=NORMAL")
+                with db:
+                    for statement in SCHEMA:
+                        db.execute(statement)
+                self._ids = dict(db.execute("SELECT name, id FROM attribute"))
+            except sqlite3.Error as e:
+                raise HistoryError(f"{self.filename}: {e}")
+            self._db = db
+
+    def add(self, packet: dict) -> None:
+        """Collect the numeric values of the configured attributes of a packet; nothing is collected while the database is closed"""
+
+        if self._db is None:
+            return
+        timestamp = int(packet.get(MasterKeys.TIMESTAMP, time.time()))
+        readings = []
+        for attribute in self.attributes:
+            value = packet.get(attribute)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                readings.append((attribute, timestamp, value))
+        if readings:
+            with self._lock:
+                self._pending.extend(readings)
+
+    def _get_id(self, attribute: str) -> int:
+        attribute_id = self._ids.get(attribute)
+        if attribute_id is None:
+            self._db.execute("INSERT OR IGNORE INTO attribute (name) VALUES (?)", (attribute,))
+            attribute_id = self._db.execute("SELECT id FROM attribute WHERE name = ?", (attribute,)).fetchone()[0]
+            self._ids[attribute] = attribute_id
+        return attribute_id
+
+    def flush(self) -> int:
+        """Write the collected readings to the raw tier; return the number of readings"""
+
+        if self._db is None:
+            return 0
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return 0
+
+        with self._db_lock, self._db:
+            rows = [(self._get_id(attribute), timestamp, value) for attribute, timestamp, value in pending]
+            self._db.executemany("INSERT OR REPLACE INTO raw (attribute, ts, value) VALUES (?, ?, ?)", rows)
+        return len(rows)
+
+    def compact(self, now: float = None) -> None:
+        """Write the pending readings, aggregate completed minutes and hours to the next tier and delete rows beyond the retention of their tier"""
+
+        now = int(now if now is not None else time.time())
+        if self._db is None:
+            return
+        self.flush()
+
+        with self._db_lock, self._db:
+            watermarks = self._get_watermarks()
+            ids = list(self._ids.values())
+            minute_end = now - now % 60
+            hour_end = now - now % 3600
+
+            # statements per attribute to use the range of the primary key (attribute, ts) instead of scanning the table
+            self._db.executemany("INSERT OR REPLACE INTO minute (attribute, ts, min, max, sum, count) "
+                                 "SELECT attribute, ts - ts % 60, min(value), max(value), sum(value), count(*) FROM raw "
+                                 "WHERE attribute = ? AND ts >= ? AND ts < ? GROUP BY ts - ts % 60",
+                                 [(attribute_id, watermarks[MINUTE], minute_end) for attribute_id in ids])
+            self._db.executemany("INSERT OR REPLACE INTO hour (attribute, ts, min, max, sum, count) "
+                                 "SELECT attribute, ts - ts % 3600, min(min), max(max), sum(sum), sum(count) FROM minute "
+                                 "WHERE attribute = ? AND ts >= ? AND ts < ? GROUP BY ts - ts % 3600",
+                                 [(attribute_id, watermarks[HOUR], hour_end) for attribute_id in ids])
+            self._db.executemany("INSERT OR REPLACE INTO compacted (tier, ts) VALUES (?, ?)", ((MINUTE, minute_end), (HOUR, hour_end)))
+            self._db.executemany("DELETE FROM raw WHERE attribute = ? AND ts < ?", [(attribute_id, minute_end - self.raw_days * 86400) for attribute_id in ids])
+            self._db.executemany("DELETE FROM minute WHERE attribute = ? AND ts < ?", [(attribute_id, hour_end - self.minute_days * 86400) for attribute_id in ids])
+
+    def _get_watermarks(self) -> dict:
+        watermarks = {MINUTE: 0, HOUR: 0}
+        watermarks.update(self._db.execute("SELECT tier, ts FROM compacted"))
+        return watermarks
+
+    def get_resolution(self, start: int, now: float = None) -> str:
+        """Finest tier still holding the readings from start on"""
+
+        now = now if now is not None else time.time()
+        if start >= now - self.raw_days * 86400:
+            return RAW
+        if start >= now - self.minute_days * 86400:
+            return MINUTE
+        return HOUR
+
+    def query(self, attribute: str, start=None, end=None, resolution: str = AUTO) -> dict:
+        """History of attribute from start (inclusive) to end (exclusive) as dict of arrays
+
+        start and end are timestamps or datetimes; end defaults to now, start to one day before end. resolution is raw, minute, hour or auto
+        (finest tier holding start). raw returns the arrays ts and value, the aggregated tiers ts (start of bucket), min, max, avg, sum and count.
+        """
+
+        if self._db is None:
+            raise HistoryError(f"{self.filename} is closed")
+        if resolution not in RESOLUTIONS:
+            raise HistoryError(f"Unknown resolution {resolution}; valid are {', '.join(RESOLUTIONS)}")
+
+        end = _timestamp(end, time.time() + 1)
+        start = _timestamp(start, end - 86400)
+        if resolution == AUTO:
+            resolution = self.get_resolution(start)
+
+        self.flush()
+        result = {'attribute': attribute, 'resolution': resolution, 'ts': array.array('d')}
+
+        with self._db_lock:
+            attribute_id = self._ids.get(attribute)
+            if resolution == RAW:
+                result['value'] = array.array('d')
+                if attribute_id is None:
+                    return result
+                rows = self._db.execute("SELECT ts, value FROM raw WHERE attribute = ? AND ts >= ? AND ts < ? ORDER BY ts", (attribute_id, start, end))
+                columns = (result['ts'], result['value'])
+            else:
+                for key in ('min', 'max', 'avg', 'sum'):
+                    result[key] = array.array('d')
+                result['count'] = array.array('L')
+                if attribute_id is None:
+                    return result
+                rows = self._query_buckets(attribute_id, start, end, resolution)
+                columns = (result['ts'], result['min'], result['max'], result['avg'], result['sum'], result['count'])
+
+            for row in rows:
+                for column, value in zip(columns, row):
+                    column.append(value)
+        return result
+
+    def _query_buckets(self, attribute_id: int, start: int, end: int, resolution: str):
+        # rows of the tier before its watermark, aggregated on the fly from the finer tiers after it
+        width = BUCKETS[resolution]
+        start -= start % width
+        watermarks = self._get_watermarks()
+
+        parts = [f"SELECT ts AS bucket, min, max, sum, count FROM {resolution} WHERE attribute = ? AND ts >= ? AND ts < ?"]
+        params = [attribute_id, start, min(end, watermarks[resolution])]
+        lower = watermarks[resolution]
+        if resolution == HOUR:
+            parts.append(f"SELECT ts - ts % {width}, min, max, sum, count FROM minute WHERE attribute = ? AND ts >= ? AND ts < ?")
+            params += [attribute_id, max(start, lower), min(end, watermarks[MINUTE])]
+            lower = max(lower, watermarks[MINUTE])
+        parts.append(f"SELECT ts - ts % {width}, value, value, value, 1 FROM raw WHERE attribute = ? AND ts >= ? AND ts < ?")
+        params += [attribute_id, max(start, lower), end]
+
+        return self._db.execute(f"SELECT bucket, min(min), max(max), sum(sum) / sum(count), sum(sum), sum(count) FROM ({' UNION ALL '.join(parts)}) "
+                                f"GROUP BY bucket ORDER BY bucket", params)
+
+    def close(self) -> None:
+        """Write the pending readings and close the database; open() opens it again"""
+
+        if self._db is None:
+            return
+        self.flush()
+        with self._db_lock:
+            self._db.close()
+            self._db = None
@@ -0,0 +1,102 @@
+import threading
+import time
+
+from collections import deque, OrderedDict
+
+
+class DuplicateFilter(object):
+    """Detect uploads received more than once within a time to live.
+
+    Uploads are identified by a hash of their body, which contains PASSKEY (or ID) and dateutc of the station. Expired keys are removed in order
+    of their expiry, so each call has amortised constant cost.
+    """
+
+    def __init__(self, ttl: float = 10.0):
+
+        self.ttl = ttl
+        self.duplicates = 0
+
+        self._lock = threading.Lock()
+        self._expiry = {}
+        self._order = deque()
+
+    def is_duplicate(self, data: str, now: float = None) -> bool:
+        """Return True, if the same data has been seen within ttl; otherwise remember it"""
+
+        if self.ttl <= 0:
+            return False
+
+        if now is None:
+            now = time.monotonic()
+        key = hash(data)
+
+        with self._lock:
+            order = self._order
+            while order and order[0][0] <= now:
+                expiry, old_key = order.popleft()
+                if self._expiry.get(old_key) == expiry:
+                    del self._expiry[old_key]
+
+            if self._expiry.get(key, 0) > now:
+                self.duplicates += 1
+                return True
+
+            expiry = now + self.ttl
+            self._expiry[key] = expiry
+            order.append((expiry, key))
+            return False
+
+
+class RateLimiter(object):
+    """Token bucket per client.
+
+    Each client gets a bucket of burst tokens, which is refilled with rate tokens per second. A request takes one token; requests without token
+    are throttled. The buckets are kept in order of the last request; buckets of idle clients are removed from the front once they are full again,
+    and the least recently seen bucket is removed if MAX_CLIENTS is reached, so each call has amortised constant cost.
+    """
+
+    MAX_CLIENTS = 1024
+
+    def __init__(self, rate: float = 0.0, burst: int = 5):
+
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.throttled = 0
+
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()
+
+    def allow(self, client: str, now: float = None) -> bool:
+        """Return True, if the client may send a further request"""
+
+        if self.rate <= 0:
+            return True
+
+        if now is None:
+            now = time.monotonic()
+
+        with self._lock:
+            # the bucket is inserted again at the end as most recently seen
+            bucket = self._buckets.pop(client, None)
+            if bucket is None:
+                self._prune(now)
+                tokens = self.burst
+            else:
+                tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+
+            if tokens < 1:
+                self._buckets[client] = (tokens, now)
+                self.throttled += 1
+                return False
+
+            self._buckets[client] = (tokens - 1, now)
+            return True
+
+    def _prune(self, now: float) -> None:
+        full_after = self.burst / self.rate
+        buckets = self._buckets
+        while buckets:
+            tokens, last = next(iter(buckets.values()))
+            if now - last < full_after and len(buckets) < self.MAX_CLIENTS:
+                break
+            buckets.popitem(last=False)
@@ -0,0 +1,59 @@
+import functools
+
+from . import meteocalcs
+
+
+def get_humidity_values(temperature: float, humidity_rel: float) -> tuple:
+    """Dew point, absolute humidity, cloud ceiling and condensation text of a temperature / humidity pair with one psychrometric state"""
+
+    state = meteocalcs.get_psychrometric_state(temperature, humidity_rel)
+    return (state.dew_point,
+            meteocalcs.get_abs_hum(temperature, humidity_rel, state),
+            meteocalcs.get_cloud_ceiling(temperature, humidity_rel, state),
+            meteocalcs.condensation(temperature, humidity_rel, state)[1])
+
+
+class MeteoCache(object):
+    """Bounded LRU caches in front of the meteocalcs functions evaluated for every packet.
+
+    Temperature and humidity change in steps of 0.1 °C and 1 % and repeat constantly, so the derived values are mostly looked up instead of
+    computed. The caches are keyed on the arguments as delivered by the parsers, which are already rounded; text outputs additionally on the
+    language. Each function gets its own functools.lru_cache with maxsize entries; maxsize 0 disables caching.
+    """
+
+    CACHED_FUNCTIONS = {'get_humidity_values': get_humidity_values,
+                        'get_heat_index': meteocalcs.get_heat_index,
+                        'get_windchill': meteocalcs.get_windchill,
+                        'get_feels_like_temperature': meteocalcs.get_feels_like_temperature,
+                        'get_comfort_from_dewpoint': meteocalcs.get_comfort_from_dewpoint,
+                        'get_thermophysiological_strain': meteocalcs.get_thermophysiological_strain,
+                        'get_weather_now': meteocalcs.get_weather_now,
+                        }
+
+    def __init__(self, maxsize: int = 256):
+
+        self.maxsize = max(0, maxsize)
+        self._caches = {}
+
+        for name, func in self.CACHED_FUNCTIONS.items():
+            if self.maxsize:
+                func = functools.lru_cache(maxsize=self.maxsize)(func)
+                self._caches[name] = func
+            setattr(self, name, func)
+
+    def clear(self) -> None:
+        for func in self._caches.values():
+            func.cache_clear()
+
+    @property
+    def statistics(self) -> dict:
+        """Hits, misses and size per cached function and in total"""
+
+        result = {'hits': 0, 'misses': 0, 'size': 0, 'maxsize': self.maxsize, 'functions': {}}
+        for name, func in self._caches.items():
+            info = func.cache_info()
+            result['functions'][name] = {'hits': info.hits, 'misses': info.misses, 'size': info.currsize}
+            result['hits'] += info.hits
+            result['misses'] += info.misses
+            result['size'] += info.currsize
+        return result
@@ -1,7 +1,14 @@
 import math
-from typing import Union
+from typing import NamedTuple, Union
 import lib.env as env
 
+try:
+    import numpy as np
+    NUMPY_IMPORTED = True
+except ImportError:
+    np = None
+    NUMPY_IMPORTED = False
+
 
 MAGNUS_COEFFICIENTS = dict(
     positive=dict(a=6.11213, b=17.5043, c=241.2),
@@ -24,7 +31,46 @@ ENTHALPY_OF_VAPORIZATION_WATER_100C = 2257e3    # enthalpy of vaporization of li
 EARTH_RADIUS = 6371000                          # Earth radius in meters
 
 
-def get_dew_point(temperature: float, humidity_rel: float) -> float:
+class PsychrometricState(NamedTuple):
+    """Psychrometric state of air of a temperature and relative humidity; the Magnus formula is evaluated once in get_psychrometric_state"""
+
+    temperature: float              # °C
+    humidity_rel: float             # %
+    saturation_pressure: float      # saturated water vapor pressure in hPa
+    vapor_pressure: float           # water vapor pressure in hPa
+    dew_point: float                # dew point temperature in °C, rounded to 0.1
+    frost_point: float              # frost point temperature (over ice) in °C, rounded to 0.1
+
+
+def get_psychrometric_state(temperature: float, humidity_rel: float) -> PsychrometricState:
+    """
+    Compute saturated and actual water vapor pressure, dew point and frost point of air using the Magnus formula
+
+    Dew point and vapor pressures are the same as of get_dew_point, saturated_water_vapor_pressure and water_vapor_pressure. The frost point
+    uses the coefficients over ice for all temperatures.
+
+    :param temperature: temperature in °C
+    :param humidity_rel: relative humidity in %
+    :return: psychrometric state
+    """
+
+    magnus_coe = MAGNUS_COEFFICIENTS['positive'] if temperature > 0 else MAGNUS_COEFFICIENTS['negative']
+
+    exponent = (magnus_coe['b'] * temperature) / (magnus_coe['c'] + temperature)
+    saturation_pressure = magnus_coe['a'] * math.exp(exponent)
+    vapor_pressure = humidity_rel / 100 * saturation_pressure
+
+    alpha = exponent + math.log(humidity_rel / 100.0)
+    dew_point = round((magnus_coe['c'] * alpha) / (magnus_coe['b'] - alpha), 1)
+
+    ice_coe = MAGNUS_COEFFICIENTS['negative']
+    alpha_ice = math.log(vapor_pressure / ice_coe['a'])
+    frost_point = round((ice_coe['c'] * alpha_ice) / (ice_coe['b'] - alpha_ice), 1)
+
+    return PsychrometricState(temperature, humidity_rel, saturation_pressure, vapor_pressure, dew_point, frost_point)
+
+
+def get_dew_point(temperature: float, humidity_rel: float, state: PsychrometricState = None) -> float:
     """
     Calculate dew point temperature in °C
 
@@ -42,25 +88,24 @@ def get_dew_point(temperature: float, humidity_rel: float) -> float:
 
     :param temperature: current ambient temperature in °C
     :param humidity_rel: relative humidity in %
+    :param state: psychrometric state of temperature and humidity_rel, if already computed
     :return:  dew point temperature in °C
     """
 
-    magnus_coe = MAGNUS_COEFFICIENTS['positive'] if temperature > 0 else MAGNUS_COEFFICIENTS['negative']
+    return (state or get_psychrometric_state(temperature, humidity_rel)).dew_point
 
-    alpha = ((magnus_coe['b'] * temperature) / (magnus_coe['c'] + temperature)) + math.log(humidity_rel / 100.0)
-    return round((magnus_coe['c'] * alpha) / (magnus_coe['b'] - alpha), 1)
 
-
-def get_abs_hum(temperature: float, humidity_rel: float) -> float:
+def get_abs_hum(temperature: float, humidity_rel: float, state: PsychrometricState = None) -> float:
     """
     Return the absolute humidity in g/cm3 from the relative humidity in % and temperature (Celsius)
 
     :param temperature: temperature in °C
     :param humidity_rel: relative humidity in %
+    :param state: psychrometric state of temperature and humidity_rel, if already computed
     :return: absolute humidity in g/cm3
     """
 
-    return round(10 ** 5 * M_WASSERDAMPF / R * water_vapor_pressure(temperature, humidity_rel) / (temperature + ZERO_CELSIUS_IN_KELVIN), 1)
+    return round(10 ** 5 * M_WASSERDAMPF / R * water_vapor_pressure(temperature, humidity_rel, state) / (temperature + ZERO_CELSIUS_IN_KELVIN), 1)
 
 
 def get_windchill(temperature: float, wind_speed: float, units: str = 'imperial') -> Union[float, None]:
@@ -207,7 +252,7 @@ def get_feels_like_temperature(temperature: float, humidity_rel: float, wind_spe
         # Heat Index for High temp cases
         FEELS_LIKE = get_heat_index(T, humidity_rel, units='imperial')
     else:
-        FEELS_LIKE = temperature
+        FEELS_LIKE = T
 
     if units == 'metric':
         return round(env.f_to_c(FEELS_LIKE), 1)
@@ -275,17 +320,18 @@ def get_weather_forecast(pressure_differance: float, lang: str = 'de') -> str:
     return _weather_forecast[wproglvl]
 
 
-def get_cloud_ceiling(temperature: float, humidity_rel: float) -> float:
+def get_cloud_ceiling(temperature: float, humidity_rel: float, state: PsychrometricState = None) -> float:
     """
     Computes cloud ceiling (Wolkenuntergrenze/Konvektionskondensationsniveau)
     Faustformel für die Berechnung der Höhe der Wolkenuntergrenze von Quellwolken: Höhe in Meter = 122 x Spread (Taupunktdifferenz)
 
     :param temperature: outside temperatur in °C
     :param humidity_rel: rel humidity
+    :param state: psychrometric state of temperature and humidity_rel, if already computed
     :return: cloud ceiling in meter
     """
 
-    return int(round((temperature - get_dew_point(temperature, humidity_rel)) * 122, 1))
+    return int(round((temperature - get_dew_point(temperature, humidity_rel, state)) * 122, 1))
 
 
 def get_aqi_from_pm25(pm25_value):
@@ -422,15 +468,18 @@ def saturated_water_vapor_pressure(temperature: float):
     return magnus_coe['a'] * math.exp((magnus_coe['b'] * temperature) / (magnus_coe['c'] + temperature))
 
 
-def water_vapor_pressure(temperature: float, humidity_rel: float):
+def water_vapor_pressure(temperature: float, humidity_rel: float, state: PsychrometricState = None):
     """
     Compute actual water vapor pressure (Dampfdruck) in hPa
 
     :param temperature: temperature in °C
     :param humidity_rel: humidity_rel in %
+    :param state: psychrometric state of temperature and humidity_rel, if already computed
     :return: water vapor pressure in hPa
     """
 
+    if state:
+        return state.vapor_pressure
     return humidity_rel / 100 * saturated_water_vapor_pressure(temperature)
 
 
@@ -446,6 +495,12 @@ def mph_to_ms(mph: float, dec: int = 1) -> float:
     return round(env.kmh_to_ms(env.mph_to_kmh(mph)), dec)
 
 
+def kmh_to_ms(kmh: float, dec: int = 1) -> float:
+    """Convert km/h to m/s"""
+
+    return round(env.kmh_to_ms(kmh), dec)
+
+
 def in_to_hpa(f: float, dec: int = 2) -> float:
     """Convert inHg to hPa"""
 
@@ -485,9 +540,9 @@ def solar_rad_to_brightness(solar_radiation: float, dec: int = 0) -> float:
     return round(float(solar_radiation) * S2B, dec)
 
 
-def condensation(temperature: float, humidity_rel: float) -> tuple:
+def condensation(temperature: float, humidity_rel: float, state: PsychrometricState = None) -> tuple:
 
-    dew_point = get_dew_point(temperature, humidity_rel)
+    dew_point = get_dew_point(temperature, humidity_rel, state)
 
     if dew_point >= temperature:
         if temperature <= 0:
@@ -539,3 +594,213 @@ def get_thermophysiological_strain(feels_like_temp: float) -> tuple:
         return 'heiß', 'starke Wärmebelastung'
     if feels_like_temp > 38:
         return 'sehr heiß', 'extreme Wärmebelastung'
+
+
+#############################################################
+#   Batch variants for arrays
+#############################################################
+
+# The batch variants take array-likes (numpy arrays, lists, history columns) of equal shape or scalars and return numpy arrays. The Magnus
+# coefficients and the validity ranges of wind chill and heat index are selected per element with masks. Results equal those of the scalar
+# functions, except for values lying exactly between two tenths, which np.round may round the other way.
+# Without numpy the scalar functions are mapped over the arguments and a list is returned.
+
+def _scalar_batch(func, *args, **kwargs) -> list:
+    """Map a scalar function over array-likes or scalars as fallback without numpy"""
+
+    length = max((len(arg) for arg in args if hasattr(arg, '__len__')), default=None)
+    if length is None:
+        return [func(*args, **kwargs)]
+    args = [arg if hasattr(arg, '__len__') else [arg] * length for arg in args]
+    return [func(*values, **kwargs) for values in zip(*args)]
+
+
+def _magnus_coefficients(temperature):
+    """Magnus coefficients a, b, c per element, positive ones for temperatures above 0 °C"""
+
+    positive = temperature > 0
+    pos = MAGNUS_COEFFICIENTS['positive']
+    neg = MAGNUS_COEFFICIENTS['negative']
+    return np.where(positive, pos['a'], neg['a']), np.where(positive, pos['b'], neg['b']), np.where(positive, pos['c'], neg['c'])
+
+
+def saturated_water_vapor_pressure_batch(temperature):
+    """
+    Compute saturated water vapor pressure (Sättigungsdampfdruck) in hPa for arrays
+
+    :param temperature: temperatures in °C
+    :return: saturated water vapor pressures in hPa
+    """
+
+    if not NUMPY_IMPORTED:
+        return _scalar_batch(saturated_water_vapor_pressure, temperature)
+
+    t = np.asarray(temperature, dtype=float)
+    a, b, c = _magnus_coefficients(t)
+    return a * np.exp((b * t) / (c + t))
+
+
+def water_vapor_pressure_batch(temperature, humidity_rel):
+    """
+    Compute actual water vapor pressure (Dampfdruck) in hPa for arrays
+
+    :param temperature: temperatures in °C
+    :param humidity_rel: humidity_rel in %
+    :return: water vapor pressures in hPa
+    """
+
+    if not NUMPY_IMPORTED:
+        return _scalar_batch(water_vapor_pressure, temperature, humidity_rel)
+
+    return np.asarray(humidity_rel, dtype=float) / 100 * saturated_water_vapor_pressure_batch(temperature)
+
+
+def get_dew_point_batch(temperature, humidity_rel):
+    """
+    Calculate dew point temperatures in °C for arrays, see get_dew_point
+
+    :param temperature: ambient temperatures in °C
+    :param humidity_rel: relative humidities in %
+    :return: dew point temperatures in °C; nan for a humidity of 0
+    """
+
+    if not NUMPY_IMPORTED:
+        return _scalar_batch(get_dew_point, temperature, humidity_rel)
+
+    t = np.asarray(temperature, dtype=float)
+    _, b, c = _magnus_coefficients(t)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        alpha = ((b * t) / (c + t)) + np.log(np.asarray(humidity_rel, dtype=float) / 100.0)
+        return np.round((c * alpha) / (b - alpha), 1)
+
+
+def get_abs_hum_batch(temperature, humidity_rel):
+    """
+    Return the absolute humidity in g/cm3 for arrays of relative humidity in % and temperature (Celsius)
+
+    :param temperature: temperatures in °C
+    :param humidity_rel: relative humidities in %
+    :return: absolute humidities in g/cm3
+    """
+
+    if not NUMPY_IMPORTED:
+        return _scalar_batch(get_abs_hum, temperature, humidity_rel)
+
+    t = np.asarray(temperature, dtype=float)
+    return np.round(10 ** 5 * M_WASSERDAMPF / R * water_vapor_pressure_batch(t, humidity_rel) / (t + ZERO_CELSIUS_IN_KELVIN), 1)
+
+
+def get_cloud_ceiling_batch(temperature, humidity_rel):
+    """
+    Computes cloud ceilings (Wolkenuntergrenze) in meter for arrays, see get_cloud_ceiling
+
+    :param temperature: outside temperaturs in °C
+    :param humidity_rel: rel humidities
+    :return: cloud ceilings in meter
+    """
+
+    if not NUMPY_IMPORTED:
+        return _scalar_batch(get_cloud_ceiling, temperature, humidity_rel)
+
+    t = np.asarray(temperature, dtype=float)
+    return np.round((t - get_dew_point_batch(t, humidity_rel)) * 122, 1).astype(int)
+
+
+def get_windchill_batch(temperature, wind_speed, units: str = 'imperial'):
+    """
+    Compute the wind chill for arrays, see get_windchill
+
+    :param temperature: ambient temperatures in °Fahrenheit / °Celsius
+    :param wind_speed: wind speeds in miles/hour or km/h
+    :param units: unit system used for temperature (imperial: temperatur in °F and wind speed kn miles/hour; metric: temperature in °C and wind speed in km/h)
+    :return: the wind chill indices
+    """
+
+    if units not in ['imperial', 'metric']:
+        return
+
+    if not NUMPY_IMPORTED:
+        return _scalar_batch(get_windchill, temperature, wind_speed, units=units)
+
+    T = np.asarray(temperature, dtype=float)
+    V = np.asarray(wind_speed, dtype=float)
+    if units == 'metric':
+        T = env.c_to_f(T)
+        V = env.kmh_to_mph(V)
+
+    with np.errstate(invalid='ignore'):
+        V016 = np.power(V, 0.16)
+    WCI = np.where((T <= 50) & (V >= 3), 13.12 + 0.6215 * T - 11.37 * V016 + 0.3965 * T * V016, T)
+
+    if units == 'metric':
+        return np.round(env.f_to_c(WCI), 1)
+
+    return np.round(WCI, 1)
+
+
+def get_heat_index_batch(temperature, humidity_rel, units: str = 'imperial'):
+    """
+    Compute the heat index for arrays, see get_heat_index
+
+    :param temperature: ambient temperatures in °Fahrenheit / °Celsius
+    :param humidity_rel: rel humidities
+    :param units: unit system used for temperature (imperial: temperatur in °F; metric: temperature in °C)
+    :return: the heat indices
+    """
+
+    if units not in ['imperial', 'metric']:
+        return
+
+    if not NUMPY_IMPORTED:
+        return _scalar_batch(get_heat_index, temperature, humidity_rel, units=units)
+
+    T = np.asarray(temperature, dtype=float)
+    RH = np.asarray(humidity_rel, dtype=float)
+    if units == 'metric':
+        T = env.c_to_f(T)
+
+    # simple formula, full regression where the simple one results in 80 °F or more
+    HI = 0.5 * (T + 61.0 + (T - 68.0) * 1.2 + RH * 0.094)
+    regression = (-42.379 + 2.04901523 * T + 10.14333127 * RH - 0.22475541 * T * RH - 6.83783e-3 * T ** 2 - 5.481717e-2 * RH ** 2
+                  + 1.22874e-3 * T ** 2 * RH + 8.5282e-4 * T * RH ** 2 - 1.99e-6 * T ** 2 * RH ** 2)
+    with np.errstate(invalid='ignore'):
+        adjustment = ((13 - RH) / 4) * np.sqrt((17 - np.abs(T - 95.0)) / 17)
+    regression = np.where((RH < 13) & (T >= 80) & (T <= 112), regression - adjustment, regression)
+    HI = np.where(HI >= 80, regression, HI)
+
+    if units == 'metric':
+        return np.round(env.f_to_c(HI), 1)
+
+    return np.round(HI, 1)
+
+
+def get_feels_like_temperature_batch(temperature, humidity_rel, wind_speed, units: str = 'imperial'):
+    """
+    Calculate Feels Like temperatures based on NOAA for arrays, see get_feels_like_temperature
+
+    :param temperature: temperatures in °Fahrenheit / °Celsius
+    :param humidity_rel: relative humidities in % (1-100)
+    :param wind_speed: wind speeds in miles/hour or km/h
+    :param units: unit system used for temperature (imperial: temperatur in °F and wind speed kn miles/hour; metric: temperature in °C and wind speed in km/h)
+    :return: Feels Like values
+    """
+
+    if units not in ['imperial', 'metric']:
+        return
+
+    if not NUMPY_IMPORTED:
+        return _scalar_batch(get_feels_like_temperature, temperature, humidity_rel, wind_speed, units=units)
+
+    T = np.asarray(temperature, dtype=float)
+    V = np.asarray(wind_speed, dtype=float)
+    if units == 'metric':
+        T = env.c_to_f(T)
+        V = env.kmh_to_mph(V)
+
+    FEELS_LIKE = np.where((T <= 50) & (V > 3), get_windchill_batch(T, V, units='imperial'),
+                          np.where(T >= 80, get_heat_index_batch(T, humidity_rel, units='imperial'), T))
+
+    if units == 'metric':
+        return np.round(env.f_to_c(FEELS_LIKE), 1)
+
+    return np.round(FEELS_LIKE, 1)
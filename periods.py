@@ -0,0 +1,48 @@
+import datetime
+
+from datetime import timedelta
+
+
+class CalendarPeriods(object):
+    """Keys of the calendar periods hour, day, week, month and year of a timestamp in local time.
+
+    The keys are the values of shtime: hour of day, day of month, calendar week, month and year. As all periods change at full hours, the keys are
+    computed once per hour and cached together with the boundaries of the current hour; within the hour a lookup is a comparison.
+    """
+
+    PERIODS = ('hour', 'day', 'week', 'month', 'year')
+
+    def __init__(self, tz: datetime.tzinfo = None):
+
+        self.tz = tz
+        self._start = 0
+        self._end = 0
+        self._keys = None
+        self._starts = None
+
+    def keys(self, timestamp: float) -> tuple:
+        """(hour, day, week, month, year) of timestamp"""
+
+        if not self._start <= timestamp < self._end:
+            self._update(timestamp)
+        return self._keys
+
+    def starts(self, timestamp: float) -> tuple:
+        """Timestamps of the start of hour, day, week, month and year of timestamp"""
+
+        if not self._start <= timestamp < self._end:
+            self._update(timestamp)
+        return self._starts
+
+    def _update(self, timestamp: float) -> None:
+        dt = datetime.datetime.fromtimestamp(timestamp, self.tz)
+        hour = dt.replace(minute=0, second=0, microsecond=0)
+        day = datetime.datetime.combine(dt.date(), datetime.time(), tzinfo=self.tz)
+        week = datetime.datetime.combine(dt.date() - timedelta(days=dt.weekday()), datetime.time(), tzinfo=self.tz)
+        month = day.replace(day=1)
+        year = month.replace(month=1)
+
+        self._keys = (dt.hour, dt.day, dt.isocalendar()[1], dt.month, dt.year)
+        self._starts = tuple(int(period.timestamp()) for period in (hour, day, week, month, year))
+        self._start = self._starts[0]
+        self._end = self._start + 3600
@@ -0,0 +1,146 @@
+import os
+import struct
+import threading
+import time
+
+from dataclasses import dataclass
+from typing import Iterator, Union
+
+
+RECORDER_MAGIC = b'FOSHKRAW'                        # file header of a raw data log file
+RECORDER_VERSION = 1                                # version of the record format
+RECORDER_FILENAME = 'foshk_raw.bin'                 # name of the current log file, rotated files get suffix .1, .2, ...
+RECORDER_SOURCES = ('api', 'http', 'post', 'wu')    # sources of raw data; the record holds the index, so new sources are appended
+RECORD_HEADER = struct.Struct('<dBBI')              # receive timestamp, source index, length of tag, length of payload
+
+
+@dataclass(frozen=True)
+class RawRecord:
+    """One recorded raw message.
+
+    timestamp:  time of receipt as unix timestamp
+    source:     'api', 'http', 'post' or 'wu'
+    tag:        API command code as hex string, HTTP command or client IP of the post or wu request
+    payload:    raw bytes as received
+    """
+
+    timestamp: float
+    source: str
+    tag: str
+    payload: bytes
+
+
+class RawDataRecorder(object):
+    """Append raw gateway traffic to a compact rotating binary log.
+
+    Each file starts with RECORDER_MAGIC and RECORDER_VERSION followed by records consisting of RECORD_HEADER, tag and payload. If the
+    current file exceeds max_bytes it is rotated like logging.handlers.RotatingFileHandler does; backup_count files are kept.
+    """
+
+    def __init__(self, path: str, filename: str = RECORDER_FILENAME, max_bytes: int = 10 * 1024 * 1024, backup_count: int = 5, logger=None):
+
+        self.path = path
+        self.filename = os.path.join(path, filename)
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.logger = logger
+        self.records = 0
+
+        self._lock = threading.Lock()
+        self._file = None
+
+    def record(self, source: str, tag: str, payload: Union[bytes, str], timestamp: float = None) -> None:
+        """Append a raw message to the log; errors are logged but never raised to the caller."""
+
+        if isinstance(payload, str):
+            payload = payload.encode()
+        tag_b = tag.encode()[:255]
+        header = RECORD_HEADER.pack(timestamp if timestamp is not None else time.time(), RECORDER_SOURCES.index(source), len(tag_b), len(payload))
+
+        with self._lock:
+            try:
+                if self._file is None:
+                    self._open()
+                elif self._file.tell() + len(header) + len(tag_b) + len(payload) > self.max_bytes:
+                    self._rotate()
+                self._file.write(header + tag_b + payload)
+                self._file.flush()
+                self.records += 1
+            except OSError as e:
+                if self.logger:
+                    self.logger.warning(f"Unable to record raw data to {self.filename}: {e}")
+
+    def close(self) -> None:
+        """Close the current log file."""
+
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _open(self) -> None:
+        os.makedirs(self.path, exist_ok=True)
+        self._file = open(self.filename, 'ab')
+        if self._file.tell() == 0:
+            self._file.write(RECORDER_MAGIC + bytes([RECORDER_VERSION]))
+
+    def _rotate(self) -> None:
+        self._file.close()
+        self._file = None
+        if self.backup_count > 0:
+            for i in range(self.backup_count - 1, 0, -1):
+                src = f"{self.filename}.{i}"
+                if os.path.exists(src):
+                    os.replace(src, f"{self.filename}.{i + 1}")
+            os.replace(self.filename, f"{self.filename}.1")
+        else:
+            os.remove(self.filename)
+        self._open()
+
+    @property
+    def files(self) -> list:
+        """Existing log files, oldest first."""
+
+        return log_files(self.filename)
+
+
+def log_files(filename: str) -> list:
+    """Return the log file and its rotated predecessors, oldest first."""
+
+    files = []
+    i = 1
+    while os.path.exists(f"{filename}.{i}"):
+        files.insert(0, f"{filename}.{i}")
+        i += 1
+    if os.path.exists(filename):
+        files.append(filename)
+    return files
+
+
+def read_records(filename: str) -> Iterator[RawRecord]:
+    """Read all records of a log file; a truncated last record (eg. after a crash) is ignored."""
+
+    with open(filename, 'rb') as f:
+        header = f.read(len(RECORDER_MAGIC) + 1)
+        if header[:len(RECORDER_MAGIC)] != RECORDER_MAGIC:
+            raise ValueError(f"{filename} is not a raw data log file.")
+        if header[-1] != RECORDER_VERSION:
+            raise ValueError(f"{filename} has unsupported version {header[-1]}.")
+
+        while True:
+            raw_header = f.read(RECORD_HEADER.size)
+            if len(raw_header) < RECORD_HEADER.size:
+                return
+            timestamp, source, tag_len, payload_len = RECORD_HEADER.unpack(raw_header)
+            tag = f.read(tag_len)
+            payload = f.read(payload_len)
+            if len(tag) < tag_len or len(payload) < payload_len:
+                return
+            yield RawRecord(timestamp, RECORDER_SOURCES[source], tag.decode(), payload)
+
+
+def read_log(filename: str) -> Iterator[RawRecord]:
+    """Read the records of a log file including its rotated predecessors in chronological order."""
+
+    for file in log_files(filename):
+        yield from read_records(file)
@@ -0,0 +1,95 @@
+import mmap
+import os
+import struct
+
+
+class RingStoreError(Exception):
+    """Exception raised when a ring store file cannot be opened."""
+
+
+class RingStore(object):
+    """Append-only ring of fixed size records (timestamp, value, ...) in a memory mapped file.
+
+    Each record is a float64 timestamp followed by columns float32 values. A record is written into the mapped file when it is appended, so the
+    file always holds the last capacity readings; after a restart the readings still within a window are read back by their timestamp. The kernel
+    writes the pages back to disk on its own; flush() forces it, e.g. at checkpoints, to keep them over a power loss.
+
+    File layout: header (magic, version, columns, capacity, index of next record, count of records) followed by capacity records.
+    """
+
+    MAGIC = b'FOSHKRS'
+    VERSION = 1
+    HEADER = struct.Struct('<7sBHIII')
+
+    def __init__(self, filename: str, columns: int = 1, capacity: int = 4096):
+
+        self.filename = filename
+        self.columns = columns
+        self.capacity = capacity
+        self.record = struct.Struct('<d' + 'f' * columns)
+        self.size = self.HEADER.size + self.record.size * capacity
+        self._head = 0
+        self._count = 0
+        self._mmap = None
+        self._open()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _open(self) -> None:
+        os.makedirs(os.path.dirname(self.filename) or '.', exist_ok=True)
+        try:
+            fd = os.open(self.filename, os.O_RDWR | os.O_CREAT, 0o644)
+        except OSError as e:
+            raise RingStoreError(f"{self.filename}: {e}")
+
+        try:
+            valid = False
+            if os.fstat(fd).st_size == self.size:
+                header = os.pread(fd, self.HEADER.size, 0)
+                magic, version, columns, capacity, head, count = self.HEADER.unpack(header)
+                valid = magic == self.MAGIC and version == self.VERSION and columns == self.columns and capacity == self.capacity and head < capacity and count <= capacity
+            if not valid:
+                # new file or different layout: start empty
+                os.ftruncate(fd, 0)
+                os.ftruncate(fd, self.size)
+                os.pwrite(fd, self.HEADER.pack(self.MAGIC, self.VERSION, self.columns, self.capacity, 0, 0), 0)
+                head = count = 0
+            self._mmap = mmap.mmap(fd, self.size)
+        except OSError as e:
+            raise RingStoreError(f"{self.filename}: {e}")
+        finally:
+            os.close(fd)
+
+        self._head = head
+        self._count = count
+
+    def append(self, timestamp: float, *values) -> None:
+        """Write a reading to the ring, replacing the oldest one if the ring is full"""
+
+        self.record.pack_into(self._mmap, self.HEADER.size + self._head * self.record.size, timestamp, *values)
+        self._head = (self._head + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+        self.HEADER.pack_into(self._mmap, 0, self.MAGIC, self.VERSION, self.columns, self.capacity, self._head, self._count)
+
+    def readings(self, since: float = None) -> list:
+        """Readings as (timestamp, value, ...) from the oldest to the newest one; only readings newer than since if given"""
+
+        result = []
+        start = (self._head - self._count) % self.capacity
+        for i in range(self._count):
+            reading = self.record.unpack_from(self._mmap, self.HEADER.size + ((start + i) % self.capacity) * self.record.size)
+            if since is None or reading[0] > since:
+                result.append(reading)
+        return result
+
+    def flush(self) -> None:
+        if self._mmap:
+            self._mmap.flush()
+
+    def close(self) -> None:
+        if self._mmap:
+            self._mmap.flush()
+            self._mmap.close()
+            self._mmap = None
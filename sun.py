@@ -0,0 +1,123 @@
+import datetime
+import math
+
+
+def solar_elevation(timestamp: float, lat: float, lon: float, refraction: bool = True) -> float:
+    """
+    Compute the elevation of the sun in degrees using the NOAA solar position algorithm
+
+    Accuracy is about 0.01° for dates between 1800 and 2100. With refraction the apparent elevation is returned, as by ephem used by sh.sun.pos().
+
+    Formula details:
+        https://gml.noaa.gov/grad/solcalc/calcdetails.html
+
+    :param timestamp: unix timestamp
+    :param lat: latitude in degrees
+    :param lon: longitude in degrees, east positive
+    :param refraction: correct the elevation for atmospheric refraction
+    :return: elevation in degrees
+    """
+
+    julian_century = (timestamp / 86400 + 2440587.5 - 2451545) / 36525
+
+    mean_long = math.radians((280.46646 + julian_century * (36000.76983 + julian_century * 0.0003032)) % 360)
+    mean_anom = math.radians(357.52911 + julian_century * (35999.05029 - 0.0001537 * julian_century))
+    eccentricity = 0.016708634 - julian_century * (0.000042037 + 0.0000001267 * julian_century)
+    center = (math.sin(mean_anom) * (1.914602 - julian_century * (0.004817 + 0.000014 * julian_century))
+              + math.sin(2 * mean_anom) * (0.019993 - 0.000101 * julian_century)
+              + math.sin(3 * mean_anom) * 0.000289)
+    omega = math.radians(125.04 - 1934.136 * julian_century)
+    apparent_long = math.radians(math.degrees(mean_long) + center - 0.00569 - 0.00478 * math.sin(omega))
+    mean_obliquity = 23 + (26 + (21.448 - julian_century * (46.815 + julian_century * (0.00059 - julian_century * 0.001813))) / 60) / 60
+    obliquity = math.radians(mean_obliquity + 0.00256 * math.cos(omega))
+    declination = math.asin(math.sin(obliquity) * math.sin(apparent_long))
+
+    var_y = math.tan(obliquity / 2) ** 2
+    equation_of_time = 4 * math.degrees(var_y * math.sin(2 * mean_long)
+                                        - 2 * eccentricity * math.sin(mean_anom)
+                                        + 4 * eccentricity * var_y * math.sin(mean_anom) * math.cos(2 * mean_long)
+                                        - 0.5 * var_y ** 2 * math.sin(4 * mean_long)
+                                        - 1.25 * eccentricity ** 2 * math.sin(2 * mean_anom))
+
+    true_solar_time = ((timestamp % 86400) / 60 + equation_of_time + 4 * lon) % 1440
+    hour_angle = math.radians(true_solar_time / 4 - 180)
+
+    lat_rad = math.radians(lat)
+    cos_zenith = math.sin(lat_rad) * math.sin(declination) + math.cos(lat_rad) * math.cos(declination) * math.cos(hour_angle)
+    elevation = 90 - math.degrees(math.acos(max(-1.0, min(1.0, cos_zenith))))
+
+    if refraction and elevation <= 85:
+        tan_elevation = math.tan(math.radians(elevation))
+        if elevation > 5:
+            correction = 58.1 / tan_elevation - 0.07 / tan_elevation ** 3 + 0.000086 / tan_elevation ** 5
+        elif elevation > -0.575:
+            correction = 1735 + elevation * (-518.2 + elevation * (103.4 + elevation * (-12.79 + elevation * 0.711)))
+        else:
+            correction = -20.772 / tan_elevation
+        elevation += correction / 3600
+
+    return elevation
+
+
+def sunshine_threshold(elevation_degrees: float, day_of_year: int, coefficient: float) -> float:
+    """
+    Compute the solar radiation in W/m² above which the sun is regarded as shining
+
+    :param elevation_degrees: elevation of the sun in degrees
+    :param day_of_year: day of year
+    :param coefficient: sun coefficient
+    :return: threshold of solar radiation in W/m²
+    """
+
+    return (0.73 + 0.06 * math.cos((math.pi / 180) * 360 * day_of_year / 365)) * 1080 * pow((math.sin(math.pi / 180 * elevation_degrees)), 1.25) * coefficient
+
+
+class SolarTable(object):
+    """Solar elevation and sunshine threshold of one local day at minute resolution for a location.
+
+    The table is computed once per day; lookups interpolate linearly between the minutes. The threshold is 0 for minutes with an elevation of
+    min_elevation or below.
+    """
+
+    def __init__(self, lat: float, lon: float, coefficient: float, tz: datetime.tzinfo = None, min_elevation: float = 3):
+
+        self.lat = lat
+        self.lon = lon
+        self.coefficient = coefficient
+        self.tz = tz
+        self.min_elevation = min_elevation
+
+        self.day_of_year = None
+        self._start = 0
+        self._end = 0
+        self._elevations = []
+        self._thresholds = []
+
+    def lookup(self, timestamp: float) -> tuple:
+        """Return elevation in degrees and sunshine threshold in W/m² at timestamp"""
+
+        if not self._start <= timestamp < self._end:
+            self._build(timestamp)
+
+        pos = (timestamp - self._start) / 60
+        index = int(pos)
+        fraction = pos - index
+        elevations = self._elevations
+        thresholds = self._thresholds
+        elevation = elevations[index] + (elevations[index + 1] - elevations[index]) * fraction
+        threshold = thresholds[index] + (thresholds[index + 1] - thresholds[index]) * fraction
+        return elevation, threshold
+
+    def _build(self, timestamp: float) -> None:
+        date = datetime.datetime.fromtimestamp(timestamp, self.tz).date()
+        start = datetime.datetime.combine(date, datetime.time(), tzinfo=self.tz).timestamp()
+        end = datetime.datetime.combine(date + datetime.timedelta(days=1), datetime.time(), tzinfo=self.tz).timestamp()
+        day_of_year = date.timetuple().tm_yday
+
+        # one entry per minute incl. the next midnight; days with change of daylight saving time have 23 or 25 hours
+        minutes = int((end - start) // 60)
+        self._elevations = [solar_elevation(start + 60 * minute, self.lat, self.lon) for minute in range(minutes + 1)]
+        self._thresholds = [sunshine_threshold(elevation, day_of_year, self.coefficient) if elevation > self.min_elevation else 0.0 for elevation in self._elevations]
+        self.day_of_year = day_of_year
+        self._start = start
+        self._end = end
@@ -107,6 +107,25 @@ class WebInterface(SmartPluginWebIf):
                 self.logger.error(f"get_data_html exception: {e}")
         return {}
 
+    @cherrypy.expose
+    def get_history(self, attribute=None, start=None, end=None, resolution='auto'):
+        """
+        Return the history of an attribute as json with lists of timestamps and values
+
+        :param attribute: attribute listed in History_Attributes
+        :param start: timestamp of the first value (default: one day before end)
+        :param end: timestamp after the last value (default: now)
+        :param resolution: raw, minute, hour or auto
+        """
+        if not attribute:
+            return json.dumps({})
+        try:
+            history = self.plugin.get_history(attribute, float(start) if start else None, float(end) if end else None, resolution)
+        except ValueError as e:
+            self.logger.error(f"get_history exception: {e}")
+            return json.dumps({})
+        return json.dumps({key: value.tolist() if hasattr(value, 'tolist') else value for key, value in history.items()})
+
     @cherrypy.expose
     def reboot(self):
         self.plugin.reboot()
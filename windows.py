@@ -0,0 +1,277 @@
+import math
+
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
+
+
+class TimeWindow(object):
+    """Readings of the last span seconds as (timestamp, value), ordered by timestamp.
+
+    Readings are evicted by their age relative to the newest reading, not by their count, so the window covers the same time at any data rate,
+    with crontab polling, missed polls or mixed api and post data. The reading at or before a given time is found by bisection of the timestamps.
+
+    Readings are kept in two lists with a start offset; the evicted head is removed once it makes up half of the lists, so append and eviction
+    have amortised constant cost. Readings older than the newest one are inserted at their position.
+    """
+
+    COMPACT_MIN = 64
+
+    def __init__(self, span: float, readings=None):
+
+        self.span = span
+        self._ts = []
+        self._values = []
+        self._start = 0
+
+        if readings:
+            for ts, value in readings:
+                self.append(ts, value)
+
+    def __len__(self) -> int:
+        return len(self._ts) - self._start
+
+    def __iter__(self):
+        return zip(self._ts[self._start:], self._values[self._start:])
+
+    def __getitem__(self, index: int) -> tuple:
+        """Reading at index as (timestamp, value); negative indices count from the newest reading"""
+
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError('TimeWindow index out of range')
+        index += self._start
+        return self._ts[index], self._values[index]
+
+    def __getstate__(self):
+        return {'span': self.span, 'readings': list(self)}
+
+    def __setstate__(self, state):
+        self.__init__(state['span'], state['readings'])
+
+    @property
+    def newest(self):
+        """Timestamp of the newest reading; None if empty"""
+
+        return self._ts[-1] if len(self) else None
+
+    @property
+    def oldest(self):
+        """Timestamp of the oldest reading; None if empty"""
+
+        return self._ts[self._start] if len(self) else None
+
+    def append(self, timestamp: float, value) -> None:
+        """Add a reading and evict the readings of span seconds or more before the newest one"""
+
+        if not self._ts or timestamp >= self._ts[-1]:
+            self._ts.append(timestamp)
+            self._values.append(value)
+        elif timestamp <= self._ts[-1] - self.span:
+            # older than the window
+            return
+        else:
+            pos = bisect_right(self._ts, timestamp, self._start)
+            self._ts.insert(pos, timestamp)
+            self._values.insert(pos, value)
+        self._evict()
+
+    def _evict(self) -> None:
+        ts = self._ts
+        cutoff = ts[-1] - self.span
+        start = self._start
+        while ts[start] <= cutoff:
+            self._on_evict(ts[start], self._values[start])
+            start += 1
+        self._start = start
+
+        if start >= self.COMPACT_MIN and start * 2 >= len(ts):
+            del ts[:start]
+            del self._values[:start]
+            self._start = 0
+
+    def _on_evict(self, timestamp: float, value) -> None:
+        """Hook for subclasses keeping aggregates of the window"""
+
+        pass
+
+    def clear(self) -> None:
+        self._ts.clear()
+        self._values.clear()
+        self._start = 0
+
+    def index_at(self, timestamp: float):
+        """Index of the newest reading at or before timestamp; None if all readings are newer"""
+
+        pos = bisect_right(self._ts, timestamp, self._start) - 1
+        return pos - self._start if pos >= self._start else None
+
+    def value_at(self, timestamp: float, default=None):
+        """Value of the newest reading at or before timestamp"""
+
+        index = self.index_at(timestamp)
+        return default if index is None else self._values[index + self._start]
+
+    def values(self, start: int = 0, end: int = None) -> list:
+        """Values of the readings from index start to index end (exclusive)"""
+
+        end = len(self) if end is None else end
+        return self._values[self._start + start:self._start + end]
+
+
+class RollingWind(TimeWindow):
+    """Wind readings of the last span seconds with average speed, average direction and maximum gust in O(1) per reading.
+
+    Running sums of speed and of the sine and cosine of the direction are updated when a reading is appended and when it is evicted; the maximum
+    gust is kept in a monotonic deque. The sums are recalculated from the window once per window length, so rounding errors of the running sums
+    cannot accumulate. Results are the same as Gateway.get_avg_wind() and Gateway.get_max_wind() on the equivalent deque, except for averages
+    lying exactly between two tenths, which may be rounded the other way due to the different order of summation.
+
+    Readings older than the newest one are counted as readings of the time of the newest one, as the gust deque relies on the order of readings.
+    """
+
+    def __init__(self, span: float = 600):
+
+        # (timestamp, gust) with decreasing gust; the front is the maximum of the window
+        self._gusts = deque()
+
+        self._appends = 0
+        self._speed_sum = 0.0
+        self._sin_sum = 0.0
+        self._cos_sum = 0.0
+
+        super().__init__(span)
+
+    def __iter__(self):
+        return ((ts, speed, direction, gust) for ts, (speed, direction, gust, _, _) in super().__iter__())
+
+    def __setstate__(self, state):
+        self.__init__(state['span'])
+        for reading in state['readings']:
+            self.append(*reading)
+
+    def append(self, timestamp: float, speed: float, direction: float, gust: float) -> None:
+        """Add a reading; readings of span seconds or more before it are evicted"""
+
+        if self._ts and timestamp < self._ts[-1]:
+            timestamp = self._ts[-1]
+
+        rad = math.radians(direction)
+        sin = math.sin(rad)
+        cos = math.cos(rad)
+
+        self._speed_sum += speed
+        self._sin_sum += sin
+        self._cos_sum += cos
+
+        gusts = self._gusts
+        while gusts and gusts[-1][1] <= gust:
+            gusts.pop()
+        gusts.append((timestamp, gust))
+
+        super().append(timestamp, (speed, direction, gust, sin, cos))
+
+        cutoff = timestamp - self.span
+        while gusts[0][0] <= cutoff:
+            gusts.popleft()
+
+        self._appends += 1
+        if self._appends >= len(self):
+            self._resum()
+
+    def _on_evict(self, timestamp: float, value) -> None:
+        self._speed_sum -= value[0]
+        self._sin_sum -= value[3]
+        self._cos_sum -= value[4]
+
+    def clear(self) -> None:
+        super().clear()
+        self._gusts.clear()
+        self._appends = 0
+        self._speed_sum = self._sin_sum = self._cos_sum = 0.0
+
+    def _resum(self) -> None:
+        values = self.values()
+        self._speed_sum = math.fsum(value[0] for value in values)
+        self._sin_sum = math.fsum(value[3] for value in values)
+        self._cos_sum = math.fsum(value[4] for value in values)
+        self._appends = 0
+
+    @property
+    def avg_speed(self) -> float:
+        """Average speed of the window rounded to 0.1"""
+
+        return round(self._speed_sum / len(self), 1) if len(self) else 0.0
+
+    @property
+    def avg_direction(self) -> float:
+        """Average direction of the window as vector average in degrees rounded to 0.1"""
+
+        return round((math.degrees(math.atan2(self._sin_sum, self._cos_sum)) + 360) % 360, 1)
+
+    @property
+    def max_gust(self) -> float:
+        """Maximum gust of the window rounded to 0.1; not below 0"""
+
+        return round(max(self._gusts[0][1], 0), 1) if self._gusts else 0
+
+
+class TrendWindow(object):
+    """Readings from the reading at or before span seconds ago (the anchor) up to the one before the newest, as input of a trend.
+
+    The values are kept quantised to resolution in a sorted list, so the number of values bigger, smaller and equal to the anchor value are found
+    by bisection instead of a scan of the window. Each reading is inserted and removed once, so update() costs O(log n) comparisons plus the
+    memmove of the sorted list.
+
+    Readings older than the newest one are ignored.
+    """
+
+    def __init__(self, span: float, tolerance: float = 0, resolution: float = 0.01):
+
+        self.span = span
+        self.tolerance = tolerance
+        self.resolution = resolution
+
+        self._readings = deque()        # (timestamp, value, key) from the anchor on
+        self._sorted = []               # keys of _readings
+        self._current = None
+
+    def __len__(self) -> int:
+        return len(self._readings)
+
+    def clear(self) -> None:
+        self._readings.clear()
+        self._sorted.clear()
+        self._current = None
+
+    def update(self, timestamp: float, value: float):
+        """Add the newest reading and return (anchor timestamp, anchor value, bigger, smaller, equal); None without anchor less than tolerance older than span
+
+        bigger, smaller and equal count the readings from the anchor (included) up to the one before the newest, compared to the anchor value.
+        equal starts at 1 as in Gateway.get_trend().
+        """
+
+        current = self._current
+        if current is not None:
+            if timestamp < current[0]:
+                return None
+            self._readings.append(current)
+            insort(self._sorted, current[2])
+        self._current = (timestamp, value, round(value / self.resolution))
+
+        # keep exactly one reading at or before target as anchor
+        readings = self._readings
+        target = timestamp - self.span
+        while len(readings) > 1 and readings[1][0] <= target:
+            key = readings.popleft()[2]
+            del self._sorted[bisect_left(self._sorted, key)]
+
+        if not readings or not target - self.tolerance < readings[0][0] <= target:
+            return None
+
+        anchor_ts, anchor_value, anchor_key = readings[0]
+        smaller = bisect_left(self._sorted, anchor_key)
+        bigger = len(self._sorted) - bisect_right(self._sorted, anchor_key)
+        equal = len(self._sorted) - smaller - bigger + 1
+        return anchor_ts, anchor_value, bigger, smaller, equal
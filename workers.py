@@ -0,0 +1,166 @@
+import logging
+import logging.handlers
+import multiprocessing
+import queue
+import socket
+import threading
+
+from dataclasses import replace
+
+
+MSG_PACKET = 0                  # (MSG_PACKET, parsed data, station id, client ip)
+MSG_STATS = 1                   # (MSG_STATS, worker index, statistics dict of GatewayTcp)
+MSG_LOG = 2                     # (MSG_LOG, logging.LogRecord)
+STATS_INTERVAL = 5              # seconds between statistics messages of a worker
+
+
+def reuse_port_supported() -> bool:
+    """SO_REUSEPORT is needed to let several processes bind the upload port"""
+
+    return hasattr(socket, 'SO_REUSEPORT')
+
+
+class QueueLogHandler(logging.handlers.QueueHandler):
+    """Send the log records of a worker to the plugin process, where they are logged by the plugin logger."""
+
+    def enqueue(self, record):
+        self.queue.put((MSG_LOG, record))
+
+
+class WorkerPlugin(object):
+    """Plugin stand-in providing the attributes GatewayTcp uses within a worker process."""
+
+    def __init__(self, interface_config, index: int, log_level: int = logging.WARNING, out_queue=None):
+        self.logger = logging.getLogger(f'plugins.foshk.upload_worker_{index}')
+        self.logger.setLevel(log_level)
+        if out_queue is not None:
+            self.logger.addHandler(QueueLogHandler(out_queue))
+            self.logger.propagate = False
+        self.interface_config = interface_config
+        self.raw_recorder = None
+        self.index = index
+
+    def get_fullname(self):
+        return f'foshk.upload_worker_{self.index}'
+
+
+def run_worker(interface_config, out_queue, stop_event, index: int, log_level: int = logging.WARNING) -> None:
+    """Entry of a worker process: receive and parse uploads on the shared port and put the packets to out_queue until stop_event is set."""
+
+    # the package is completely imported in the worker process at this point
+    from . import GatewayTcp
+
+    def callback(data: dict, station_id: str, client_ip: str) -> None:
+        out_queue.put((MSG_PACKET, data, station_id, client_ip))
+
+    tcp = GatewayTcp(WorkerPlugin(interface_config, index, log_level, out_queue), callback)
+    tcp.startup()
+    try:
+        while not stop_event.wait(STATS_INTERVAL):
+            out_queue.put((MSG_STATS, index, tcp.statistics))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        tcp.stop_server()
+        tcp.shutdown()
+        out_queue.put((MSG_STATS, index, tcp.statistics))
+
+
+class UploadWorkerPool(object):
+    """Receive ECOWITT and Wunderground uploads with several worker processes sharing the upload port via SO_REUSEPORT.
+
+    Each worker runs its own GatewayTcp (receive and parse stage) and puts the parsed packets to a multiprocessing queue; the kernel distributes
+    the connections over the workers. A thread in the plugin process hands the packets to the callback, so post-processing and item updates stay in
+    the plugin process. Provides the same interface as GatewayTcp (startup, stop_server, shutdown, statistics).
+
+    Duplicate filter and rate limit work per worker: a client keeps its connection to one worker, but reconnects may end up at another one.
+    Raw data is not recorded in this mode.
+    """
+
+    def __init__(self, plugin_instance, callback, workers: int):
+
+        # get instance
+        self._plugin_instance = plugin_instance
+        self.logger = self._plugin_instance.logger
+        self.callback = callback
+        self.workers = workers
+
+        # the workers get their own copy of the interface config; the port is shared
+        self.interface_config = replace(self._plugin_instance.interface_config, post_server_reuse_port=True)
+
+        # spawn instead of fork, the plugin process runs many threads
+        self._context = multiprocessing.get_context('spawn')
+        self._queue = self._context.Queue(maxsize=self.interface_config.post_server_queue_size * workers)
+        self._stop_event = self._context.Event()
+        self._processes = []
+        self._reader_thread = None
+        self._statistics = {}
+        self.packets = 0
+
+    def startup(self) -> None:
+        """Start the worker processes and the thread reading their packets"""
+
+        self.logger.info(f"Start {self.workers} upload workers at {self.interface_config.post_server_ip}:{self.interface_config.post_server_port}")
+        self._stop_event.clear()
+        for index in range(self.workers):
+            process = self._context.Process(target=run_worker, name=f'{self._plugin_instance.get_fullname()}.Upload-Worker-{index}',
+                                            args=(self.interface_config, self._queue, self._stop_event, index, self.logger.getEffectiveLevel()), daemon=True)
+            process.start()
+            self._processes.append(process)
+
+        self._reader_thread = threading.Thread(target=self._read_queue, name=f'plugins.{self._plugin_instance.get_fullname()}.Upload-Worker-Reader', daemon=True)
+        self._reader_thread.start()
+
+    def stop_server(self) -> None:
+        """Stop the worker processes"""
+
+        self._stop_event.set()
+        for process in self._processes:
+            process.join(10)
+            if process.is_alive():
+                self.logger.error(f"Unable to stop {process.name}, terminating it")
+                process.terminate()
+        self._processes = []
+
+    def shutdown(self) -> None:
+        """Stop the thread reading the packets of the workers, after all pending packets have been handed over"""
+
+        if self._reader_thread:
+            self._queue.put(None)
+            self._reader_thread.join(10)
+            if self._reader_thread.is_alive():
+                self.logger.error("Unable to shut down Upload-Worker-Reader thread")
+            else:
+                self.logger.info("Upload-Worker-Reader thread has been shutdown.")
+        self._reader_thread = None
+
+    def _read_queue(self) -> None:
+        while True:
+            try:
+                msg = self._queue.get(timeout=1)
+            except queue.Empty:
+                continue
+            if msg is None:
+                return
+            if msg[0] == MSG_PACKET:
+                self.packets += 1
+                try:
+                    self.callback(*msg[1:])
+                except Exception as e:
+                    self.logger.error(f"Error while processing upload from {msg[3]}: {e}")
+            elif msg[0] == MSG_STATS:
+                self._statistics[msg[1]] = msg[2]
+            elif msg[0] == MSG_LOG:
+                # the record keeps the logger name of the worker
+                self.logger.handle(msg[1])
+
+    @property
+    def statistics(self) -> dict:
+        """Counters of all workers summed up; updated every STATS_INTERVAL seconds"""
+
+        result = {'received': 0, 'dropped': 0, 'duplicates': 0, 'throttled': 0, 'queue_size': 0}
+        for stats in list(self._statistics.values()):
+            for key in result:
+                result[key] += stats.get(key, 0)
+        result['workers'] = self.workers
+        return result